@@ -0,0 +1,149 @@
+"""
+입력 처리 경로 메모리 할당 벤치마크 (tracemalloc)
+
+조이스틱/버튼 이벤트를 apply_* 함수로 반복 처리하면서 이벤트마다 다음을 측정한다.
+- 이벤트 처리 중 추가로 할당된 최대 바이트 (tracemalloc peak - 처리 전 사용량)
+- 측정 구간 후반에 늘어난 바이트 (정상 상태에서 이벤트마다 쌓이는 메모리)
+이벤트당 할당은 빈 함수로 측정한 측정 코드 자체의 할당을 뺀 값이다.
+빈 함수도 입력 경로처럼 keyboard_lock을 with 문으로 한 번 잡는다 (CPython 3.11의 with 문은 __exit__ 바운드 메서드를
+잠시 만들고 블록을 나갈 때 바로 해제하므로, 입력 처리 코드가 만드는 객체와 구분하여 기준에 포함).
+
+이벤트당 할당 0은 확인하지 않는다 - 처리 경로가 시계를 읽으면(timebase.now_ns) CPython은 큰 정수 객체(32 B)를
+매번 새로 만들고, 이 값은 바로 해제되어도 peak에 잡힌다. 이 벤치마크가 확인하는 것은 다음 두 가지이다.
+- 남는 메모리 없음: 남은 바이트가 0보다 크면 실패
+- 컨테이너를 만들지 않음: 정상 상태(중앙값) 이벤트당 할당이 예산(큰 정수 객체 두 개 크기)을 넘으면 실패
+  (집합/딕셔너리/리스트는 하나만 만들어도 예산을 넘음)
+실패하면 종료 코드 1.
+키보드 백엔드는 아무것도 하지 않는 객체로 교체하고, 키 유지용 1 ms 대기(timebase.sleep)는 건너뛴다.
+
+실행:
+    python benchmarks/bench_alloc.py [--events 20000] [--budget-bytes 64]
+"""
+
+import argparse
+import array
+import gc
+import os
+import statistics
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_server import data_processor  # noqa: E402
+from game_server import keyboard_handler  # noqa: E402
+from game_server import timebase  # noqa: E402
+
+
+class NullKeyboard:
+    def press(self, key):
+        pass
+
+    def release(self, key):
+        pass
+
+
+def joystick_hold():
+    """같은 방향을 계속 보내는 경우 (가장 흔한 정상 상태)"""
+    def event(i):
+        data_processor.apply_joystick_data(1.0, 0.0, 100, False)
+    return event
+
+
+def joystick_sweep():
+    """8방향 + 중립을 돌아가며 보내는 경우 (매번 키 누름/뗌)"""
+    positions = [(1.0, 0.0), (1.0, 1.0), (0.0, 1.0), (-1.0, 1.0), (-1.0, 0.0), (-1.0, -1.0), (0.0, -1.0), (1.0, -1.0), (0.0, 0.0)]
+
+    def event(i):
+        x, y = positions[i % len(positions)]
+        data_processor.apply_joystick_data(x, y, 100, False)
+    return event
+
+
+def button_tap():
+    """버튼 누름/뗌 반복"""
+    def event(i):
+        data_processor.apply_button_data("A", i % 2 == 0)
+    return event
+
+
+def button_repeat():
+    """같은 버튼 상태를 반복해서 보내는 경우 (중복 - 처리하지 않음)"""
+    data_processor.apply_button_data("B", True)
+
+    def event(i):
+        data_processor.apply_button_data("B", True)
+    return event
+
+
+def noop():
+    def event(i):
+        with keyboard_handler.keyboard_lock:
+            pass
+    return event
+
+
+def measure(event, events, warmup):
+    """(이벤트당 할당 바이트 목록, 남은 바이트)"""
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        # 준비 이벤트도 추적하여, 이후 교체되는 객체가 남은 바이트로 잘못 잡히지 않도록 함
+        for i in range(warmup):
+            event(i)
+        # 측정값은 정수 배열에 저장 (리스트에 넣으면 257 이상인 값은 정수 객체로 남아 남은 바이트에 잡힘)
+        allocations = array.array("q", bytes(8 * events))
+        middle = None
+        for i in range(events):
+            if i == events // 2:
+                # 남은 바이트는 측정 구간 후반의 증가량 (교체되는 객체/측정 변수의 크기 변화는 제외)
+                middle = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            event(i)
+            _, peak = tracemalloc.get_traced_memory()
+            allocations[i] = peak - before
+        retained = tracemalloc.get_traced_memory()[0] - middle
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+    return allocations, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description="입력 처리 경로 메모리 할당 벤치마크")
+    parser.add_argument("--events", type=int, default=20000, help="측정할 이벤트 수")
+    parser.add_argument("--warmup", type=int, default=2000, help="측정 전 처리할 이벤트 수")
+    parser.add_argument("--budget-bytes", type=int, default=64, help="정상 상태(중앙값) 이벤트당 허용 할당 (보정 후, 큰 정수 객체 두 개 크기)")
+    args = parser.parse_args()
+
+    keyboard_handler.set_backend(NullKeyboard())
+    timebase.sleep = lambda seconds: None
+
+    overhead = statistics.median(measure(noop(), args.events, args.warmup)[0])
+    workloads = [
+        ("joystick_hold", joystick_hold),
+        ("joystick_sweep", joystick_sweep),
+        ("button_tap", button_tap),
+        ("button_repeat", button_repeat),
+    ]
+
+    failed = False
+    print(f"측정 오버헤드 {overhead} B (아래 값에서 뺌), 예산 {args.budget_bytes} B/이벤트")
+    print(f"{'workload':<16} {'중앙값 B':>10} {'평균 B':>10} {'최대 B':>10} {'남은 B':>10}  결과")
+    for name, workload in workloads:
+        data_processor.reset_all_states_internal()
+        allocations, retained = measure(workload(), args.events, args.warmup)
+        median = max(0, statistics.median(allocations) - overhead)
+        mean = max(0.0, statistics.fmean(allocations) - overhead)
+        worst = max(0, max(allocations) - overhead)
+        ok = retained <= 0 and median <= args.budget_bytes
+        failed |= not ok
+        print(f"{name:<16} {median:>10.0f} {mean:>10.1f} {worst:>10.0f} {retained:>10}  {'OK' if ok else 'FAIL'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
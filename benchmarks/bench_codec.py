@@ -0,0 +1,66 @@
+"""
+입력 데이터 디코딩 비용 마이크로벤치마크
+
+같은 조이스틱/버튼 이벤트를 JSON, 고정 길이 바이너리, msgpack(설치된 경우)으로 인코딩해
+이벤트 객체로 디코딩하는 데 걸리는 시간과 메시지 크기를 비교한다.
+
+실행:
+    python benchmarks/bench_codec.py
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_server import codec  # noqa: E402
+from game_server import config  # noqa: E402
+
+ITERATIONS = 200_000
+
+
+def legacy_joystick(payload):
+    """이전 방식: UTF-8 디코딩 → json.loads → dict 조회/float 변환"""
+    data = json.loads(payload.decode("utf-8"))
+    return float(data.get("x", 0.0)), float(data.get("y", 0.0)), data.get("strength", 0), data.get("reset", False)
+
+
+def main():
+    joystick = {"x": 0.73, "y": -0.41, "strength": 84, "reset": False}
+    button = {"button": "A", "pressed": True}
+
+    payloads = {
+        "json": (
+            json.dumps(joystick, separators=(",", ":")).encode(),
+            json.dumps(button, separators=(",", ":")).encode(),
+        ),
+        "bin": (
+            codec.encode_joystick(joystick["x"], joystick["y"], joystick["strength"]),
+            codec.encode_button(button["button"], button["pressed"]),
+        ),
+    }
+    if config.MSGPACK_AVAILABLE:
+        import msgpack
+        payloads["msgpack"] = (msgpack.packb(joystick), msgpack.packb(button))
+
+    def measure(func):
+        return min(timeit.repeat(func, number=ITERATIONS, repeat=5)) / ITERATIONS * 1e9
+
+    json_joystick = payloads["json"][0]
+    legacy = measure(lambda: legacy_joystick(json_joystick))
+
+    print(f"이벤트 수: {ITERATIONS}")
+    print(f"  {'이전 방식 (json)':<22}: 조이스틱 {legacy:7.1f} ns ({len(json_joystick)} B)")
+    for name, (joystick_payload, button_payload) in payloads.items():
+        joystick_ns = measure(lambda: codec.decode_joystick(joystick_payload, name))
+        button_ns = measure(lambda: codec.decode_button(button_payload, name))
+        print(f"  {'codec (' + name + ')':<22}: 조이스틱 {joystick_ns:7.1f} ns ({len(joystick_payload)} B), "
+              f"버튼 {button_ns:7.1f} ns ({len(button_payload)} B)")
+    if not config.MSGPACK_AVAILABLE:
+        print("  (msgpack 미설치 - pip install msgpack 후 함께 측정)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+키 출력 지연 시간 벤치마크 (thread vs process 출력 방식)
+
+웹 서버 프로세스에서 JSON 생성 스레드 여러 개가 GIL을 사용하는 동안 2 ms 간격으로 키를 누르고/떼면서,
+명령을 보내기로 예정된 시점부터 키보드 백엔드의 출력이 끝난 시점까지의 지연 시간 분포를 비교한다
+(GIL을 기다리느라 명령을 늦게 보낸 시간도 포함).
+출력 프로세스는 별도 CPU 코어에서 실행될 때 효과가 있으므로 단일 코어 환경에서는 오히려 지연이 늘 수 있다.
+키보드 백엔드는 pynput 대신 비슷한 양의 파이썬 코드를 실행하는 가짜 백엔드를 사용한다 (디스플레이 불필요).
+
+실행:
+    python benchmarks/bench_emitter.py [--commands 2000] [--load-threads 4]
+"""
+
+import argparse
+import functools
+import json
+import os
+import pickle
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_server import emitter_process  # noqa: E402
+from game_server.keys import Key  # noqa: E402
+
+PERIOD = 0.002  # 명령 간격 (초)
+
+
+class BusyKeyboard:
+    """pynput처럼 키마다 파이썬 코드를 실행하고 출력 완료 시각을 기록하는 백엔드"""
+
+    def __init__(self, result_path=None):
+        self.result_path = result_path
+        self.done_ns = []
+
+    def _emit(self, key):
+        # pynput(Xlib) 요청 인코딩과 비슷한 양의 파이썬 연산 (~30 µs)
+        total = 0
+        for i in range(300):
+            total += i * len(key)
+        self.done_ns.append(time.monotonic_ns())
+        return total
+
+    def press(self, key):
+        self._emit(key)
+
+    def release(self, key):
+        self._emit(key)
+
+    def close(self):
+        if self.result_path:
+            with open(self.result_path, "w") as f:
+                json.dump(self.done_ns, f)
+
+
+def load_loop(stop):
+    """/status 응답 생성과 비슷한 GIL 부하"""
+    status = {"joystick": {"x": 0.5, "y": -0.5, "keys": ["w", "d"]}, "stats": {str(i): i for i in range(200)}}
+    while not stop.is_set():
+        json.dumps(status)
+
+
+def run_commands(keyboard, commands):
+    """PERIOD 간격으로 명령 전송, 예정 시각 목록 반환"""
+    scheduled_ns = []
+    period_ns = int(PERIOD * 1e9)
+    next_ns = time.monotonic_ns()
+    for i in range(commands):
+        # 한 주기 이상 밀리면 밀린 명령을 몰아서 보내지 않고 현재 시각부터 다시 예정
+        next_ns = max(next_ns + period_ns, time.monotonic_ns())
+        delay = (next_ns - time.monotonic_ns()) / 1e9
+        if delay > 0:
+            time.sleep(delay)
+        scheduled_ns.append(next_ns)
+        if i % 2 == 0:
+            keyboard.press("w")
+        else:
+            keyboard.release("w")
+    return scheduled_ns
+
+
+def measure(mode, commands, load_threads):
+    stop = threading.Event()
+    loaders = [threading.Thread(target=load_loop, args=(stop,), daemon=True) for _ in range(load_threads)]
+
+    result_path = None
+    if mode == "thread":
+        keyboard = BusyKeyboard()
+    else:
+        fd, result_path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        keyboard = emitter_process.ProcessKeyboard(backend_factory=functools.partial(BusyKeyboard, result_path))
+        if not keyboard.start():
+            raise RuntimeError("출력 프로세스를 시작하지 못했습니다")
+
+    for loader in loaders:
+        loader.start()
+    try:
+        scheduled_ns = run_commands(keyboard, commands)
+        time.sleep(0.2)  # 남은 명령 출력 대기
+    finally:
+        stop.set()
+        for loader in loaders:
+            loader.join()
+
+    if mode == "thread":
+        done_ns = keyboard.done_ns
+    else:
+        stats = keyboard.get_stats()
+        keyboard.stop()
+        with open(result_path) as f:
+            done_ns = json.load(f)
+        os.unlink(result_path)
+        if stats["dropped"]:
+            print(f"  (링 버퍼 가득 참으로 버린 명령 {stats['dropped']}개)")
+
+    latencies = sorted((done - scheduled) / 1000 for scheduled, done in zip(scheduled_ns, done_ns))
+    return {
+        "p50": statistics.median(latencies),
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "max": latencies[-1],
+    }
+
+
+def check_key_pickle():
+    """특수 키가 다른 프로세스로 전달되는 경로(pickle 왕복)에서 같은 객체로 복원되는지 확인"""
+    keys = [Key.up, Key.space, Key.shift_r]
+    restored = pickle.loads(pickle.dumps(keys))
+    return all(before is after for before, after in zip(keys, restored))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="키 출력 지연 시간 벤치마크")
+    parser.add_argument("--commands", type=int, default=2000, help="출력할 키 명령 수")
+    parser.add_argument("--load-threads", type=int, default=4, help="GIL 부하 스레드 수")
+    args = parser.parse_args()
+
+    if not check_key_pickle():
+        print("특수 키 pickle 왕복 실패")
+        sys.exit(1)
+
+    print(f"명령 {args.commands}개 ({PERIOD * 1000:.0f} ms 간격), GIL 부하 스레드 {args.load_threads}개, "
+          f"CPU {os.cpu_count()}개")
+    for mode in ("thread", "process"):
+        result = measure(mode, args.commands, args.load_threads)
+        print(f"  {mode:<7}: p50 {result['p50']:8.1f} µs | p99 {result['p99']:8.1f} µs | 최대 {result['max']:8.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+HTTP 서버 모드별 처리량/지연 시간 벤치마크
+
+server.py를 --server 모드별로 실행하고, 여러 클라이언트가 keep-alive 연결로 /joystick 요청을 보내
+초당 처리량과 지연 시간 분포(p50/p99/최대)를 비교한다.
+연결을 매번 새로 여는 클라이언트(--no-keepalive)로도 측정할 수 있다.
+--idle N을 지정하면 측정 전에 요청을 하나 보낸 뒤 가만히 있는 keep-alive 연결 N개(접속만 해 둔 휴대폰/대시보드)를
+열어 두며, 측정 후 서버 프로세스의 스레드 수(Linux)도 함께 출력한다.
+
+실행:
+    python benchmarks/bench_http.py [--clients 16] [--duration 5] [--modes dev pooled async] [--no-keepalive] [--idle 0]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BODY = json.dumps({"x": 0.0, "y": 0.0, "strength": 0}, separators=(",", ":")).encode()
+HEADERS = {"Content-Type": "application/json"}
+
+
+def find_free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, port, timeout=30.0):
+    """server.py 실행 후 /ping 응답까지 대기 (MQTT/속도 제한 비활성화)"""
+    env = dict(os.environ, MQTT_ENABLED="false", RATE_LIMIT_ENABLED="false")
+    process = subprocess.Popen(
+        [sys.executable, "server.py", "--port", str(port), "--server", mode],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/ping")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return process
+        except OSError:
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError(f"{mode} 서버가 제한 시간 안에 응답하지 않았습니다")
+
+
+def client_loop(port, deadline, keepalive, latencies, errors):
+    conn = None
+    while time.perf_counter() < deadline:
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+            start = time.perf_counter()
+            conn.request("POST", "/joystick", body=BODY, headers=HEADERS)
+            response = conn.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - start)
+            if response.status != 200:
+                errors.append(response.status)
+            if not keepalive or response.will_close:
+                conn.close()
+                conn = None
+        except OSError as e:
+            errors.append(type(e).__name__)
+            if conn is not None:
+                conn.close()
+            conn = None
+    if conn is not None:
+        conn.close()
+
+
+def open_idle_connections(port, count):
+    """요청 하나를 보낸 뒤 응답을 받고 그대로 열어 두는 연결 (유휴 클라이언트)"""
+    connections = []
+    for _ in range(count):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        try:
+            conn.request("GET", "/ping")
+            conn.getresponse().read()
+        except OSError:
+            pass  # 서버가 거절한 경우 (pooled 모드의 503 등)
+        connections.append(conn)
+    return connections
+
+
+def thread_count(pid):
+    """프로세스 스레드 수 (/proc 없는 환경에서는 None)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def measure(mode, clients, duration, keepalive, idle=0):
+    port = find_free_port()
+    process = start_server(mode, port)
+    idle_connections = []
+    try:
+        idle_connections = open_idle_connections(port, idle)
+        latencies_per_client = [[] for _ in range(clients)]
+        errors = []
+        deadline = time.perf_counter() + duration
+        threads = [
+            threading.Thread(target=client_loop, args=(port, deadline, keepalive, latencies_per_client[i], errors))
+            for i in range(clients)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        threads_used = thread_count(process.pid)
+    finally:
+        for conn in idle_connections:
+            conn.close()
+        process.terminate()
+        process.wait(timeout=5)
+
+    latencies = sorted(latency for per_client in latencies_per_client for latency in per_client)
+    if not latencies:
+        raise RuntimeError(f"{mode}: 응답을 하나도 받지 못했습니다 ({errors[:5]})")
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        "throughput": len(latencies) / duration,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": percentile(0.99),
+        "max": latencies[-1] * 1000,
+        "errors": len(errors),
+        "threads": threads_used,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP 서버 모드별 처리량/지연 시간 벤치마크")
+    parser.add_argument("--clients", type=int, default=16, help="동시 클라이언트 수")
+    parser.add_argument("--duration", type=float, default=5.0, help="모드별 측정 시간 (초)")
+    parser.add_argument("--modes", nargs="+", default=["dev", "pooled", "async"], help="측정할 서버 모드")
+    parser.add_argument("--no-keepalive", action="store_true", help="요청마다 새 연결 사용")
+    parser.add_argument("--idle", type=int, default=0, help="측정 중 열어 둘 유휴 keep-alive 연결 수")
+    args = parser.parse_args()
+
+    keepalive = not args.no_keepalive
+    print(f"클라이언트 {args.clients}개, 모드별 {args.duration:.0f}초, keep-alive {'사용' if keepalive else '안 함'}, "
+          f"유휴 연결 {args.idle}개")
+    for mode in args.modes:
+        result = measure(mode, args.clients, args.duration, keepalive, args.idle)
+        threads = "-" if result["threads"] is None else result["threads"]
+        print(f"  {mode:<7}: {result['throughput']:8,.0f} req/s | p50 {result['p50']:6.2f} ms | "
+              f"p99 {result['p99']:6.2f} ms | 최대 {result['max']:7.2f} ms | 에러 {result['errors']} | 스레드 {threads}")
+
+
+if __name__ == "__main__":
+    main()
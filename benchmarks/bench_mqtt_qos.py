@@ -0,0 +1,143 @@
+"""
+MQTT QoS별 조이스틱 처리량 벤치마크
+
+발행 클라이언트가 조이스틱 메시지 N개를 보내고, 서버(game_server.mqtt_client)가 모두 수신할 때까지의
+처리량을 QoS 0과 QoS 1로 비교한다 (QoS 1은 메시지마다 PUBACK 왕복이 추가됨).
+상태 메시지의 JSON 크기(기본 vs 공백 없는 형식)도 함께 출력한다.
+
+기본으로 benchmarks/mqtt_stub_broker.py의 테스트 브로커를 사용하며,
+실제 브로커(mosquitto 등)로 측정하려면 --host/--port를 지정한다 (--protocol 5는 실제 브로커에서만 가능).
+
+실행:
+    python benchmarks/bench_mqtt_qos.py [--messages 5000] [--host localhost --port 1883] [--protocol 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_server import config  # noqa: E402
+from game_server import data_processor  # noqa: E402
+from game_server import keyboard_handler  # noqa: E402
+from game_server import mqtt_client  # noqa: E402
+
+from mqtt_stub_broker import StubBroker  # noqa: E402
+
+
+class NullKeyboard:
+    """키 입력을 실제로 보내지 않는 백엔드 (디스플레이 없이 측정)"""
+
+    def press(self, key):
+        pass
+
+    def release(self, key):
+        pass
+
+
+def received_count():
+    stats = mqtt_client.mqtt_inbox.get_stats()
+    return stats["processed"] + stats["coalesced"] + stats["queue_depth"]
+
+
+def create_publisher(host, port, protocol):
+    import paho.mqtt.client as mqtt
+
+    mqtt_protocol = mqtt.MQTTv5 if protocol == "5" else mqtt.MQTTv311
+    publisher = mqtt.Client(mqtt.CallbackAPIVersion.VERSION1, client_id="bench_publisher", protocol=mqtt_protocol)
+    publisher.max_inflight_messages_set(20)
+    connected = threading.Event()
+    publisher.on_connect = lambda *args: connected.set()
+    publisher.connect(host, port)
+    publisher.loop_start()
+    if not connected.wait(5):
+        raise RuntimeError("발행 클라이언트가 브로커에 연결하지 못했습니다")
+    return publisher
+
+
+def measure_qos(host, port, protocol, qos, messages, timeout=60.0):
+    """
+    QoS 하나에 대해 N개 메시지 발행 → 서버 수신 완료까지 시간 측정
+
+    Returns:
+        float: 초당 메시지 수
+    """
+    # 서버 구독 QoS를 측정 대상 QoS로 맞춰 다시 연결
+    mqtt_client.stop_mqtt()
+    config.MQTT_QOS["joystick"] = qos
+    mqtt_client.start_mqtt()
+    if not mqtt_client.wait_until_connected(5):
+        raise RuntimeError("서버 MQTT 클라이언트가 브로커에 연결하지 못했습니다")
+    time.sleep(0.2)  # 구독 완료 대기
+
+    publisher = create_publisher(host, port, protocol)
+    topic = f"{config.MQTT_TOPIC_PREFIX}/bench/joystick"
+    payloads = [
+        json.dumps({"x": (i % 200) / 100 - 1.0, "y": 0.0}, separators=(",", ":")).encode()
+        for i in range(messages)
+    ]
+
+    base = received_count()
+    start = time.perf_counter()
+    info = None
+    for payload in payloads:
+        info = publisher.publish(topic, payload, qos=qos)
+    info.wait_for_publish(timeout)
+    while received_count() - base < messages and time.perf_counter() - start < timeout:
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    received = received_count() - base
+
+    publisher.disconnect()
+    publisher.loop_stop()
+    return received / elapsed, received
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MQTT QoS별 조이스틱 처리량 벤치마크")
+    parser.add_argument("--messages", type=int, default=5000, help="QoS마다 발행할 메시지 수")
+    parser.add_argument("--host", help="브로커 주소 (지정하지 않으면 테스트 브로커 사용)")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--protocol", choices=["3.1.1", "5"], default="3.1.1")
+    args = parser.parse_args()
+
+    broker = None
+    if args.host is None:
+        if args.protocol == "5":
+            parser.error("--protocol 5는 실제 브로커(--host)에서만 측정할 수 있습니다")
+        broker = StubBroker().start()
+        host, port = broker.host, broker.port
+    else:
+        host, port = args.host, args.port
+
+    config.MQTT_BROKER_HOST = host
+    config.MQTT_BROKER_PORT = port
+    config.MQTT_PROTOCOL = args.protocol
+    config.RATE_LIMIT_ENABLED = False  # 처리량 측정을 위해 속도 제한 해제
+    keyboard_handler.set_backend(NullKeyboard())
+    data_processor.input_scheduler.start()
+
+    try:
+        print(f"브로커: {host}:{port} (MQTT {args.protocol}), 메시지 {args.messages}개")
+        for qos in (0, 1):
+            rate, received = measure_qos(host, port, args.protocol, qos, args.messages)
+            print(f"  QoS {qos}: {rate:10,.0f} msg/s (수신 {received}/{args.messages})")
+    finally:
+        mqtt_client.stop_mqtt()
+        if broker is not None:
+            broker.stop()
+
+    status = data_processor.get_status_snapshot()
+    default_size = len(json.dumps(status, ensure_ascii=False).encode())
+    compact_size = len(json.dumps(status, ensure_ascii=False, separators=(",", ":")).encode())
+    print(f"상태 메시지 크기: 기본 JSON {default_size} B → 공백 없는 JSON {compact_size} B")
+    topic_size = len(f"{config.MQTT_TOPIC_PREFIX}/status".encode())
+    print(f"상태 토픽 이름: {topic_size} B → MQTT v5 토픽 별칭 사용 시 2 B (두 번째 발행부터)")
+
+
+if __name__ == "__main__":
+    main()
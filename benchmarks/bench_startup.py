@@ -0,0 +1,84 @@
+"""
+시작 시간 벤치마크
+
+1. import 시간: 새 프로세스에서 `import game_server.app`에 걸리는 시간 (예산 초과 시 종료 코드 1)
+2. 콜드 스타트: server.py 실행부터 첫 /ping 응답까지 걸리는 시간
+
+실행:
+    python benchmarks/bench_startup.py [--import-budget-ms 300] [--runs 5]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import game_server.app; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+
+def measure_import_ms():
+    """새 프로세스에서 패키지 import 시간 측정 (ms)"""
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT, text=True)
+    return float(output.strip().splitlines()[-1])
+
+
+def find_free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_cold_start_ms(timeout=30.0):
+    """server.py 실행부터 첫 /ping 응답까지 걸리는 시간 측정 (ms)"""
+    port = find_free_port()
+    env = dict(os.environ, MQTT_ENABLED="false")
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "server.py", "--port", str(port)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        url = f"http://127.0.0.1:{port}/ping"
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("서버가 제한 시간 안에 응답하지 않았습니다")
+    finally:
+        process.terminate()
+        process.wait(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시작 시간 벤치마크")
+    parser.add_argument("--import-budget-ms", type=float, default=300.0, help="import 시간 예산 (ms)")
+    parser.add_argument("--runs", type=int, default=5, help="반복 횟수")
+    args = parser.parse_args()
+
+    import_times = [measure_import_ms() for _ in range(args.runs)]
+    cold_starts = [measure_cold_start_ms() for _ in range(args.runs)]
+
+    import_median = statistics.median(import_times)
+    print(f"import game_server.app : 중앙값 {import_median:7.1f} ms (최소 {min(import_times):.1f}, 최대 {max(import_times):.1f})")
+    print(f"콜드 스타트 → 첫 응답  : 중앙값 {statistics.median(cold_starts):7.1f} ms "
+          f"(최소 {min(cold_starts):.1f}, 최대 {max(cold_starts):.1f})")
+
+    if import_median > args.import_budget_ms:
+        print(f"⚠️  import 시간이 예산({args.import_budget_ms:.0f} ms)을 초과했습니다")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
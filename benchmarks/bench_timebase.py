@@ -0,0 +1,55 @@
+"""
+이벤트당 시간 처리 비용 마이크로벤치마크
+
+이전 방식 (datetime.now() + isoformat() + datetime 뺄셈)과
+현재 방식 (time.monotonic_ns() 정수 저장 + 뺄셈)을 비교한다.
+
+실행:
+    python benchmarks/bench_timebase.py
+"""
+
+import os
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_server import timebase  # noqa: E402
+
+ITERATIONS = 200_000
+
+
+def legacy_event(state):
+    """이전 방식: 이벤트마다 datetime 생성, ISO 문자열 생성, 감시 루프의 경과 시간 계산"""
+    now = datetime.now()
+    state["last_time"] = now
+    state["recent_time"] = now.isoformat()
+    return (datetime.now() - state["last_time"]).total_seconds()
+
+
+def monotonic_event(state):
+    """현재 방식: 단조 시간 정수만 저장하고 비교 (ISO 변환은 응답 시에만)"""
+    now = timebase.now_ns()
+    state["last_ns"] = now
+    state["recent_ns"] = now
+    return timebase.now_ns() - state["last_ns"]
+
+
+def main():
+    legacy_state = {}
+    monotonic_state = {}
+
+    legacy = min(timeit.repeat(lambda: legacy_event(legacy_state), number=ITERATIONS, repeat=5))
+    monotonic = min(timeit.repeat(lambda: monotonic_event(monotonic_state), number=ITERATIONS, repeat=5))
+    serialize = min(timeit.repeat(lambda: timebase.isoformat(monotonic_state["recent_ns"]), number=ITERATIONS, repeat=5))
+
+    print(f"이벤트 수: {ITERATIONS}")
+    print(f"  datetime 방식      : {legacy / ITERATIONS * 1e9:8.1f} ns/event")
+    print(f"  monotonic_ns 방식  : {monotonic / ITERATIONS * 1e9:8.1f} ns/event")
+    print(f"  (응답 시) ISO 변환 : {serialize / ITERATIONS * 1e9:8.1f} ns/call")
+    print(f"  개선율             : {legacy / monotonic:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+테스트/벤치마크용 최소 MQTT 3.1.1 브로커
+
+mosquitto 없이 MQTT 연결/재연결 동작이나 처리량을 확인하기 위한 단순 브로커.
+지원: CONNECT, SUBSCRIBE(+/# 와일드카드), PUBLISH(QoS 0/1), PINGREQ, DISCONNECT
+(retain, will, QoS 2, 세션 유지는 지원하지 않음)
+
+실행:
+    python benchmarks/mqtt_stub_broker.py --port 1883
+
+코드에서 사용:
+    broker = StubBroker(port=0).start()
+    ... broker.port ...
+    broker.stop()
+"""
+
+import argparse
+import socket
+import socketserver
+import struct
+import threading
+
+CONNECT, CONNACK, PUBLISH, PUBACK = 1, 2, 3, 4
+SUBSCRIBE, SUBACK, UNSUBSCRIBE, UNSUBACK = 8, 9, 10, 11
+PINGREQ, PINGRESP, DISCONNECT = 12, 13, 14
+
+
+def topic_matches(pattern, topic):
+    """MQTT 토픽 필터 매칭 (+: 한 단계, #: 나머지 전체)"""
+    pattern_parts = pattern.split("/")
+    topic_parts = topic.split("/")
+    for i, part in enumerate(pattern_parts):
+        if part == "#":
+            return True
+        if i >= len(topic_parts):
+            return False
+        if part != "+" and part != topic_parts[i]:
+            return False
+    return len(pattern_parts) == len(topic_parts)
+
+
+def encode_length(length):
+    out = bytearray()
+    while True:
+        byte = length % 128
+        length //= 128
+        if length:
+            byte |= 0x80
+        out.append(byte)
+        if not length:
+            return bytes(out)
+
+
+def read_exact(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        data += chunk
+    return data
+
+
+def read_packet(sock):
+    header = read_exact(sock, 1)[0]
+    multiplier, length = 1, 0
+    while True:
+        byte = read_exact(sock, 1)[0]
+        length += (byte & 0x7F) * multiplier
+        if not byte & 0x80:
+            break
+        multiplier *= 128
+    return header >> 4, header & 0x0F, read_exact(sock, length) if length else b""
+
+
+class _ClientHandler(socketserver.BaseRequestHandler):
+    def setup(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.send_lock = threading.Lock()
+        self.subscriptions = {}  # {topic_filter: qos}
+        self.next_packet_id = 1
+
+    def send(self, data):
+        with self.send_lock:
+            self.request.sendall(data)
+
+    def deliver(self, topic, payload, qos):
+        topic_bytes = topic.encode("utf-8")
+        body = struct.pack("!H", len(topic_bytes)) + topic_bytes
+        flags = 0
+        if qos:
+            flags = 0x02
+            body += struct.pack("!H", self.next_packet_id)
+            self.next_packet_id = self.next_packet_id % 65535 + 1
+        body += payload
+        self.send(bytes([(PUBLISH << 4) | flags]) + encode_length(len(body)) + body)
+
+    def handle(self):
+        broker = self.server.broker
+        try:
+            while True:
+                packet_type, flags, body = read_packet(self.request)
+                if packet_type == CONNECT:
+                    broker.connect_count += 1
+                    self.send(bytes([CONNACK << 4, 2, 0, 0]))
+                    with broker.lock:
+                        broker.clients.add(self)
+                elif packet_type == SUBSCRIBE:
+                    packet_id = body[:2]
+                    offset, granted = 2, bytearray()
+                    while offset < len(body):
+                        size = struct.unpack("!H", body[offset:offset + 2])[0]
+                        topic_filter = body[offset + 2:offset + 2 + size].decode("utf-8")
+                        qos = min(body[offset + 2 + size], 1)
+                        self.subscriptions[topic_filter] = qos
+                        granted.append(qos)
+                        offset += 3 + size
+                    self.send(bytes([(SUBACK << 4)]) + encode_length(2 + len(granted)) + packet_id + bytes(granted))
+                elif packet_type == UNSUBSCRIBE:
+                    self.send(bytes([UNSUBACK << 4, 2]) + body[:2])
+                elif packet_type == PUBLISH:
+                    qos = (flags >> 1) & 0x03
+                    size = struct.unpack("!H", body[:2])[0]
+                    topic = body[2:2 + size].decode("utf-8")
+                    offset = 2 + size
+                    if qos:
+                        self.send(bytes([PUBACK << 4, 2]) + body[offset:offset + 2])
+                        offset += 2
+                    broker.publish(topic, body[offset:], qos)
+                elif packet_type == PINGREQ:
+                    self.send(bytes([PINGRESP << 4, 0]))
+                elif packet_type == DISCONNECT:
+                    return
+        except (ConnectionError, OSError):
+            return
+        finally:
+            with broker.lock:
+                broker.clients.discard(self)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class StubBroker:
+    """최소 MQTT 브로커 (백그라운드 스레드에서 실행)"""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self._server = _Server((host, port), _ClientHandler)
+        self._server.broker = self
+        self.host = host
+        self.port = self._server.server_address[1]
+        self.lock = threading.Lock()
+        self.clients = set()
+        self.connect_count = 0
+        self.published_count = 0
+        self._thread = None
+
+    def publish(self, topic, payload, qos):
+        self.published_count += 1
+        with self.lock:
+            clients = list(self.clients)
+        for client in clients:
+            for topic_filter, sub_qos in client.subscriptions.items():
+                if topic_matches(topic_filter, topic):
+                    try:
+                        client.deliver(topic, payload, min(qos, sub_qos))
+                    except OSError:
+                        pass
+                    break
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-broker", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        with self.lock:
+            clients = list(self.clients)
+        for client in clients:
+            try:
+                client.request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="테스트용 최소 MQTT 브로커")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1883)
+    args = parser.parse_args()
+
+    broker = StubBroker(args.host, args.port)
+    print(f"MQTT 테스트 브로커 실행 중: {broker.host}:{broker.port} (Ctrl+C로 종료)")
+    try:
+        broker._server.serve_forever()
+    except KeyboardInterrupt:
+        broker.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+입력 타이밍 시뮬레이션 (가상 시간)
+
+game_server/simulation.py로 조이스틱/버튼/세션 입력과 입력 감시 루프를 가상 시간에서 실행하여
+키가 눌린 채 남거나(stuck) 해제가 늦어지는 문제를 확인한다. 실제 sleep과 디스플레이가 필요 없다.
+실패한 시나리오가 있으면 종료 코드 1.
+
+실행:
+    python benchmarks/sim_input.py [--soak-seconds 3600] [--seed 1]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_server import codec  # noqa: E402
+from game_server import config  # noqa: E402
+from game_server import session  # noqa: E402
+from game_server import simulation  # noqa: E402
+from game_server import timebase  # noqa: E402
+from game_server import tunables  # noqa: E402
+from game_server import watchdog  # noqa: E402
+from game_server.keys import Key  # noqa: E402
+
+TICK = watchdog.WATCHDOG_INTERVAL
+RELEASE_MIN = config.ADAPTIVE_RELEASE_MIN
+RELEASE_MAX = config.ADAPTIVE_RELEASE_MAX
+
+# 2P 컨트롤러 키 매핑 (1P와 키가 겹치지 않도록 시뮬레이션에서만 지정)
+P2_MAPPING = {"up": 'w', "down": 's', "left": 'a', "right": 'd', "A": 'f', "B": 'g', "X": '2', "Y": ''}
+
+
+def release_time(sim, key, after_ns):
+    """after_ns 이후 처음 key를 뗀 시각 (가상 시간 초, 없으면 None)"""
+    for t_ns, action, k in sim.keyboard.events:
+        if t_ns >= after_ns and action == "release" and k == key:
+            return (t_ns - after_ns) / 1_000_000_000
+    return None
+
+
+def scenario_periodic_disconnect(sim):
+    """50Hz로 보내던 클라이언트가 끊기면 학습한 해제 기한(하한 ADAPTIVE_RELEASE_MIN) 안에 키 해제"""
+    sim.every(0.02, sim.joystick, 1.0, 0.0, until=30.0)
+    sim.run_until(30.0)
+    failures = []
+    if Key.right not in sim.keyboard.held:
+        failures.append("샘플을 받는 동안 → 키가 눌려 있지 않음")
+    last_ns = sim.clock.now
+    sim.run_for(RELEASE_MAX)
+    latency = release_time(sim, Key.right, last_ns)
+    if latency is None or latency > RELEASE_MIN + TICK:
+        failures.append(f"끊긴 뒤 해제가 늦음: {latency} s (기한 {RELEASE_MIN + TICK} s)")
+    return failures
+
+
+def scenario_change_only_hold(sim):
+    """값이 바뀔 때만 보내는 클라이언트: 8초 동안 샘플이 없어도 키 유지, 중립 샘플에 바로 해제"""
+    sim.at(0.0, sim.joystick, 0.0, 1.0)
+    sim.at(8.0, sim.joystick, 0.0, 0.0)
+    sim.run_until(7.9)
+    failures = []
+    if Key.up not in sim.keyboard.held:
+        failures.append("샘플 없이 유지하는 동안 ↑ 키가 해제됨")
+    sim.run_until(8.0)
+    if Key.up in sim.keyboard.held:
+        failures.append("중립 샘플 후에도 ↑ 키가 눌려 있음")
+    return failures
+
+
+def scenario_button_vanish(sim):
+    """버튼을 누른 채 클라이언트가 사라지면 INACTIVITY_RELEASE_TIMEOUT × 3 안에 해제"""
+    sim.at(0.0, sim.button, "A", True)
+    sim.run_until(10.0)
+    limit = tunables.current.inactivity_release_timeout * 3 + TICK
+    latency = release_time(sim, Key.space, sim.start_ns)
+    if latency is None or latency > limit:
+        return [f"버튼 키 해제가 늦음: {latency} s (기한 {limit} s)"]
+    return []
+
+
+def scenario_session_expiry(sim):
+    """세션이 keepalive 없이 끊기면 keepalive 간격 × SESSION_MISSED_KEEPALIVES 안에 모든 키 해제"""
+    keyframe = codec.SessionFrame(
+        "sim", codec.FRAME_KEYFRAME, 1, codec.JoystickEvent(-1.0, 0.0, 0, False), (codec.ButtonEvent("B", True),), None, None
+    )
+    sim.at(0.0, sim.frame, keyframe)
+    for seq, t in enumerate((0.2, 0.4, 0.6), start=2):
+        sim.at(t, sim.frame, codec.SessionFrame("sim", codec.FRAME_KEEPALIVE, seq, None, (), None, None))
+    sim.run_until(0.6)
+    failures = []
+    if not {Key.left, Key.enter} <= set(sim.keyboard.held):
+        failures.append(f"keepalive 동안 키가 유지되지 않음: {set(sim.keyboard.held)}")
+    sim.run_until(5.0)
+    limit = config.SESSION_KEEPALIVE_INTERVAL * config.SESSION_MISSED_KEEPALIVES + TICK
+    for key in (Key.left, Key.enter):
+        latency = release_time(sim, key, sim.start_ns + timebase.seconds_to_ns(0.6))
+        if latency is None or latency > limit:
+            failures.append(f"세션 만료 후 {key} 해제가 늦음: {latency} s (기한 {limit} s)")
+    return failures
+
+
+def keyframe(session_id, seq, x, buttons=(), controller=None):
+    return codec.SessionFrame(
+        session_id, codec.FRAME_KEYFRAME, seq, codec.JoystickEvent(x, 0.0, 0, False),
+        tuple(codec.ButtonEvent(button, True) for button in buttons), None, controller
+    )
+
+
+def keepalive(session_id, seq):
+    return codec.SessionFrame(session_id, codec.FRAME_KEEPALIVE, seq, None, (), None, None)
+
+
+def scenario_session_takeover(sim):
+    """새 세션이 컨트롤러를 이어받으면 이전 세션이 만료되어도 새 세션이 누르고 있는 키는 유지"""
+    expired = session.session_stats["expired"]
+    sim.at(0.0, sim.frame, keyframe("old", 1, -1.0, ("B",)))
+    sim.at(0.1, sim.frame, keyframe("new", 1, -1.0, ("B",)))
+    for seq, t in enumerate([0.1 + 0.2 * i for i in range(1, 15)], start=2):
+        sim.at(t, sim.frame, keepalive("new", seq))
+    sim.run_until(2.9)
+    failures = []
+    if session.session_stats["expired"] - expired != 1:
+        failures.append("이전 세션이 만료되지 않음")
+    if not {Key.left, Key.enter} <= set(sim.keyboard.held):
+        failures.append(f"이전 세션 만료 때 새 세션의 키가 해제됨: {set(sim.keyboard.held)}")
+    sim.run_until(5.0)
+    if sim.keyboard.held:
+        failures.append(f"새 세션 만료 후에도 눌린 키: {set(sim.keyboard.held)}")
+    return failures
+
+
+def scenario_session_rebind(sim):
+    """같은 세션 ID가 다른 컨트롤러의 keyframe을 보내면 이전 컨트롤러의 키를 바로 해제"""
+    replaced = session.session_stats["replaced"]
+    config.CONTROLLER_KEY_MAPPINGS["p2"] = P2_MAPPING
+    try:
+        sim.at(0.0, sim.frame, keyframe("rebind", 1, -1.0, ("A",), controller="p2"))
+        sim.at(0.1, sim.frame, keyframe("rebind", 2, 1.0))
+        sim.run_until(0.1)
+        failures = []
+        p2 = sim.controller("p2")
+        if {'a', 'f'} & set(sim.keyboard.held):
+            failures.append(f"옮겨간 세션의 이전 컨트롤러 키가 남음: {set(sim.keyboard.held)}")
+        if p2.session is not None:
+            failures.append("이전 컨트롤러가 종료된 세션을 계속 참조함 (입력 감시 제외)")
+        if Key.right not in sim.keyboard.held:
+            failures.append("새 컨트롤러의 키가 눌리지 않음")
+        if session.session_stats["replaced"] - replaced != 1:
+            failures.append("이전 세션이 종료되지 않음")
+    finally:
+        del config.CONTROLLER_KEY_MAPPINGS["p2"]
+    return failures
+
+
+def scenario_other_controller(sim):
+    """2P가 끊겨도 1P가 누르고 있는 키는 유지"""
+    config.CONTROLLER_KEY_MAPPINGS["p2"] = P2_MAPPING
+    try:
+        sim.every(0.02, sim.joystick, 1.0, 0.0, until=20.0)
+        sim.every(0.02, sim.joystick, -1.0, 0.0, "p2", until=5.0)
+        sim.run_until(20.0)
+    finally:
+        del config.CONTROLLER_KEY_MAPPINGS["p2"]
+    failures = []
+    if 'a' in sim.keyboard.held:
+        failures.append("끊긴 2P의 키가 해제되지 않음")
+    if Key.right not in sim.keyboard.held:
+        failures.append("2P가 끊길 때 1P 키가 해제됨")
+    return failures
+
+
+def scenario_soak(sim, seconds, seed):
+    """무작위 조이스틱/버튼 입력과 끊김을 반복한 뒤 모든 입력이 멈추면 키가 남지 않아야 함"""
+    rng = random.Random(seed)
+    t = 0.0
+    while t < seconds:
+        burst_end = t + rng.uniform(0.5, 20.0)
+        interval = rng.choice((0.016, 0.02, 0.05, 0.1))
+        while t < burst_end:
+            # 임계값 근처 값도 섞어서 히스테리시스 경계 확인
+            x = rng.choice((0.0, 1.0, -1.0, rng.uniform(-0.5, 0.5)))
+            y = rng.choice((0.0, 1.0, -1.0, rng.uniform(-0.5, 0.5)))
+            sim.at(t, sim.joystick, x, y)
+            if rng.random() < 0.05:
+                sim.at(t, sim.button, rng.choice(("A", "B", "X")), rng.random() < 0.5)
+            t += interval * rng.uniform(0.5, 1.5)
+        # 끊김 (중립을 보내지 않고 사라짐)
+        t += rng.uniform(0.0, 15.0)
+    sim.run_until(t + RELEASE_MAX + TICK)
+    failures = []
+    if sim.keyboard.held:
+        failures.append(f"입력이 멈춘 뒤에도 눌린 키: {sim.keyboard.stuck_keys(0)}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="입력 타이밍 시뮬레이션")
+    parser.add_argument("--soak-seconds", type=float, default=3600.0, help="무작위 입력 시뮬레이션 길이 (가상 초)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    scenarios = [
+        ("주기 전송 후 끊김", scenario_periodic_disconnect),
+        ("변경 시에만 전송", scenario_change_only_hold),
+        ("버튼 누른 채 끊김", scenario_button_vanish),
+        ("세션 keepalive 만료", scenario_session_expiry),
+        ("세션 이어받기", scenario_session_takeover),
+        ("세션 컨트롤러 변경", scenario_session_rebind),
+        ("다른 컨트롤러 끊김", scenario_other_controller),
+        ("무작위 입력", lambda sim: scenario_soak(sim, args.soak_seconds, args.seed)),
+    ]
+
+    failed = 0
+    print(f"{'시나리오':<20} {'가상 시간':>10} {'실제 시간':>10} {'배속':>10}  결과")
+    for name, scenario in scenarios:
+        start = time.perf_counter()
+        with simulation.Simulation() as sim:
+            failures = scenario(sim)
+            if sim.keyboard.spurious_releases:
+                failures.append(f"눌리지 않은 키를 뗀 횟수: {sim.keyboard.spurious_releases}")
+            simulated = sim.elapsed
+        real = time.perf_counter() - start
+        print(f"{name:<20} {simulated:>9.1f}s {real:>9.3f}s {simulated / real:>9.0f}x  {'OK' if not failures else 'FAIL'}")
+        for failure in failures:
+            print(f"    - {failure}")
+        failed += bool(failures)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,16 +3,28 @@ Flask 애플리케이션 모듈
 웹 서버 및 API 라우트 정의
 """
 
-from datetime import datetime
-
 from flask import Flask, request, jsonify, render_template
 from flask_cors import CORS
 
 import os
 
+from . import codec
 from . import config
+from . import counters
 from . import data_processor
+from . import emitter_process
+from . import history
+from . import http_server
 from . import keyboard_handler
+from . import logger
+from . import macros
+from . import mqtt_client
+from . import rate_limit
+from . import realtime
+from . import session
+from . import timebase
+from . import tunables
+from . import users
 from . import utils
 
 # Flask 앱 초기화 - 템플릿 폴더 경로 명시
@@ -20,52 +32,64 @@ template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templat
 app = Flask(__name__, template_folder=template_dir)
 CORS(app)
 
-# 서버 IP 주소 캐싱 (성능 최적화)
-_cached_server_ips = [None]  # 리스트로 래핑하여 참조 전달
-
 # 접속자 정보 추적
-connected_users = {}  # {ip: {"first_seen": datetime, "last_seen": datetime, "request_count": int}}
+connected_users = users.ConnectedUsers(max_entries=config.MAX_CONNECTED_USERS)  # 최근 활동 순 정렬
 
 
 def update_user_activity():
     """접속자 활동 정보 업데이트"""
-    ip = request.remote_addr
-    now = datetime.now()
-    
-    if ip not in connected_users:
-        connected_users[ip] = {
-            "first_seen": now,
-            "last_seen": now,
-            "request_count": 0
-        }
-    
-    connected_users[ip]["last_seen"] = now
-    connected_users[ip]["request_count"] += 1
+    connected_users.touch(request.remote_addr)
 
 
 def cleanup_inactive_users():
-    """오래된 접속자 정보 정리 (메모리 최적화)"""
-    now = datetime.now()
-    inactive_ips = []
+    """오래된 접속자 정보 정리 (메모리 최적화: 가장 오래된 쪽에서 만료된 항목만 제거)"""
+    removed = connected_users.expire(tunables.current.user_cleanup_timeout)
     
-    for ip, info in connected_users.items():
-        elapsed = (now - info["last_seen"]).total_seconds()
-        if elapsed > config.USER_CLEANUP_TIMEOUT:
-            inactive_ips.append(ip)
-    
-    # 비활성 접속자 제거
-    for ip in inactive_ips:
-        del connected_users[ip]
-    
-    if inactive_ips:
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [Cleanup] {len(inactive_ips)}명의 비활성 접속자 제거됨")
+    if removed:
+        logger.log("Cleanup", f"{removed}명의 비활성 접속자 제거됨")
+
+
+@app.after_request
+def count_request(response):
+    """엔드포인트별 요청/에러 수 (라우트 규칙 기준, 없는 경로는 "unmatched")"""
+    rule = request.url_rule
+    slots = counters.endpoint_counters.slots(rule.rule if rule is not None else "unmatched")
+    counters.add(slots[counters.ENDPOINT_REQUESTS])
+    if response.status_code >= 400:
+        counters.add(slots[counters.ENDPOINT_ERRORS])
+    return response
+
+
+def get_client_key():
+    """속도 제한용 클라이언트 식별자 (IP - 클라이언트가 보내는 헤더는 요청마다 바꿔 제한을 피할 수 있으므로 사용하지 않음)"""
+    return request.remote_addr
+
+
+def throttled_response(event_type):
+    """속도 제한 초과 응답 (429, JSON 파싱 없이 즉시 반환)"""
+    response = jsonify({"status": "error", "message": "Too many requests"})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(rate_limit.retry_after_seconds(event_type))
+    return response
+
+
+def input_response(result):
+    """입력 처리 결과 응답 (입력 큐가 가득 차면 503 + Retry-After, 그 외 에러는 400)"""
+    if result.get("overloaded"):
+        response = jsonify(result)
+        response.status_code = 503
+        response.headers["Retry-After"] = str(data_processor.QUEUE_FULL_RETRY_AFTER)
+        return response
+    if result["status"] == "error":
+        return jsonify(result), 400
+    return jsonify(result)
 
 
 @app.route('/', methods=['GET'])
 def dashboard():
     """메인 대시보드 HTML 페이지"""
-    # 서버 IP 주소를 미리 가져와서 템플릿에 삽입 (성능 최적화)
-    server_ips = utils.get_all_local_ips(use_cache=True, cache_var=_cached_server_ips)
+    # 서버 IP 주소 스냅샷을 템플릿에 삽입 (백그라운드 스레드가 갱신 - 블로킹 조회 없음)
+    server_ips = utils.get_server_ips()
     server_port = app.config.get("SERVER_PORT", config.DEFAULT_SERVER_PORT)
     ip_links_html = ', '.join([
         f'<a href="http://{ip}:{server_port}" class="ip-link" target="_blank">http://{ip}:{server_port}</a>'
@@ -84,33 +108,58 @@ def dashboard():
                          ip_list_text=ip_list_text)
 
 
-@app.route('/users', methods=['GET'])
-def get_users():
-    """접속자 목록 반환"""
+def collect_users():
+    """접속자 목록 응답 데이터 (Flask 라우트와 asyncio 서버 공용)"""
     # 비활성 접속자 정리 (최적화)
     cleanup_inactive_users()
     
-    now = datetime.now()
+    now = timebase.now_ns()
     users_list = []
     
-    for ip, info in connected_users.items():
-        elapsed = (now - info["last_seen"]).total_seconds()
+    # 스냅샷은 이미 최근 활동 순(최신 먼저)이므로 별도 정렬 불필요
+    for ip, info in connected_users.snapshot():
+        elapsed = timebase.elapsed_seconds(info["last_seen"], now)
         users_list.append({
             "ip": ip,
-            "first_seen": info["first_seen"].isoformat(),
-            "last_seen": info["last_seen"].isoformat(),
+            "first_seen": timebase.isoformat(info["first_seen"]),
+            "last_seen": timebase.isoformat(info["last_seen"]),
             "request_count": info["request_count"],
             "elapsed_seconds": round(elapsed, 2)
         })
     
-    # 마지막 활동 시간 순으로 정렬
-    users_list.sort(key=lambda x: x["last_seen"], reverse=True)
-    
-    return jsonify({
+    return {
         "status": "ok",
         "total_users": len(users_list),
         "users": users_list
-    })
+    }
+
+
+def collect_status():
+    """서버 상태 응답 데이터 (Flask 라우트와 asyncio 서버 공용)"""
+    # 공통 상태 정보 (시간 값은 여기서만 ISO 문자열로 변환)
+    status = data_processor.get_status_snapshot()
+    
+    # 서버 IP 주소 스냅샷 (백그라운드 스레드가 갱신)
+    status["server_ips"] = utils.get_server_ips()
+    status["rate_limit"] = rate_limit.get_rate_limit_stats()
+    status["input_queue"] = data_processor.input_scheduler.get_stats()
+    status["logging"] = dict(logger.log_stats)
+    status["mqtt"] = mqtt_client.get_mqtt_stats()
+    status["controllers"] = data_processor.get_controller_stats()
+    status["http_server"] = http_server.get_server_stats()
+    status["emitter"] = emitter_process.get_emitter_stats()
+    status["realtime"] = realtime.get_realtime_stats()
+    status["sessions"] = session.get_session_stats()
+    status["macros"] = macros.get_macro_stats()
+    status["tunables"] = tunables.get_tunables_stats()
+    status["counters"] = counters.get_counter_stats()
+    return status
+
+
+@app.route('/users', methods=['GET'])
+def get_users():
+    """접속자 목록 반환"""
+    return jsonify(collect_users())
 
 
 @app.route('/ping', methods=['GET'])
@@ -120,7 +169,7 @@ def ping():
     return jsonify({
         "status": "ok",
         "message": "Server is running",
-        "server_time": datetime.now().isoformat()
+        "server_time": timebase.isoformat(timebase.now_ns())
     })
 
 
@@ -128,54 +177,21 @@ def ping():
 def get_status():
     """서버 상태 및 데이터 수신 통계 확인"""
     update_user_activity()
-    now = datetime.now()
-    
-    # 마지막 수신으로부터 경과 시간 계산
-    joystick_elapsed = None
-    button_elapsed = None
-    
-    if data_processor.stats["last_joystick_time"]:
-        joystick_elapsed = (now - data_processor.stats["last_joystick_time"]).total_seconds()
-    
-    if data_processor.stats["last_button_time"]:
-        button_elapsed = (now - data_processor.stats["last_button_time"]).total_seconds()
-    
-    # 데이터 수신 여부 판단 (5초 이내면 활성)
-    joystick_active = joystick_elapsed is not None and joystick_elapsed < 5.0
-    button_active = button_elapsed is not None and button_elapsed < 5.0
-    
-    # 서버 IP 주소 가져오기 (캐시 사용)
-    server_ips = utils.get_all_local_ips(use_cache=True, cache_var=_cached_server_ips)
+    return jsonify(collect_status())
+
+
+@app.route('/history', methods=['GET'])
+def get_history():
+    """
+    입력 통계 기록 (대시보드 차트용 - 해상도별 초당 입력/키 전환/에러 수, 입력 지연 p50/p99)
     
-    return jsonify({
-        "status": "ok",
-        "server_running": True,
-        "server_start_time": data_processor.stats["server_start_time"].isoformat(),
-        "current_time": now.isoformat(),
-        "server_ips": server_ips,
-        "statistics": {
-            "joystick": {
-                "total_received": data_processor.stats["joystick_count"],
-                "last_received": data_processor.stats["last_joystick_time"].isoformat() if data_processor.stats["last_joystick_time"] else None,
-                "elapsed_seconds": round(joystick_elapsed, 2) if joystick_elapsed is not None else None,
-                "is_active": joystick_active
-            },
-            "button": {
-                "total_received": data_processor.stats["button_count"],
-                "last_received": data_processor.stats["last_button_time"].isoformat() if data_processor.stats["last_button_time"] else None,
-                "elapsed_seconds": round(button_elapsed, 2) if button_elapsed is not None else None,
-                "is_active": button_active
-            }
-        },
-        "recent_data": {
-            "joystick": data_processor.recent_data["last_joystick"],
-            "button": data_processor.recent_data["last_button"]
-        },
-        "summary": {
-            "receiving_data": joystick_active or button_active,
-            "message": "데이터 수신 중" if (joystick_active or button_active) else "데이터 수신 대기 중"
-        }
-    })
+    ?resolution=10 으로 한 해상도만 요청 가능 (기본: 전체)
+    """
+    resolution = request.args.get("resolution", type=int)
+    data = history.input_history.snapshot(resolution)
+    if resolution is not None and not data:
+        return jsonify({"status": "error", "message": f"Unknown resolution: {resolution}"}), 400
+    return jsonify({"status": "ok", "metrics": history.METRICS, "resolutions": data})
 
 
 @app.route('/joystick', methods=['POST', 'OPTIONS'])
@@ -200,35 +216,44 @@ def receive_joystick():
     if request.method == 'OPTIONS':
         return jsonify({"status": "ok"}), 200
     
+    # 속도 제한 확인 (JSON 파싱 전에 차단하여 폭주 시 비용 최소화)
+    if not rate_limit.allow_event("joystick", get_client_key(), source="HTTP"):
+        return throttled_response("joystick")
+    
     try:
         update_user_activity()
         
+        # 바이너리/msgpack 형식은 dict를 거치지 않고 바로 이벤트로 디코딩
+        codec_name = codec.codec_for_content_type(request.content_type)
+        if codec_name is not None and codec_name != codec.JSON:
+            try:
+                event = codec.decode_joystick(request.get_data(cache=False), codec_name)
+            except ValueError as e:
+                logger.error("Joystick", f"⚠️ 400 에러: {e}")
+                return jsonify({"status": "error", "message": str(e)}), 400
+            result = data_processor.submit_joystick_event(event, source="HTTP")
+            return input_response(result)
+        
         # Content-Type 확인
         if not request.is_json:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [Joystick] ⚠️ 400 에러: Content-Type이 application/json이 아닙니다. Content-Type: {request.content_type}")
-            return jsonify({"status": "error", "message": "Content-Type must be application/json"}), 400
+            logger.error("Joystick", f"⚠️ 400 에러: 지원하지 않는 Content-Type입니다. Content-Type: {request.content_type}")
+            return jsonify({"status": "error", "message": "Content-Type must be application/json, application/octet-stream or application/msgpack"}), 400
         
         data = request.get_json()
         
         # 데이터 유효성 검사
         if data is None:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [Joystick] ⚠️ 400 에러: JSON 데이터가 없습니다")
+            logger.error("Joystick", "⚠️ 400 에러: JSON 데이터가 없습니다")
             return jsonify({"status": "error", "message": "No JSON data provided"}), 400
         
         # 공통 처리 함수 호출
-        result = data_processor.process_joystick_data_internal(data, source="HTTP")
-        
-        if result["status"] == "error":
-            return jsonify(result), 400
+        result = data_processor.submit_joystick_data(data, source="HTTP")
         
-        return jsonify(result)
+        return input_response(result)
         
     except Exception as e:
         error_msg = f"Error receiving joystick data: {e}"
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [Joystick] ⚠️ 400 에러: {error_msg}")
-        import traceback
-        if config.ENABLE_VERBOSE_LOGGING:
-            traceback.print_exc()
+        logger.exception("Joystick", f"⚠️ 400 에러: {error_msg}")
         return jsonify({"status": "error", "message": str(e)}), 400
 
 
@@ -247,41 +272,163 @@ def receive_button():
     if request.method == 'OPTIONS':
         return jsonify({"status": "ok"}), 200
     
+    # 속도 제한 확인 (JSON 파싱 전에 차단하여 폭주 시 비용 최소화)
+    if not rate_limit.allow_event("button", get_client_key(), source="HTTP"):
+        return throttled_response("button")
+    
     try:
         update_user_activity()
         
+        # 바이너리/msgpack 형식은 dict를 거치지 않고 바로 이벤트로 디코딩
+        codec_name = codec.codec_for_content_type(request.content_type)
+        if codec_name is not None and codec_name != codec.JSON:
+            try:
+                event = codec.decode_button(request.get_data(cache=False), codec_name)
+            except ValueError as e:
+                logger.error("Button", f"⚠️ 400 에러: {e}")
+                return jsonify({"status": "error", "message": str(e)}), 400
+            result = data_processor.submit_button_event(event, source="HTTP")
+            return input_response(result)
+        
         # Content-Type 확인
         if not request.is_json:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [Button] ⚠️ 400 에러: Content-Type이 application/json이 아닙니다. Content-Type: {request.content_type}")
-            return jsonify({"status": "error", "message": "Content-Type must be application/json"}), 400
+            logger.error("Button", f"⚠️ 400 에러: 지원하지 않는 Content-Type입니다. Content-Type: {request.content_type}")
+            return jsonify({"status": "error", "message": "Content-Type must be application/json, application/octet-stream or application/msgpack"}), 400
         
         data = request.get_json()
         
         # 데이터 유효성 검사
         if data is None:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [Button] ⚠️ 400 에러: JSON 데이터가 없습니다")
+            logger.error("Button", "⚠️ 400 에러: JSON 데이터가 없습니다")
             return jsonify({"status": "error", "message": "No JSON data provided"}), 400
         
         # 공통 처리 함수 호출
-        result = data_processor.process_button_data_internal(data, source="HTTP")
-        
-        if result["status"] == "error":
-            return jsonify(result), 400
+        result = data_processor.submit_button_data(data, source="HTTP")
         
-        return jsonify(result)
+        return input_response(result)
         
     except Exception as e:
         error_msg = f"Error receiving button data: {e}"
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [Button] ⚠️ 400 에러: {error_msg}")
-        import traceback
-        if config.ENABLE_VERBOSE_LOGGING:
-            traceback.print_exc()
+        logger.exception("Button", f"⚠️ 400 에러: {error_msg}")
         return jsonify({"status": "error", "message": str(e)}), 400
 
 
+@app.route('/chord', methods=['POST', 'OPTIONS'])
+def receive_chord():
+    """
+    여러 버튼(및 조이스틱)을 한 번에 키보드 입력으로 변환
+    
+    받는 데이터:
+    {
+        "buttons": ["A", "B"],   # 지금 눌려 있는 버튼 전체 (비트마스크 정수도 가능: A=1, B=2, X=4, Y=8)
+        "x": 0.5, "y": 0.0       # 선택 - 없으면 조이스틱은 그대로 둠
+    }
+    
+    이전 상태와 비교하여 바뀐 버튼만 한 번에 누르거나 뗌
+    """
+    # OPTIONS 요청 처리 (CORS preflight)
+    if request.method == 'OPTIONS':
+        return jsonify({"status": "ok"}), 200
+    
+    # 속도 제한 확인 (버튼과 같은 제한 적용)
+    if not rate_limit.allow_event("button", get_client_key(), source="HTTP"):
+        return throttled_response("button")
+    
+    try:
+        update_user_activity()
+        
+        codec_name = codec.codec_for_content_type(request.content_type)
+        if codec_name is None:
+            logger.error("Chord", f"⚠️ 400 에러: 지원하지 않는 Content-Type입니다. Content-Type: {request.content_type}")
+            return jsonify({"status": "error", "message": "Content-Type must be application/json, application/octet-stream or application/msgpack"}), 400
+        
+        try:
+            event = codec.decode_chord(request.get_data(cache=False), codec_name)
+        except ValueError as e:
+            logger.error("Chord", f"⚠️ 400 에러: {e}")
+            return jsonify({"status": "error", "message": str(e)}), 400
+        
+        result = data_processor.submit_chord_event(event, source="HTTP")
+        return input_response(result)
+        
+    except Exception as e:
+        logger.exception("Chord", f"⚠️ 400 에러: Error receiving chord data: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+
+@app.route('/session', methods=['POST', 'OPTIONS'])
+def receive_session_frame():
+    """
+    세션 프레임 처리 (keepalive + keyframe/delta 입력 동기화, game_server/session.py)
+    
+    받는 데이터:
+    {
+        "session": "phone-1",        # 클라이언트가 정한 세션 ID
+        "type": "delta",             # "keyframe", "delta", "keepalive", "bye"
+        "seq": 42,                   # 프레임 번호 (이전 이하이면 버림)
+        "joystick": {"x": 0.5, "y": 0.0},
+        "buttons": {"A": true},
+        "keepalive_ms": 250          # keepalive 간격 (선택)
+    }
+    
+    알 수 없는 세션의 delta/keepalive는 409와 {"resync": true}로 응답 (keyframe 재전송 필요)
+    """
+    # OPTIONS 요청 처리 (CORS preflight)
+    if request.method == 'OPTIONS':
+        return jsonify({"status": "ok"}), 200
+    
+    # 세션 프레임은 조이스틱과 같은 속도 제한 적용 (keepalive 포함)
+    if not rate_limit.allow_event("joystick", get_client_key(), source="HTTP"):
+        return throttled_response("joystick")
+    
+    try:
+        update_user_activity()
+        
+        codec_name = codec.codec_for_content_type(request.content_type) or codec.JSON
+        try:
+            frame = codec.decode_session(request.get_data(cache=False), codec_name)
+        except ValueError as e:
+            logger.error("Session", f"⚠️ 400 에러: {e}")
+            return jsonify({"status": "error", "message": str(e)}), 400
+        
+        result = session.handle_frame(frame, source="HTTP")
+        if result.get("resync"):
+            return jsonify(result), 409
+        return input_response(result)
+        
+    except Exception as e:
+        logger.exception("Session", f"⚠️ 400 에러: Error receiving session frame: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+
+@app.route('/macro', methods=['POST'])
+def control_macro():
+    """
+    매크로 재생/취소 (버튼 매핑 없이 직접 실행할 때)
+    
+    받는 데이터:
+    {"action": "start", "macro": "hadouken"}   # 재생 → {"id": 재생 ID}
+    {"action": "cancel", "id": 3}              # 취소 (id가 없으면 모든 매크로 취소)
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"status": "error", "message": "No JSON data provided"}), 400
+    
+    action = data.get("action", "start")
+    if action == "start":
+        run_id = macros.player.start(data.get("macro"))
+        if run_id is None:
+            return jsonify({"status": "error", "message": f"Cannot start macro: {data.get('macro')}"}), 400
+        return jsonify({"status": "ok", "id": run_id})
+    if action == "cancel":
+        return jsonify({"status": "ok", "cancelled": macros.player.cancel(run_id=data.get("id"))})
+    return jsonify({"status": "error", "message": f"Unknown action: {action}"}), 400
+
+
 @app.route('/stop', methods=['POST'])
 def stop_all():
-    """모든 키 입력 중지"""
+    """모든 키 입력 중지 (재생 중인 매크로 포함)"""
+    macros.player.cancel()
     keyboard_handler.release_all_keys()
     return jsonify({"status": "ok", "message": "All keys released"})
 
@@ -293,21 +440,11 @@ def reset_all_states():
     키 상태, 조이스틱 상태, 버튼 상태 모두 초기화
     """
     try:
-        # 모든 키 해제
-        keyboard_handler.release_all_keys()
-        
-        # 조이스틱 상태 초기화
-        data_processor.last_joystick_state["x"] = 0.0
-        data_processor.last_joystick_state["y"] = 0.0
-        data_processor.last_joystick_state["keys"] = set()
-        data_processor.last_joystick_state["is_active"] = False
-        data_processor.last_joystick_state["active_keys"] = set()
-        
-        # 버튼 상태 초기화
-        data_processor.last_button_states.clear()
+        # 모든 키 해제 및 모든 컨트롤러의 조이스틱/버튼 상태 초기화
+        data_processor.reset_all_states_internal()
         
         if config.ENABLE_VERBOSE_LOGGING:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [Reset] 모든 상태 초기화됨")
+            logger.verbose("Reset", "모든 상태 초기화됨")
         
         return jsonify({
             "status": "ok",
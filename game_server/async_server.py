@@ -0,0 +1,426 @@
+"""
+asyncio HTTP 서버 모듈
+연결마다 스레드를 두지 않고 이벤트 루프 하나에서 모든 연결을 처리하는 서버 모드 (--server async)
+
+- 입력/상태 엔드포인트(/joystick, /button, /chord, /session, /status, /users, /ping)는 이벤트 루프에서 직접 처리
+  (속도 제한 → 디코딩 → 입력 스케줄러에 추가까지, 키 입력은 스케줄러 스레드에서만 수행)
+- 그 밖의 경로(대시보드, /reset, /stop, CORS preflight 등)는 작은 스레드 풀에서 Flask 앱으로 처리
+- HTTP/1.1 keep-alive, TCP_NODELAY
+
+유휴 연결은 스레드를 차지하지 않으므로 컨트롤러/대시보드가 수십 개 접속해도 스레드 수가 늘지 않는다.
+"""
+
+import asyncio
+import functools
+import io
+import json
+import socket
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import unquote
+
+from . import app as app_module
+from . import codec
+from . import config
+from . import counters
+from . import data_processor
+from . import logger
+from . import rate_limit
+from . import session
+from . import timebase
+
+# 요청 헤더/본문 최대 크기 (초과 시 431/413 응답 후 연결 종료)
+_MAX_HEADER_BYTES = 16 * 1024
+_MAX_BODY_BYTES = 64 * 1024
+
+_CONTENT_TYPE_ERROR = "Content-Type must be application/json, application/octet-stream or application/msgpack"
+
+# 모든 응답에 붙는 헤더 (flask_cors와 같은 CORS 헤더)
+_COMMON_HEADERS = b"Server: game-server\r\nAccess-Control-Allow-Origin: *\r\n"
+_JSON_CONTENT_TYPE = "application/json"
+
+
+def _status_line(code):
+    try:
+        phrase = HTTPStatus(code).phrase
+    except ValueError:
+        phrase = ""
+    return f"HTTP/1.1 {code} {phrase}\r\n".encode("latin-1")
+
+
+# 상태 줄은 미리 만들어 둠 (요청마다 문자열을 만들지 않음)
+_STATUS_LINES = {code: _status_line(code) for code in (200, 204, 400, 404, 405, 413, 429, 431, 500, 503)}
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class _RequestError(Exception):
+    """잘못된 요청 (응답 코드와 메시지를 보내고 연결 종료)"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class Request:
+    """파싱된 HTTP 요청"""
+
+    __slots__ = ("method", "path", "query", "version", "headers", "body", "remote_addr")
+
+    def __init__(self, method, path, query, version, headers, body, remote_addr):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.version = version
+        self.headers = headers  # {소문자 이름: 값}
+        self.body = body
+        self.remote_addr = remote_addr
+
+    @property
+    def keep_alive(self):
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.1":
+            return connection != "close"
+        return connection == "keep-alive"
+
+
+class AsyncHTTPServer:
+    """
+    asyncio 기반 HTTP/1.1 서버
+
+    Args:
+        app: Flask 앱 (직접 처리하지 않는 경로에 사용)
+        wsgi_workers: Flask 앱을 실행할 스레드 수
+    """
+
+    def __init__(self, app, host, port, wsgi_workers=None):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.wsgi_workers = wsgi_workers or config.HTTP_ASYNC_WSGI_WORKERS
+        self._wsgi_pool = ThreadPoolExecutor(max_workers=self.wsgi_workers, thread_name_prefix="http-wsgi")
+        # 입력 스케줄러가 꺼져 있을 때 키 입력을 처리하는 전용 스레드 (이벤트 루프를 막지 않도록)
+        self._emit_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="key-emitter")
+        self._server = None
+
+        # 직접 처리하는 경로 {(메서드, 경로): 코루틴 함수}
+        self._routes = {
+            ("POST", "/joystick"): self._handle_joystick,
+            ("POST", "/button"): self._handle_button,
+            ("POST", "/chord"): self._handle_chord,
+            ("POST", "/session"): self._handle_session,
+            ("GET", "/status"): self._handle_status,
+            ("GET", "/users"): self._handle_users,
+            ("GET", "/ping"): self._handle_ping,
+        }
+        # 경로별 요청 수 카운터 슬롯 (Flask로 넘기는 경로는 Flask after_request에서 셈)
+        self._route_counters = {path: counters.endpoint_counters.slots(path) for _, path in self._routes}
+
+        # 통계
+        self.open_connections = 0
+        self.max_open_connections = 0
+        self.native_requests = 0
+        self.wsgi_requests = 0
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, limit=_MAX_HEADER_BYTES
+        )
+        # 포트 0으로 시작한 경우 실제 포트 반영
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+        self._wsgi_pool.shutdown(wait=False)
+        self._emit_pool.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+    # 연결 처리
+    # ------------------------------------------------------------------
+
+    async def _handle_connection(self, reader, writer):
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError:
+                pass
+        peer = writer.get_extra_info("peername")
+        remote_addr = peer[0] if peer else ""
+
+        self.open_connections += 1
+        if self.open_connections > self.max_open_connections:
+            self.max_open_connections = self.open_connections
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(
+                        self._read_request(reader, remote_addr), config.HTTP_KEEPALIVE_TIMEOUT
+                    )
+                except _RequestError as e:
+                    writer.write(self._build_response(e.code, {"status": "error", "message": e.message}, False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                keep_alive = request.keep_alive
+                response = await self._dispatch(request, keep_alive)
+                writer.write(response)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            logger.error("HTTP", f"⚠️ 연결 처리 에러 ({remote_addr}): {e}")
+        finally:
+            self.open_connections -= 1
+            writer.close()
+
+    async def _read_request(self, reader, remote_addr):
+        """요청 하나 읽기 (연결이 닫혔으면 None)"""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise _RequestError(431, "Request header too large")
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise _RequestError(400, "Malformed request line")
+
+        headers = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise _RequestError(400, "Chunked request body is not supported")
+        try:
+            content_length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise _RequestError(400, "Invalid Content-Length")
+        if content_length < 0 or content_length > _MAX_BODY_BYTES:
+            raise _RequestError(413, "Request body too large")
+        body = await reader.readexactly(content_length) if content_length else b""
+
+        path, _, query = target.partition("?")
+        return Request(method, unquote(path), query, version, headers, body, remote_addr)
+
+    async def _dispatch(self, request, keep_alive):
+        handler = self._routes.get((request.method, request.path))
+        if handler is None:
+            self.wsgi_requests += 1
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._wsgi_pool, self._call_wsgi, request, keep_alive
+            )
+
+        self.native_requests += 1
+        try:
+            code, data, extra_headers = await handler(request)
+        except Exception as e:
+            logger.exception("HTTP", f"⚠️ 요청 처리 에러 ({request.method} {request.path}): {e}")
+            code, data, extra_headers = 500, {"status": "error", "message": "Internal Server Error"}, None
+        slots = self._route_counters[request.path]
+        counters.add(slots[counters.ENDPOINT_REQUESTS])
+        if code >= 400:
+            counters.add(slots[counters.ENDPOINT_ERRORS])
+        return self._build_response(code, data, keep_alive, extra_headers)
+
+    def _build_response(self, code, data, keep_alive, extra_headers=None, content_type=_JSON_CONTENT_TYPE):
+        body = data if isinstance(data, bytes) else _dumps(data)
+        status_line = _STATUS_LINES.get(code) or _status_line(code)
+        head = [status_line, _COMMON_HEADERS,
+                f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n".encode("latin-1")]
+        if extra_headers:
+            for name, value in extra_headers:
+                head.append(f"{name}: {value}\r\n".encode("latin-1"))
+        if not keep_alive:
+            head.append(b"Connection: close\r\n")
+        head.append(b"\r\n")
+        head.append(body)
+        return b"".join(head)
+
+    # ------------------------------------------------------------------
+    # Flask 앱으로 처리하는 경로
+    # ------------------------------------------------------------------
+
+    def _call_wsgi(self, request, keep_alive):
+        """Flask 앱 호출 (스레드 풀에서 실행)"""
+        environ = {
+            "REQUEST_METHOD": request.method,
+            "SCRIPT_NAME": "",
+            "PATH_INFO": request.path,
+            "QUERY_STRING": request.query,
+            "SERVER_NAME": self.host,
+            "SERVER_PORT": str(self.port),
+            "SERVER_PROTOCOL": request.version,
+            "REMOTE_ADDR": request.remote_addr,
+            "CONTENT_TYPE": request.headers.get("content-type", ""),
+            "CONTENT_LENGTH": str(len(request.body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(request.body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for name, value in request.headers.items():
+            if name in ("content-type", "content-length"):
+                continue
+            environ["HTTP_" + name.upper().replace("-", "_")] = value
+
+        response = []
+        body = []
+
+        def start_response(status, headers, exc_info=None):
+            response[:] = [status, headers]
+            return body.append
+
+        try:
+            application_iter = self.app(environ, start_response)
+            try:
+                for data in application_iter:
+                    body.append(data)
+            finally:
+                if hasattr(application_iter, "close"):
+                    application_iter.close()
+        except Exception as e:
+            logger.error("HTTP", f"⚠️ 요청 처리 에러 ({request.method} {request.path}): {e}")
+            return self._build_response(500, {"status": "error", "message": "Internal Server Error"}, False)
+
+        status, headers = response
+        payload = b"".join(body)
+        head = [f"HTTP/1.1 {status}\r\nServer: game-server\r\n".encode("latin-1")]
+        for name, value in headers:
+            if name.lower() not in ("content-length", "connection", "transfer-encoding"):
+                head.append(f"{name}: {value}\r\n".encode("latin-1"))
+        head.append(f"Content-Length: {len(payload)}\r\n".encode("latin-1"))
+        if not keep_alive:
+            head.append(b"Connection: close\r\n")
+        head.append(b"\r\n")
+        if request.method != "HEAD":
+            head.append(payload)
+        return b"".join(head)
+
+    # ------------------------------------------------------------------
+    # 이벤트 루프에서 직접 처리하는 경로
+    # ------------------------------------------------------------------
+
+    async def _submit(self, submit, event):
+        """
+        입력 이벤트를 키 입력 스레드에 전달
+
+        스케줄러가 실행 중이면 큐에 넣고 바로 반환하고,
+        꺼져 있으면 전용 스레드에서 처리하여 이벤트 루프가 keyboard_lock을 기다리지 않도록 한다.
+        """
+        if config.INPUT_SCHEDULER_ENABLED and data_processor.input_scheduler.running:
+            return submit(event, source="HTTP")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._emit_pool, functools.partial(submit, event, source="HTTP"))
+
+    async def _handle_input(self, request, event_type, decode, submit, label):
+        # 속도 제한 확인 (디코딩 전에 차단하여 폭주 시 비용 최소화)
+        if not rate_limit.allow_event(event_type, request.remote_addr, source="HTTP"):
+            return 429, {"status": "error", "message": "Too many requests"}, (
+                ("Retry-After", rate_limit.retry_after_seconds(event_type)),
+            )
+
+        app_module.connected_users.touch(request.remote_addr)
+
+        codec_name = codec.codec_for_content_type(request.headers.get("content-type"))
+        if codec_name is None:
+            logger.error(label, f"⚠️ 400 에러: 지원하지 않는 Content-Type입니다. "
+                                f"Content-Type: {request.headers.get('content-type')}")
+            return 400, {"status": "error", "message": _CONTENT_TYPE_ERROR}, None
+        if codec_name == codec.JSON and not request.body:
+            logger.error(label, "⚠️ 400 에러: JSON 데이터가 없습니다")
+            return 400, {"status": "error", "message": "No JSON data provided"}, None
+
+        try:
+            event = decode(request.body, codec_name)
+        except ValueError as e:
+            logger.error(label, f"⚠️ 400 에러: {e}")
+            return 400, {"status": "error", "message": str(e)}, None
+
+        result = await self._submit(submit, event)
+        if result.get("overloaded"):
+            return 503, result, (("Retry-After", data_processor.QUEUE_FULL_RETRY_AFTER),)
+        if result.get("resync"):
+            return 409, result, None
+        return (400 if result["status"] == "error" else 200), result, None
+
+    async def _handle_joystick(self, request):
+        return await self._handle_input(
+            request, "joystick", codec.decode_joystick, data_processor.submit_joystick_event, "Joystick"
+        )
+
+    async def _handle_button(self, request):
+        return await self._handle_input(
+            request, "button", codec.decode_button, data_processor.submit_button_event, "Button"
+        )
+
+    async def _handle_chord(self, request):
+        return await self._handle_input(
+            request, "button", codec.decode_chord, data_processor.submit_chord_event, "Chord"
+        )
+
+    async def _handle_session(self, request):
+        # 세션 프레임은 조이스틱과 같은 속도 제한 적용
+        return await self._handle_input(
+            request, "joystick", codec.decode_session, session.handle_frame, "Session"
+        )
+
+    async def _handle_status(self, request):
+        app_module.connected_users.touch(request.remote_addr)
+        return 200, app_module.collect_status(), None
+
+    async def _handle_users(self, request):
+        return 200, app_module.collect_users(), None
+
+    async def _handle_ping(self, request):
+        app_module.connected_users.touch(request.remote_addr)
+        return 200, {
+            "status": "ok",
+            "message": "Server is running",
+            "server_time": timebase.isoformat(timebase.now_ns())
+        }, None
+
+    def get_stats(self):
+        """서버 통계 (/status 표시용)"""
+        return {
+            "mode": "async",
+            "open_connections": self.open_connections,
+            "max_open_connections": self.max_open_connections,
+            "native_requests": self.native_requests,
+            "wsgi_requests": self.wsgi_requests,
+            "wsgi_workers": self.wsgi_workers
+        }
+
+
+def run(server):
+    """서버 실행 (블로킹, Ctrl+C 시 KeyboardInterrupt 전달)"""
+    try:
+        asyncio.run(server.serve_forever())
+    finally:
+        server.close()
@@ -0,0 +1,86 @@
+"""
+입력 간격 모델 모듈
+컨트롤러마다 조이스틱 샘플 도착 간격을 학습하여 키 유지/해제 기한을 정함
+
+TCP 재전송 타이머와 같은 방식으로 평균 간격(EWMA)과 평균 편차를 추적한다.
+- 유지 기한: 이 시간 동안 샘플이 없으면 마지막 키 입력을 다시 적용 (샘플이 잠깐 빠져도 키 유지)
+- 해제 기한: 이 시간 동안 샘플이 없으면 연결이 끊긴 것으로 보고 키 해제
+
+주기적으로 보내는 클라이언트는 해제 기한이 짧아지고(연결이 끊기면 빨리 해제),
+값이 바뀔 때만 보내는 클라이언트는 간격 편차가 커서 해제 기한이 상한까지 늘어난다.
+"""
+
+from . import config
+from . import timebase
+from . import tunables
+
+
+class ArrivalModel:
+    """
+    샘플 도착 간격 모델 (스레드 하나에서만 갱신)
+
+    Args:
+        alpha: 평균 간격 EWMA 계수
+        beta: 평균 편차 EWMA 계수
+    """
+
+    __slots__ = ("alpha", "beta", "mean_ns", "dev_ns", "samples", "ignored")
+
+    def __init__(self, alpha=None, beta=None):
+        self.alpha = config.CADENCE_ALPHA if alpha is None else alpha
+        self.beta = config.CADENCE_BETA if beta is None else beta
+        self.mean_ns = 0.0
+        self.dev_ns = 0.0
+        self.samples = 0
+        self.ignored = 0  # 해제 기한 상한보다 길어 학습하지 않은 간격 수 (연결 끊김)
+
+    def observe(self, interval_ns):
+        """키가 눌린 상태에서 다음 샘플이 오기까지의 간격 기록"""
+        if interval_ns <= 0:
+            return
+        if interval_ns > _RELEASE_MAX_NS:
+            self.ignored += 1
+            return
+        if self.samples == 0:
+            self.mean_ns = float(interval_ns)
+            self.dev_ns = interval_ns / 2
+        else:
+            error = interval_ns - self.mean_ns
+            self.mean_ns += self.alpha * error
+            self.dev_ns += self.beta * (abs(error) - self.dev_ns)
+        self.samples += 1
+
+    @property
+    def ready(self):
+        return self.samples >= config.CADENCE_MIN_SAMPLES
+
+    def hold_deadline_ns(self):
+        """마지막 키 입력을 다시 적용하기까지 기다릴 시간 (학습 전에는 INACTIVITY_RELEASE_TIMEOUT)"""
+        hold_max_ns = tunables.current.inactivity_release_ns
+        if not self.ready:
+            return hold_max_ns
+        deadline = self.mean_ns + config.CADENCE_HOLD_DEVIATIONS * self.dev_ns
+        return int(min(max(deadline, _HOLD_MIN_NS), hold_max_ns))
+
+    def release_deadline_ns(self):
+        """키를 해제하기까지 기다릴 시간 (학습 전에는 ADAPTIVE_RELEASE_MAX)"""
+        if not self.ready:
+            return _RELEASE_MAX_NS
+        deadline = self.mean_ns + config.CADENCE_RELEASE_DEVIATIONS * self.dev_ns
+        return int(min(max(deadline, _RELEASE_MIN_NS), _RELEASE_MAX_NS))
+
+    def snapshot(self):
+        """모델 상태 (/status 표시용, 밀리초)"""
+        return {
+            "samples": self.samples,
+            "ignored": self.ignored,
+            "mean_ms": round(self.mean_ns / 1_000_000, 1),
+            "deviation_ms": round(self.dev_ns / 1_000_000, 1),
+            "hold_ms": round(self.hold_deadline_ns() / 1_000_000, 1),
+            "release_ms": round(self.release_deadline_ns() / 1_000_000, 1)
+        }
+
+
+_HOLD_MIN_NS = timebase.seconds_to_ns(config.ADAPTIVE_HOLD_MIN)
+_RELEASE_MIN_NS = timebase.seconds_to_ns(config.ADAPTIVE_RELEASE_MIN)
+_RELEASE_MAX_NS = timebase.seconds_to_ns(config.ADAPTIVE_RELEASE_MAX)
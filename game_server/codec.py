@@ -0,0 +1,388 @@
+"""
+입력 데이터 코덱 모듈
+JSON(기본), 고정 길이 바이너리, msgpack(선택) 형식의 조이스틱/버튼 데이터를 이벤트 객체로 변환
+
+바이너리 형식 (리틀 엔디언):
+- 조이스틱 (10바이트): x float32, y float32, strength uint8, flags uint8 (bit0: reset)
+- 버튼 (2바이트): 버튼 코드 uint8 (config.BINARY_BUTTON_CODES의 인덱스), pressed uint8 (0/1)
+- 코드 (2바이트 또는 12바이트): 버튼 비트마스크 uint16 (bit i = config.BINARY_BUTTON_CODES[i]),
+  선택적으로 뒤에 조이스틱 10바이트 (reset 플래그는 무시)
+
+코드(chord) 프레임 (JSON/msgpack): {"buttons": 3 또는 ["A", "B"], "x": float, "y": float, "strength": int}
+- buttons는 이 프레임 시점에 눌려 있는 버튼 전체 (없는 버튼은 뗀 것), x/y가 없으면 조이스틱은 그대로 둠
+
+세션 프레임 (JSON/msgpack만 지원, game_server/session.py):
+- {"session": str, "type": "keyframe"|"delta"|"keepalive"|"bye", "seq": int,
+   "joystick": {"x", "y", "strength"}, "buttons": {"A": true, ...}, "keepalive_ms": int, "controller": str}
+
+형식 선택:
+- HTTP: Content-Type (application/octet-stream → 바이너리, application/msgpack → msgpack, 그 외 JSON)
+- MQTT: 토픽 마지막 단계 (.../joystick/bin, .../joystick/msgpack, 없으면 JSON)
+"""
+
+import json
+import struct
+from collections import namedtuple
+
+from . import config
+
+
+# 검증된 입력 이벤트 (튜플이므로 apply_*_data(*event)로 바로 전달 가능)
+JoystickEvent = namedtuple("JoystickEvent", ("x", "y", "strength", "reset"))
+ButtonEvent = namedtuple("ButtonEvent", ("button", "pressed"))
+ChordEvent = namedtuple("ChordEvent", ("mask", "joystick"))  # joystick은 JoystickEvent 또는 None
+SessionFrame = namedtuple(
+    "SessionFrame", ("session", "kind", "seq", "joystick", "buttons", "keepalive_ms", "controller")
+)
+
+# namedtuple의 __new__(파이썬 함수)를 거치지 않고 바로 생성 (이벤트마다 호출되는 경로)
+_tuple_new = tuple.__new__
+
+JOYSTICK_STRUCT = struct.Struct("<ffBB")
+BUTTON_STRUCT = struct.Struct("<BB")
+CHORD_STRUCT = struct.Struct("<H")
+_RESET_FLAG = 0x01
+
+# 코덱 이름
+JSON = "json"
+BINARY = "bin"
+MSGPACK = "msgpack"
+
+# Content-Type → 코덱
+_CONTENT_TYPES = {
+    "application/json": JSON,
+    "application/octet-stream": BINARY,
+    "application/x-game-input": BINARY,
+    "application/msgpack": MSGPACK,
+    "application/x-msgpack": MSGPACK,
+}
+
+_msgpack = None
+
+
+def codec_for_content_type(content_type):
+    """Content-Type 헤더 → 코덱 이름 (알 수 없으면 None)"""
+    if not content_type:
+        return None
+    return _CONTENT_TYPES.get(content_type.split(";", 1)[0].strip().lower())
+
+
+def available_codecs():
+    """사용 가능한 코덱 이름 목록 (msgpack은 설치된 경우에만)"""
+    codecs = [JSON, BINARY]
+    if config.MSGPACK_AVAILABLE:
+        codecs.append(MSGPACK)
+    return codecs
+
+
+def _unpack_msgpack(payload):
+    global _msgpack
+    if _msgpack is None:
+        if not config.MSGPACK_AVAILABLE:
+            raise ValueError("msgpack is not installed (pip install msgpack)")
+        import msgpack
+        _msgpack = msgpack
+    try:
+        return _msgpack.unpackb(payload, raw=False)
+    except Exception as e:
+        raise ValueError(f"Invalid msgpack data: {e}")
+
+
+def _decode_mapping(payload, codec):
+    """JSON/msgpack 데이터 → 딕셔너리"""
+    if codec == MSGPACK:
+        data = _unpack_msgpack(payload)
+    else:
+        try:
+            # bytes를 json.loads에 직접 넘기면 인코딩 감지 비용이 추가되므로 먼저 UTF-8로 디코딩
+            if isinstance(payload, (bytes, bytearray)):
+                payload = payload.decode("utf-8")
+            data = json.loads(payload)
+        except (ValueError, UnicodeDecodeError):
+            raise ValueError("Invalid JSON data")
+    if not isinstance(data, dict):
+        raise ValueError("Data must be an object")
+    return data
+
+
+def joystick_from_dict(data):
+    """
+    조이스틱 딕셔너리 검증 및 변환
+
+    Args:
+        data: {"x": float, "y": float, "strength": int, "reset": bool}
+
+    Returns:
+        JoystickEvent
+
+    Raises:
+        ValueError: x, y가 숫자가 아닌 경우
+    """
+    x = data.get('x', 0.0)
+    y = data.get('y', 0.0)
+    strength = data.get('strength', 0)
+    reset_requested = data.get('reset', False)
+
+    # 데이터 타입 검증
+    try:
+        x = float(x)
+        y = float(y)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid data type: x and y must be numbers")
+
+    return _tuple_new(JoystickEvent, (x, y, strength, reset_requested))
+
+
+def button_from_dict(data, key_mapping=None):
+    """
+    버튼 딕셔너리 검증
+
+    Args:
+        data: {"button": str, "pressed": bool}
+        key_mapping: 검증에 사용할 키 매핑 (기본값: config.KEY_MAPPING)
+
+    Returns:
+        ButtonEvent
+
+    Raises:
+        ValueError: 버튼 이름이 없거나 매핑되지 않은 버튼인 경우
+    """
+    if key_mapping is None:
+        key_mapping = config.KEY_MAPPING
+
+    button = data.get('button', '')
+    pressed = data.get('pressed', False)
+
+    # 버튼 이름 검증
+    if not button:
+        raise ValueError("Button name is required")
+
+    if button not in key_mapping:
+        raise ValueError(f"Unknown button: {button}. Available buttons: {list(key_mapping.keys())}")
+
+    return _tuple_new(ButtonEvent, (button, pressed))
+
+
+def decode_joystick(payload, codec=JSON, key_mapping=None):
+    """
+    조이스틱 데이터 디코딩
+
+    Args:
+        payload: 원본 바이트
+        codec: 코덱 이름 (JSON, BINARY, MSGPACK)
+        key_mapping: 사용하지 않음 (decode_button과 같은 시그니처 유지)
+
+    Returns:
+        JoystickEvent
+
+    Raises:
+        ValueError: 형식이 잘못된 경우
+    """
+    if codec == BINARY:
+        if len(payload) != JOYSTICK_STRUCT.size:
+            raise ValueError(f"Binary joystick data must be {JOYSTICK_STRUCT.size} bytes")
+        x, y, strength, flags = JOYSTICK_STRUCT.unpack(payload)
+        return _tuple_new(JoystickEvent, (x, y, strength, bool(flags & _RESET_FLAG)))
+    return joystick_from_dict(_decode_mapping(payload, codec))
+
+
+def decode_reset(payload, codec=JSON, key_mapping=None):
+    """재시작 요청 디코딩 (빈 데이터 허용, 조이스틱 형식이면 reset만 True로 변경)"""
+    if not payload:
+        return JoystickEvent(0.0, 0.0, 0, True)
+    return decode_joystick(payload, codec)._replace(reset=True)
+
+
+def decode_button(payload, codec=JSON, key_mapping=None):
+    """
+    버튼 데이터 디코딩
+
+    Args:
+        payload: 원본 바이트
+        codec: 코덱 이름 (JSON, BINARY, MSGPACK)
+        key_mapping: 검증에 사용할 키 매핑 (기본값: config.KEY_MAPPING)
+
+    Returns:
+        ButtonEvent
+
+    Raises:
+        ValueError: 형식이 잘못되었거나 매핑되지 않은 버튼인 경우
+    """
+    if codec == BINARY:
+        if len(payload) != BUTTON_STRUCT.size:
+            raise ValueError(f"Binary button data must be {BUTTON_STRUCT.size} bytes")
+        code, pressed = BUTTON_STRUCT.unpack(payload)
+        if code >= len(config.BINARY_BUTTON_CODES):
+            raise ValueError(f"Unknown button code: {code}")
+        return button_from_dict({"button": config.BINARY_BUTTON_CODES[code], "pressed": bool(pressed)}, key_mapping)
+    return button_from_dict(_decode_mapping(payload, codec), key_mapping)
+
+
+# 버튼 이름 → 코드 비트 (bit i = config.BINARY_BUTTON_CODES[i])
+CHORD_BITS = {button: 1 << index for index, button in enumerate(config.BINARY_BUTTON_CODES)}
+_CHORD_ALL_BITS = (1 << len(config.BINARY_BUTTON_CODES)) - 1
+
+
+def chord_from_dict(data, key_mapping=None):
+    """
+    코드 딕셔너리 검증 및 변환
+
+    Args:
+        data: {"buttons": int 또는 [str], "x": float, "y": float, "strength": int}
+        key_mapping: 검증에 사용할 키 매핑 (기본값: config.KEY_MAPPING)
+
+    Returns:
+        ChordEvent
+
+    Raises:
+        ValueError: 비트마스크/버튼 이름이 잘못되었거나 x, y가 숫자가 아닌 경우
+    """
+    buttons = data.get("buttons", 0)
+    if isinstance(buttons, int) and not isinstance(buttons, bool):
+        mask = buttons
+    elif isinstance(buttons, (list, tuple)):
+        mask = 0
+        for button in buttons:
+            bit = CHORD_BITS.get(button)
+            if bit is None:
+                raise ValueError(f"Unknown chord button: {button}. Available buttons: {list(CHORD_BITS)}")
+            mask |= bit
+    else:
+        raise ValueError("buttons must be a bitmask or a list of button names")
+
+    # 재시작은 reset 요청으로만 처리 (코드 프레임의 reset 값은 무시)
+    joystick = None
+    if "x" in data or "y" in data:
+        x, y, strength, _ = joystick_from_dict(data)
+        joystick = _tuple_new(JoystickEvent, (x, y, strength, False))
+    return _validated_chord(mask, joystick, key_mapping)
+
+
+def _validated_chord(mask, joystick, key_mapping):
+    if mask < 0 or mask & ~_CHORD_ALL_BITS:
+        raise ValueError(f"Invalid button mask: {mask}")
+    if key_mapping is None:
+        key_mapping = config.KEY_MAPPING
+    for button, bit in CHORD_BITS.items():
+        if mask & bit and button not in key_mapping:
+            raise ValueError(f"Unknown button: {button}. Available buttons: {list(key_mapping.keys())}")
+    return _tuple_new(ChordEvent, (mask, joystick))
+
+
+def decode_chord(payload, codec=JSON, key_mapping=None):
+    """
+    코드(동시 입력) 데이터 디코딩
+
+    Args:
+        payload: 원본 바이트
+        codec: 코덱 이름 (JSON, BINARY, MSGPACK)
+        key_mapping: 검증에 사용할 키 매핑 (기본값: config.KEY_MAPPING)
+
+    Returns:
+        ChordEvent
+
+    Raises:
+        ValueError: 형식이 잘못되었거나 매핑되지 않은 버튼이 있는 경우
+    """
+    if codec == BINARY:
+        if len(payload) == CHORD_STRUCT.size:
+            return _validated_chord(CHORD_STRUCT.unpack(payload)[0], None, key_mapping)
+        if len(payload) == CHORD_STRUCT.size + JOYSTICK_STRUCT.size:
+            (mask,) = CHORD_STRUCT.unpack_from(payload)
+            x, y, strength, _ = JOYSTICK_STRUCT.unpack_from(payload, CHORD_STRUCT.size)
+            joystick = _tuple_new(JoystickEvent, (x, y, strength, False))
+            return _validated_chord(mask, joystick, key_mapping)
+        raise ValueError(
+            f"Binary chord data must be {CHORD_STRUCT.size} or {CHORD_STRUCT.size + JOYSTICK_STRUCT.size} bytes"
+        )
+    return chord_from_dict(_decode_mapping(payload, codec), key_mapping)
+
+
+# 세션 프레임 종류
+FRAME_KEYFRAME = "keyframe"
+FRAME_DELTA = "delta"
+FRAME_KEEPALIVE = "keepalive"
+FRAME_BYE = "bye"
+FRAME_KINDS = (FRAME_KEYFRAME, FRAME_DELTA, FRAME_KEEPALIVE, FRAME_BYE)
+_MAX_SESSION_ID_LENGTH = 64
+
+
+def decode_session(payload, codec=JSON, key_mapping=None):
+    """
+    세션 프레임 디코딩
+
+    Args:
+        payload: 원본 바이트
+        codec: 코덱 이름 (JSON, MSGPACK - 바이너리는 지원하지 않음)
+        key_mapping: 버튼 검증에 사용할 키 매핑 (기본값: config.KEY_MAPPING)
+
+    Returns:
+        SessionFrame: joystick은 JoystickEvent 또는 None, buttons는 ButtonEvent 튜플
+
+    Raises:
+        ValueError: 형식이 잘못되었거나 매핑되지 않은 버튼이 있는 경우
+    """
+    if codec == BINARY:
+        raise ValueError("Session frames must be JSON or msgpack")
+    data = _decode_mapping(payload, codec)
+
+    session = data.get("session")
+    if not isinstance(session, str) or not session or len(session) > _MAX_SESSION_ID_LENGTH:
+        raise ValueError(f"session must be a non-empty string of at most {_MAX_SESSION_ID_LENGTH} characters")
+    kind = data.get("type", FRAME_DELTA)
+    if kind not in FRAME_KINDS:
+        raise ValueError(f"Unknown frame type: {kind}. Available types: {list(FRAME_KINDS)}")
+
+    seq = data.get("seq")
+    if seq is not None and (not isinstance(seq, int) or isinstance(seq, bool)):
+        raise ValueError("seq must be an integer")
+    keepalive_ms = data.get("keepalive_ms")
+    if keepalive_ms is not None and (not isinstance(keepalive_ms, (int, float)) or keepalive_ms <= 0):
+        raise ValueError("keepalive_ms must be a positive number")
+
+    joystick = data.get("joystick")
+    if joystick is not None:
+        if not isinstance(joystick, dict):
+            raise ValueError("joystick must be an object")
+        joystick = joystick_from_dict(joystick)
+
+    buttons = data.get("buttons") or {}
+    if not isinstance(buttons, dict):
+        raise ValueError("buttons must be an object")
+    buttons = tuple(
+        button_from_dict({"button": name, "pressed": bool(pressed)}, key_mapping)
+        for name, pressed in buttons.items()
+    )
+
+    controller = data.get("controller")
+    if controller is not None and not isinstance(controller, str):
+        raise ValueError("controller must be a string")
+
+    return _tuple_new(SessionFrame, (session, kind, seq, joystick, buttons, keepalive_ms, controller))
+
+
+def encode_joystick(x, y, strength=0, reset=False):
+    """조이스틱 바이너리 인코딩 (클라이언트/테스트용)"""
+    return JOYSTICK_STRUCT.pack(x, y, int(strength), _RESET_FLAG if reset else 0)
+
+
+def encode_button(button, pressed):
+    """버튼 바이너리 인코딩 (클라이언트/테스트용)"""
+    return BUTTON_STRUCT.pack(config.BINARY_BUTTON_CODES.index(button), 1 if pressed else 0)
+
+
+def encode_chord(buttons, joystick=None):
+    """
+    코드 바이너리 인코딩 (클라이언트/테스트용)
+
+    Args:
+        buttons: 눌린 버튼 이름 목록
+        joystick: (x, y, strength) 또는 None (조이스틱 그대로 둠)
+    """
+    mask = 0
+    for button in buttons:
+        mask |= CHORD_BITS[button]
+    payload = CHORD_STRUCT.pack(mask)
+    if joystick is not None:
+        payload += encode_joystick(*joystick)
+    return payload
@@ -3,13 +3,22 @@
 모든 설정값을 중앙에서 관리
 """
 
+import importlib.util
 import os
-from datetime import datetime
-from pynput.keyboard import Key
+
+# 특수 키 기호 (pynput을 import하지 않음 - 실제 키보드 백엔드는 처음 키를 누를 때 초기화)
+from .keys import Key, Macro
 
 # 서버 기본 설정
 DEFAULT_SERVER_PORT = 8443
 
+# HTTP 서버 설정 (server.py --server 옵션으로도 선택 가능)
+HTTP_SERVER_MODE = os.environ.get("GAME_SERVER_HTTP_MODE", "pooled")  # "pooled" (스레드 풀), "async" (asyncio) 또는 "dev" (Flask 개발 서버)
+HTTP_WORKERS = int(os.environ.get("HTTP_WORKERS", "32"))  # 작업 스레드 수 (keep-alive 연결 하나가 스레드 하나 사용)
+HTTP_MAX_PENDING = int(os.environ.get("HTTP_MAX_PENDING", "64"))  # 작업 스레드를 기다릴 수 있는 연결 수 (초과 시 503)
+HTTP_KEEPALIVE_TIMEOUT = float(os.environ.get("HTTP_KEEPALIVE_TIMEOUT", "15"))  # 유휴 keep-alive 연결 종료 시간 (초)
+HTTP_ASYNC_WSGI_WORKERS = int(os.environ.get("HTTP_ASYNC_WSGI_WORKERS", "4"))  # async 모드에서 Flask 앱(대시보드 등)을 실행할 스레드 수
+
 # 키 매핑 설정
 KEY_MAPPING = {
     # 조이스틱 방향 → 키보드 키
@@ -22,12 +31,44 @@ KEY_MAPPING = {
     "A": Key.space,         # 공격
     "B": Key.enter,         # 달리기/공격
     "X": '1',               # 게임 시작
-    "Y": '',                # 미할당
+    "Y": '',                # 미할당 (매크로 예: Macro("charge"))
 }
 
 # 조이스틱 방향 키 세트 (성능 최적화: 반복 생성 방지)
 JOYSTICK_KEY_SET = {KEY_MAPPING["up"], KEY_MAPPING["down"], KEY_MAPPING["left"], KEY_MAPPING["right"]}
 
+# 바이너리 입력 형식의 버튼 코드 (인덱스 → 버튼 이름, 코드(chord) 비트마스크의 비트 순서, codec.py 참고)
+BINARY_BUTTON_CODES = ["A", "B", "X", "Y"]
+
+# 멀티 플레이어 설정 (MQTT 토픽 {MQTT_TOPIC_PREFIX}/{컨트롤러 ID}/joystick 등으로 플레이어 구분)
+DEFAULT_CONTROLLER_ID = "default"  # HTTP 및 기존 MQTT 토픽({MQTT_TOPIC_PREFIX}/joystick)이 사용하는 컨트롤러
+MAX_CONTROLLERS = int(os.environ.get("MAX_CONTROLLERS", "8"))  # 최대 컨트롤러 수 (기본 컨트롤러 포함)
+
+# 컨트롤러별 키 매핑 (없으면 KEY_MAPPING 사용 - 같은 키를 쓰면 플레이어끼리 입력이 겹침)
+CONTROLLER_KEY_MAPPINGS = {
+    # 예: 2P는 WASD + 숫자 키
+    # "p2": {"up": 'w', "down": 's', "left": 'a', "right": 'd', "A": 'f', "B": 'g', "X": '2', "Y": ''},
+}
+
+# 매크로 (키 매핑 값을 Macro("이름")으로 지정하면 버튼을 누를 때 서버가 키 입력 순서를 재생, game_server/macros.py)
+# 단계: ("press", 키), ("release", 키), ("tap", 키, 누르는 시간 초), ("wait", 초)
+# {"steps": [...], "repeat": True}로 지정하면 버튼을 누르고 있는 동안 반복하고 떼면 취소 (기본: 한 번 끝까지 재생)
+MACROS = {
+    # 예: 격투 게임 파동권 (↓ ↘ → + A)
+    "hadouken": [
+        ("press", Key.down), ("wait", 0.03),
+        ("press", Key.right), ("wait", 0.03),
+        ("release", Key.down), ("wait", 0.03),
+        ("tap", Key.space, 0.05), ("release", Key.right),
+    ],
+    # 예: X를 200 ms 누른 뒤 A 탭
+    "charge": [("tap", '1', 0.2), ("tap", Key.space, 0.05)],
+    # 예: 누르고 있는 동안 A 연타 (초당 약 12회)
+    "turbo_a": {"steps": [("tap", Key.space, 0.04), ("wait", 0.04)], "repeat": True},
+}
+MACRO_MAX_ACTIVE = 16  # 동시에 재생할 수 있는 최대 매크로 수
+MACRO_SPIN = 0.0005  # 예정 시각 직전 이 시간(초)은 조건 변수 대기 대신 sleep(0)으로 양보하며 확인 (타이머 해상도 보정)
+
 # 조이스틱 임계값 (이 값 이상일 때만 키 입력)
 JOYSTICK_THRESHOLD = 0.3  # 30% 이상
 
@@ -41,11 +82,84 @@ JOYSTICK_THRESHOLD_OFF = 0.25 # 키를 떼는 임계값 (더 낮게 설정하여
 # 안드로이드에서 데이터가 같으면 전송하지 않는 문제를 고려하여 시간 증가
 INACTIVITY_RELEASE_TIMEOUT = 0.5  # 0.5초로 증가 (안드로이드 데이터 전송 특성 고려)
 
+# 적응형 키 유지/해제 기한 (컨트롤러마다 조이스틱 샘플 간격을 학습, game_server/cadence.py)
+# 학습 전이나 비활성화 시에는 INACTIVITY_RELEASE_TIMEOUT 후 키 재적용, ADAPTIVE_RELEASE_MAX 후 해제
+ADAPTIVE_RELEASE_ENABLED = os.environ.get("ADAPTIVE_RELEASE_ENABLED", "true").lower() == "true"
+ADAPTIVE_HOLD_MIN = 0.1  # 키 재적용 기한 하한 (초, 상한은 INACTIVITY_RELEASE_TIMEOUT)
+ADAPTIVE_RELEASE_MIN = float(os.environ.get("ADAPTIVE_RELEASE_MIN", "1.0"))  # 키 해제 기한 하한 (초)
+ADAPTIVE_RELEASE_MAX = float(os.environ.get("ADAPTIVE_RELEASE_MAX", "10.0"))  # 키 해제 기한 상한 (초, 이보다 긴 간격은 학습하지 않음)
+CADENCE_ALPHA = 0.125  # 평균 간격 EWMA 계수
+CADENCE_BETA = 0.25  # 평균 편차 EWMA 계수
+CADENCE_MIN_SAMPLES = 8  # 적응형 기한을 사용하기 전에 필요한 간격 샘플 수
+CADENCE_HOLD_DEVIATIONS = 4  # 재적용 기한 = 평균 간격 + N × 평균 편차
+CADENCE_RELEASE_DEVIATIONS = 8  # 해제 기한 = 평균 간격 + N × 평균 편차
+
+# 세션 프로토콜 (keepalive + keyframe/delta, game_server/session.py)
+# 세션이 있는 컨트롤러는 입력 감시 루프가 추정하지 않고, keepalive가 끊기면 바로 키를 해제
+SESSION_KEEPALIVE_INTERVAL = float(os.environ.get("SESSION_KEEPALIVE_INTERVAL", "0.25"))  # 기본 keepalive 간격 (초, 클라이언트가 keepalive_ms로 변경 가능)
+SESSION_KEEPALIVE_MIN = 0.05  # 클라이언트가 지정할 수 있는 keepalive 간격 하한 (초)
+SESSION_KEEPALIVE_MAX = 5.0  # 클라이언트가 지정할 수 있는 keepalive 간격 상한 (초)
+SESSION_MISSED_KEEPALIVES = 3  # 이 횟수만큼 keepalive 간격 동안 프레임이 없으면 세션 종료
+SESSION_MAX = 64  # 동시에 유지할 최대 세션 수
+
+# 입력 스케줄러 설정 (버튼 입력을 조이스틱 샘플보다 먼저 처리)
+INPUT_SCHEDULER_ENABLED = os.environ.get("INPUT_SCHEDULER_ENABLED", "true").lower() == "true"
+INPUT_QUEUE_MAX_PENDING = 256  # 대기 가능한 최대 버튼/재시작 입력 수
+
+# 키 입력 출력 방식: "thread" (웹 서버 프로세스에서 직접 출력) 또는 "process" (별도 프로세스, 공유 메모리 링 버퍼로 전달)
+KEY_EMITTER_MODE = os.environ.get("KEY_EMITTER_MODE", "thread").lower()
+KEY_EMITTER_RING_SLOTS = int(os.environ.get("KEY_EMITTER_RING_SLOTS", "1024"))  # 링 버퍼 명령 슬롯 수
+KEY_EMITTER_FULL_WAIT = 0.05  # 링 버퍼가 가득 찼을 때 빈 슬롯을 기다리는 최대 시간 (초, 초과 시 명령 버림)
+KEY_EMITTER_HEARTBEAT_TIMEOUT = 1.0  # 출력 프로세스 하트비트가 이 시간(초) 이상 멈추면 응답 없음으로 표시
+
+# 입력 처리 스레드(입력 감시, 입력 스케줄러, 키 출력 프로세스) 실행 우선순위 (Linux)
+# CRITICAL_CPUS를 지정하면 입력 처리 스레드는 해당 코어에, 웹/MQTT 스레드는 나머지 코어에 고정 (예: "3" 또는 "2-3")
+CRITICAL_CPUS = os.environ.get("CRITICAL_CPUS", "")
+CRITICAL_SCHED_FIFO = os.environ.get("CRITICAL_SCHED_FIFO", "false").lower() == "true"  # SCHED_FIFO 실시간 스케줄링 (root 또는 CAP_SYS_NICE 필요)
+CRITICAL_RT_PRIORITY = int(os.environ.get("CRITICAL_RT_PRIORITY", "10"))  # SCHED_FIFO 우선순위 (1~99)
+CRITICAL_NICE = int(os.environ.get("CRITICAL_NICE", "0"))  # nice 값 (음수일수록 높은 우선순위, 0이면 변경 안 함)
+JITTER_WINDOW = 1024  # 스케줄링 지연 통계에 사용할 최근 샘플 수
+
+# 실행 중 변경 가능한 설정 파일 (game_server/tunables.py - JSON, 비어 있으면 사용 안 함)
+# JOYSTICK_THRESHOLD_ON/OFF, INACTIVITY_RELEASE_TIMEOUT, ENABLE_VERBOSE_LOGGING, USER_CLEANUP_TIMEOUT을 파일에서 바꾸면 바로 반영
+TUNABLES_FILE = os.environ.get("GAME_SERVER_TUNABLES", "")
+TUNABLES_POLL_INTERVAL = 1.0  # inotify를 사용할 수 없을 때 파일 변경 확인 주기 (초)
+TUNABLES_SETTLE = 0.05  # 파일 변경 감지 후 읽기 전 대기 시간 (초, 편집기가 나눠 쓰는 경우)
+
+# 통계 카운터 설정 (game_server/counters.py - 스레드별 샤드, 읽을 때 합산)
+COUNTER_RATE_WINDOW = float(os.environ.get("COUNTER_RATE_WINDOW", "10"))  # 초당 발생 수를 계산할 최근 구간 (초)
+COUNTER_SAMPLE_INTERVAL = 1.0  # 초당 발생 수 계산용 합계 표본 최소 간격 (초)
+COUNTER_MAX_KEYS = 64  # 묶음(출처/엔드포인트/컨트롤러)별 최대 키 수 (초과 시 "other"로 합침)
+
+# 입력 통계 기록 (game_server/history.py - 대시보드 차트, /history)
+# (구간 길이 초, 구간 수) - 기본: 1초 × 120 (2분), 10초 × 90 (15분), 60초 × 120 (2시간)
+HISTORY_RESOLUTIONS = ((1, 120), (10, 90), (60, 120))
+
 # 로깅 설정 (성능 최적화)
 ENABLE_VERBOSE_LOGGING = False  # True로 설정하면 상세 로그 출력
+LOG_FORMAT = os.environ.get("GAME_SERVER_LOG_FORMAT", "text").lower()  # "text" 또는 "json"
+LOG_QUEUE_SIZE = 4096  # 백그라운드 로그 출력 대기열 크기 (가득 차면 새 로그를 버림)
+LOG_RATE_WINDOW = 10.0  # 반복 에러 로그 속도 제한 구간 (초)
+LOG_RATE_LIMIT = 5  # 구간당 같은 종류의 에러 로그 최대 출력 수
+LOG_RATE_MAX_KEYS = 1024  # 속도 제한을 추적할 최대 로그 종류 수
 
 # 접속자 정보 정리 설정
 USER_CLEANUP_TIMEOUT = 3600  # 1시간 (초 단위) - 이 시간 이상 비활성 접속자 제거
+MAX_CONNECTED_USERS = int(os.environ.get("MAX_CONNECTED_USERS", "1024"))  # 추적할 최대 접속자 수 (IP 위조 폭주 시 메모리 보호)
+
+# 네트워크 인터페이스 감시 설정 (대시보드에 표시할 서버 IP 갱신 주기, 초)
+NETWORK_REFRESH_INTERVAL = 5.0  # Linux: /proc/net 읽기 (가벼움)
+NETWORK_FALLBACK_REFRESH_INTERVAL = 60.0  # 그 외 플랫폼: 호스트 이름 조회 사용
+
+# 속도 제한 설정 (클라이언트별 토큰 버킷)
+# 한 클라이언트가 과도하게 데이터를 보내 다른 플레이어의 입력을 방해하는 것을 방지
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMITS = {
+    # 이벤트 종류: (초당 허용 이벤트 수, 최대 연속 허용 수)
+    "joystick": (float(os.environ.get("RATE_LIMIT_JOYSTICK_RATE", "60")), float(os.environ.get("RATE_LIMIT_JOYSTICK_BURST", "30"))),
+    "button": (float(os.environ.get("RATE_LIMIT_BUTTON_RATE", "30")), float(os.environ.get("RATE_LIMIT_BUTTON_BURST", "20"))),
+}
+RATE_LIMIT_MAX_CLIENTS = 1024  # 추적할 최대 클라이언트 수
 
 # MQTT 설정
 MQTT_BROKER_HOST = os.environ.get("MQTT_BROKER_HOST", "localhost")
@@ -55,12 +169,34 @@ MQTT_CLIENT_ID = os.environ.get("MQTT_CLIENT_ID", f"game_server_{os.getpid()}")
 MQTT_USERNAME = os.environ.get("MQTT_USERNAME", None)
 MQTT_PASSWORD = os.environ.get("MQTT_PASSWORD", None)
 MQTT_ENABLED = os.environ.get("MQTT_ENABLED", "true").lower() == "true"
+MQTT_RECONNECT_MIN_DELAY = 1  # 재연결 최소 간격 (초) - 실패할 때마다 2배씩 증가
+MQTT_RECONNECT_MAX_DELAY = 30  # 재연결 최대 간격 (초)
+MQTT_STATUS_INTERVAL = 5  # 상태 발행 주기 (초)
+MQTT_INBOX_MAX_PENDING = 256  # 처리 대기 가능한 최대 MQTT 메시지 수 (조이스틱은 토픽별 최신 값만 유지)
+MQTT_PROTOCOL = os.environ.get("MQTT_PROTOCOL", "3.1.1")  # "3.1.1" 또는 "5" (5이면 상태 발행에 토픽 별칭 사용)
+
+# 토픽 종류별 QoS (구독 QoS는 브로커 → 서버 전달 QoS의 상한)
+# - 조이스틱: 최신 상태만 의미가 있으므로 0 (ACK 왕복 없음, 유실되어도 다음 샘플로 복구)
+# - 버튼/코드/재시작: 눌림/뗌 변화가 유실되면 키가 눌린 채 남으므로 1
+# - 상태: 주기적으로 다시 발행되므로 0
+MQTT_QOS = {
+    "joystick": int(os.environ.get("MQTT_QOS_JOYSTICK", "0")),
+    "button": int(os.environ.get("MQTT_QOS_BUTTON", "1")),
+    "chord": int(os.environ.get("MQTT_QOS_CHORD", "1")),
+    "reset": int(os.environ.get("MQTT_QOS_RESET", "1")),
+    "session": int(os.environ.get("MQTT_QOS_SESSION", "1")),
+    "status": int(os.environ.get("MQTT_QOS_STATUS", "0")),
+}
 
-# MQTT 가용성 확인
+# MQTT 가용성 확인 (모듈을 실제로 import하지 않고 설치 여부만 확인)
 try:
-    import paho.mqtt.client as mqtt
-    MQTT_AVAILABLE = True
+    MQTT_AVAILABLE = importlib.util.find_spec("paho.mqtt") is not None
 except ImportError:
     MQTT_AVAILABLE = False
-    print("⚠️  paho-mqtt가 설치되지 않았습니다. MQTT 기능을 사용하려면 'pip install paho-mqtt'를 실행하세요.")
+
+# msgpack 입력 형식 지원 여부 (선택 사항: pip install msgpack)
+try:
+    MSGPACK_AVAILABLE = importlib.util.find_spec("msgpack") is not None
+except ImportError:
+    MSGPACK_AVAILABLE = False
 
@@ -0,0 +1,208 @@
+"""
+통계 카운터 모듈
+여러 스레드(웹 작업 스레드, MQTT 스레드, 입력 스케줄러)가 잠금 없이 올리는 이벤트 카운터
+
+- 카운터는 스레드마다 따로 있는 정수 리스트(샤드)에 기록하고, 읽을 때 모든 샤드를 합산한다
+  (같은 값을 여러 스레드가 += 하면 갱신이 유실되고, 전역 잠금을 쓰면 입력 처리 스레드가 서로 기다림)
+- 카운터 이름은 (묶음, 키, 종류) - 예: ("source", "MQTT", "joystick"), ("endpoint", "/button", "errors")
+  처리 경로에서는 미리 등록한 슬롯 번호로 add()만 호출한다 (문자열 조합/딕셔너리 생성 없음)
+- 종료된 스레드의 샤드는 읽을 때 합계에 합치고 제거한다
+- 초당 발생 수는 읽을 때마다 남긴 합계 표본으로 최근 COUNTER_RATE_WINDOW초 동안의 증가량을 계산한다
+
+사용 예:
+    source_counters = counters.group("source", ("joystick", "button"))
+    counters.add(source_counters.slots("HTTP")[0])
+"""
+
+import collections
+import threading
+
+from . import config
+from . import timebase
+
+
+class CounterGroup:
+    """
+    같은 종류의 카운터 묶음 (예: 출처별, 엔드포인트별, 컨트롤러별)
+
+    키마다 kinds 순서대로 슬롯 번호 튜플을 등록한다. 키 수가 COUNTER_MAX_KEYS를 넘으면 "other"로 합친다.
+    """
+
+    __slots__ = ("name", "kinds", "_slots")
+
+    def __init__(self, name, kinds):
+        self.name = name
+        self.kinds = tuple(kinds)
+        self._slots = {}  # {key: (슬롯 번호, ...)} - 등록 후에는 바뀌지 않음
+
+    def slots(self, key):
+        """key의 슬롯 번호 튜플 (kinds 순서, 처음 보는 key면 등록)"""
+        slots = self._slots.get(key)
+        if slots is None:
+            slots = self._register(key)
+        return slots
+
+    def totals(self):
+        """종류별 합계 (모든 키 합산) {종류: 합계}"""
+        with _lock:
+            values = _collect()
+            slot_tuples = list(self._slots.values())
+        result = dict.fromkeys(self.kinds, 0)
+        for slots in slot_tuples:
+            for kind, slot in zip(self.kinds, slots):
+                result[kind] += values[slot]
+        return result
+
+    def _register(self, key):
+        with _lock:
+            slots = self._slots.get(key)
+            if slots is not None:
+                return slots
+            if len(self._slots) >= config.COUNTER_MAX_KEYS:
+                key = "other"
+                slots = self._slots.get(key)
+                if slots is not None:
+                    return slots
+            slots = tuple(_new_slot(self.name, key, kind) for kind in self.kinds)
+            self._slots[key] = slots
+            return slots
+
+
+class _Shard:
+    """스레드 하나의 카운터 값 (해당 스레드만 쓰고, 읽는 쪽은 잠금 없이 읽음)"""
+
+    __slots__ = ("thread", "counts")
+
+    def __init__(self, thread, size):
+        self.thread = thread
+        self.counts = [0] * size
+
+
+_lock = threading.Lock()  # 슬롯/샤드 등록과 합산만 보호 (add()는 잠그지 않음)
+_local = threading.local()
+_names = []  # [(묶음, 키, 종류)] - 슬롯 번호 순서
+_shards = []  # [_Shard]
+_retired = []  # 종료된 스레드 샤드의 합계 (슬롯 번호 순서)
+_groups = {}  # {묶음 이름: CounterGroup}
+_samples = collections.deque()  # [(now_ns, 합계 리스트)] - 초당 발생 수 계산용
+
+
+def _new_slot(group_name, key, kind):
+    """슬롯 등록 (_lock 보유 상태에서 호출)"""
+    _names.append((group_name, key, kind))
+    _retired.append(0)
+    return len(_names) - 1
+
+
+def group(name, kinds):
+    """카운터 묶음 (같은 이름이면 같은 객체)"""
+    with _lock:
+        counter_group = _groups.get(name)
+        if counter_group is None:
+            counter_group = CounterGroup(name, kinds)
+            _groups[name] = counter_group
+        return counter_group
+
+
+def add(slot, n=1):
+    """현재 스레드의 샤드에 n 더하기 (처리 경로용 - 잠금/할당 없음)"""
+    try:
+        _local.counts[slot] += n
+    except (AttributeError, IndexError):
+        _add_slow(slot, n)
+
+
+def _add_slow(slot, n):
+    """현재 스레드의 첫 기록이거나 샤드를 만든 뒤 슬롯이 등록된 경우"""
+    with _lock:
+        shard = getattr(_local, "shard", None)
+        if shard is None:
+            shard = _Shard(threading.current_thread(), len(_names))
+            _shards.append(shard)
+            _local.shard = shard
+        elif len(shard.counts) < len(_names):
+            # 리스트를 교체하지 않고 늘림 (읽는 쪽이 같은 리스트를 보고 있어도 됨)
+            shard.counts.extend([0] * (len(_names) - len(shard.counts)))
+        _local.counts = shard.counts
+    shard.counts[slot] += n
+
+
+def _collect():
+    """모든 샤드 합계 (_lock 보유 상태에서 호출, 종료된 스레드의 샤드는 _retired에 합치고 제거)"""
+    alive = []
+    for shard in _shards:
+        if shard.thread.is_alive():
+            alive.append(shard)
+        else:
+            counts = shard.counts
+            for slot in range(len(counts)):
+                _retired[slot] += counts[slot]
+    _shards[:] = alive
+
+    totals = list(_retired)
+    for shard in alive:
+        counts = shard.counts
+        for slot in range(len(counts)):
+            totals[slot] += counts[slot]
+    return totals
+
+
+def _rates(totals, now):
+    """
+    슬롯별 초당 발생 수 (_lock 보유 상태에서 호출)
+
+    읽을 때마다 합계 표본을 남기고(COUNTER_SAMPLE_INTERVAL 간격), 창(COUNTER_RATE_WINDOW)보다 오래된
+    표본 중 가장 최근 것을 기준점으로 삼는다. 읽은 적이 없으면 서버 시작 후 평균.
+    """
+    window_ns = timebase.seconds_to_ns(config.COUNTER_RATE_WINDOW)
+    while len(_samples) > 1 and _samples[1][0] <= now - window_ns:
+        _samples.popleft()
+    base_ns, base = _samples[0]
+    if now - _samples[-1][0] >= timebase.seconds_to_ns(config.COUNTER_SAMPLE_INTERVAL):
+        _samples.append((now, totals))
+    elapsed = timebase.elapsed_seconds(base_ns, now)
+    if elapsed is None or elapsed <= 0:
+        return [0.0] * len(totals)
+    return [
+        (total - (base[slot] if slot < len(base) else 0)) / elapsed
+        for slot, total in enumerate(totals)
+    ]
+
+
+def snapshot():
+    """모든 카운터 합계 {(묶음, 키, 종류): 합계}"""
+    with _lock:
+        values = _collect()
+        return dict(zip(_names, values))
+
+
+def get_counter_stats(now=None):
+    """
+    카운터 합계와 초당 발생 수 (/status 표시용)
+
+    Returns:
+        dict: {묶음: {키: {"total": {종류: 합계}, "per_second": {종류: 초당 발생 수}}}}
+    """
+    if now is None:
+        now = timebase.now_ns()
+    with _lock:
+        values = _collect()
+        rates = _rates(values, now)
+        names = list(_names)
+
+    result = {name: {} for name in _groups}
+    for (group_name, key, kind), total, rate in zip(names, values, rates):
+        entry = result[group_name].get(key)
+        if entry is None:
+            entry = result[group_name][key] = {"total": {}, "per_second": {}}
+        entry["total"][kind] = total
+        entry["per_second"][kind] = round(rate, 2)
+    return result
+
+
+_samples.append((timebase.now_ns(), []))
+
+# 요청 수 카운터 (HTTP 엔드포인트/MQTT 토픽 종류별 - 응답 코드 400 이상이거나 처리하지 못한 메시지는 errors에도 셈)
+ENDPOINT_REQUESTS = 0
+ENDPOINT_ERRORS = 1
+endpoint_counters = group("endpoint", ("requests", "errors"))
@@ -3,376 +3,1042 @@
 조이스틱 및 버튼 데이터 처리 로직
 """
 
-from datetime import datetime
+import collections
+import threading
 
+from . import cadence
+from . import codec
 from . import config
+from . import counters
+from . import history
 from . import keyboard_handler
+from . import logger
+from . import macros
+from . import realtime
+from . import timebase
+from . import tunables
+from .keys import Macro
 
 
-# 데이터 수신 통계
+# 데이터 수신 통계 (시간은 모두 timebase.now_ns() 단조 시간, 수신 수는 아래 카운터)
 stats = {
-    "joystick_count": 0,
-    "button_count": 0,
-    "last_joystick_time": None,
-    "last_button_time": None,
-    "server_start_time": datetime.now()
+    "last_joystick_ns": None,
+    "last_button_ns": None,
+    "server_start_ns": timebase.now_ns()
 }
 
-# 최근 수신된 데이터 (HTML 표시용)
-recent_data = {
-    "last_joystick": None,  # {"x": 0.5, "y": 0.5, "keys": ["up"], "time": datetime}
-    "last_button": None      # {"button": "A", "pressed": True, "key": "space", "time": datetime}
-}
+# 입력 수 카운터 (출처별/컨트롤러별 - 여러 스레드가 잠금 없이 올림, counters 모듈)
+INPUT_KINDS = ("joystick", "button")  # 코드(chord) 입력은 버튼으로 셈
+_COUNT_JOYSTICK = 0
+_COUNT_BUTTON = 1
+source_counters = counters.group("source", INPUT_KINDS)
+controller_counters = counters.group("controller", INPUT_KINDS)
+# 입력으로 바뀐 키 상태 수 (컨트롤러별 - 조이스틱 방향 변화, 버튼 누름/뗌, history 모듈의 transitions)
+transition_counters = counters.group("keys", ("transitions",))
+
+# 조이스틱 방향 비트 (calculate_joystick_keys가 반환하는 비트마스크)
+DIR_UP = 1
+DIR_DOWN = 2
+DIR_RIGHT = 4
+DIR_LEFT = 8
+JOYSTICK_DIRECTIONS = (("up", DIR_UP), ("down", DIR_DOWN), ("right", DIR_RIGHT), ("left", DIR_LEFT))
+_EMPTY_KEYS = frozenset()
+_CHANGED_DIRECTIONS = tuple(bin(mask).count("1") for mask in range(16))  # 이전 ^ 현재 비트마스크 → 바뀐 방향 수
+
+
+class JoystickState:
+    """
+    조이스틱 상태 (컨트롤러마다 하나를 만들어 두고 값만 바꿈)
+    
+    mask는 눌려야 할 방향 비트, keys는 그 방향의 키 집합 (컨트롤러의 key_sets[mask] - 이벤트마다 새 집합을 만들지 않음)
+    """
+    
+    __slots__ = ("x", "y", "mask", "keys")
+    
+    def __init__(self):
+        self.clear()
+    
+    @property
+    def is_active(self):
+        """조이스틱이 중앙이 아닌지 (눌린 방향이 있는지)"""
+        return self.mask != 0
+    
+    def clear(self):
+        self.x = 0.0
+        self.y = 0.0
+        self.mask = 0
+        self.keys = _EMPTY_KEYS
+
+
+class ButtonState:
+    """
+    버튼 상태 (키 매핑의 버튼마다 하나를 만들어 두고 pressed/time_ns만 바꿈)
+    
+    응답 딕셔너리도 미리 만들어 두고 공유한다 (호출하는 쪽에서 수정하지 말 것).
+    """
+    
+    __slots__ = (
+        "button", "key", "key_text", "pressed", "time_ns", "results", "skipped_results", "queued_results", "unmapped_result"
+    )
+    
+    def __init__(self, button, key):
+        self.button = button
+        self.key = key
+        self.key_text = str(key)
+        self.pressed = False
+        self.time_ns = None
+        # [pressed]로 선택 (False → 뗌, True → 누름)
+        self.results = tuple(
+            {"status": "ok", "received": True, "button": button, "action": action, "key": self.key_text}
+            for action in ("released", "pressed")
+        )
+        self.skipped_results = tuple(
+            {"status": "ok", "received": True, "button": button, "action": action, "key": self.key_text,
+             "message": "State unchanged, skipped"}
+            for action in ("released", "pressed")
+        )
+        # 입력 스케줄러 큐에 넣은 경우 (키 입력은 스케줄러가 처리)
+        self.queued_results = tuple(
+            {"status": "ok", "received": True, "queued": True, "button": button, "action": action, "key": self.key_text}
+            for action in ("released", "pressed")
+        )
+        self.unmapped_result = {"status": "ok", "message": f"Button {button} has no key mapping"}
+
+
+class RecentInput:
+    """최근 수신 데이터 하나 (HTML 표시용 - 값만 덮어쓰고, 반올림/ISO 변환은 get_recent_data()에서 수행)"""
+    
+    __slots__ = ("x", "y", "strength", "keys", "button", "pressed", "action", "key", "time_ns", "source", "controller")
+    
+    def __init__(self):
+        self.time_ns = None  # None이면 아직 수신한 데이터 없음
+
+
+# 최근 수신된 데이터 (이벤트마다 딕셔너리를 새로 만들지 않고 필드만 갱신 - 읽는 쪽은 표시용이므로 잠금 없음)
+recent_joystick = RecentInput()
+recent_button = RecentInput()
 
 # 마지막 조이스틱 상태 저장 (안드로이드에서 데이터가 같으면 전송하지 않는 문제 해결)
-last_joystick_state = {
-    "x": 0.0,
-    "y": 0.0,
-    "keys": set(),  # 마지막에 눌려있던 키들
-    "is_active": False,  # 조이스틱이 활성 상태인지 (중앙이 아닌지)
-    "active_keys": set()  # 현재 활성화된 키들 (히스테리시스 적용)
-}
+last_joystick_state = JoystickState()
 
 # 마지막 버튼 상태 저장 (안드로이드에서 데이터가 같으면 전송하지 않는 문제 해결)
-last_button_states = {}  # {button_name: {"pressed": bool, "key": key, "time": datetime}}
+last_button_states = {}  # {button_name: ButtonState} - 키 매핑의 모든 버튼 (눌림 여부는 ButtonState.pressed)
+
+
+class ControllerState:
+    """
+    컨트롤러(플레이어)별 입력 상태
+    
+    여러 기기가 각자 다른 플레이어를 조작할 수 있도록 조이스틱/버튼 상태와 키 매핑을 컨트롤러마다 따로 관리한다.
+    기본 컨트롤러(HTTP, 기존 MQTT 토픽)는 모듈 전역 상태(last_joystick_state, last_button_states)를 그대로 사용한다.
+    
+    방향 비트마스크별 키 집합과 응답은 생성할 때 미리 만들어 두어, 입력 처리 경로에서는 새 객체를 만들지 않는다.
+    """
+    
+    def __init__(self, controller_id, key_mapping, joystick=None, buttons=None, pressed_buttons=None):
+        self.controller_id = controller_id
+        self.key_mapping = key_mapping
+        self.joystick_key_set = {key_mapping["up"], key_mapping["down"], key_mapping["left"], key_mapping["right"]}
+        # 방향 비트마스크 → 키 집합 / 응답 (16가지)
+        self.key_sets = tuple(
+            frozenset(key_mapping[name] for name, bit in JOYSTICK_DIRECTIONS if mask & bit and key_mapping[name])
+            for mask in range(16)
+        )
+        self.joystick_results = tuple(
+            {"status": "ok", "received": True, "keys_pressed": tuple(name for name, bit in JOYSTICK_DIRECTIONS if mask & bit)}
+            for mask in range(16)
+        )
+        self.joystick = joystick if joystick is not None else JoystickState()
+        self.buttons = buttons if buttons is not None else {}  # {button_name: ButtonState}
+        for button, key in key_mapping.items():
+            self.buttons[button] = ButtonState(button, key)
+        self.pressed_buttons = pressed_buttons if pressed_buttons is not None else set()  # 눌려있는 버튼 이름
+        self.last_joystick_ns = None
+        self.last_button_ns = None
+        self.cadence = cadence.ArrivalModel()  # 조이스틱 샘플 간격 모델 (키 유지/해제 기한)
+        self.last_reapply_ns = None  # 입력 감시 루프가 마지막으로 키 입력을 다시 적용한 시간
+        self.session = None  # 연결된 세션 (session.Session - 있으면 입력 감시 루프가 키 유지/해제를 추정하지 않음)
+        self.counter_slots = controller_counters.slots(controller_id)  # INPUT_KINDS 순서
+        self.transition_slot = transition_counters.slots(controller_id)[0]
+    
+    def reset(self):
+        """조이스틱/버튼 상태 초기화 (키 해제는 호출하는 쪽에서 처리)"""
+        self.joystick.clear()
+        for state in self.buttons.values():
+            state.pressed = False
+        self.pressed_buttons.clear()
+
+
+# 기본 컨트롤러 (HTTP 및 기존 MQTT 토픽 - 전역 상태 공유)
+default_controller = ControllerState(
+    config.DEFAULT_CONTROLLER_ID,
+    config.KEY_MAPPING,
+    joystick=last_joystick_state,
+    buttons=last_button_states,
+    pressed_buttons=keyboard_handler.pressed_keys
+)
 
+# 컨트롤러 목록 {controller_id: ControllerState}
+controllers = {config.DEFAULT_CONTROLLER_ID: default_controller}
+_controllers_lock = threading.Lock()
 
-def calculate_joystick_keys(x, y):
+
+def get_controller(controller_id):
     """
-    조이스틱 입력값(x, y)을 키 매핑으로 변환 (히스테리시스 적용)
+    컨트롤러 상태 가져오기 (처음 보는 ID면 생성)
+    
+    Args:
+        controller_id: 컨트롤러 ID (MQTT 토픽의 플레이어 부분)
+    
+    Returns:
+        ControllerState: 컨트롤러 상태 (최대 개수를 넘으면 None)
+    """
+    controller = controllers.get(controller_id)
+    if controller is not None:
+        return controller
+    
+    with _controllers_lock:
+        controller = controllers.get(controller_id)
+        if controller is None:
+            if len(controllers) >= config.MAX_CONTROLLERS:
+                return None
+            key_mapping = config.CONTROLLER_KEY_MAPPINGS.get(controller_id, config.KEY_MAPPING)
+            controller = ControllerState(controller_id, key_mapping)
+            controllers[controller_id] = controller
+            logger.log("Controller", f"새 컨트롤러 등록: {controller_id}")
+    return controller
+
+
+def get_controller_stats(now=None):
+    """컨트롤러별 상태 요약 (/status 표시용)"""
+    if now is None:
+        now = timebase.now_ns()
+    result = {}
+    for controller_id, controller in list(controllers.items()):
+        last_ns = max(controller.last_joystick_ns or 0, controller.last_button_ns or 0) or None
+        elapsed = timebase.elapsed_seconds(last_ns, now)
+        result[controller_id] = {
+            "last_input": timebase.isoformat(last_ns),
+            "elapsed_seconds": round(elapsed, 2) if elapsed is not None else None,
+            "active_keys": sorted(str(key) for key in controller.joystick.keys),
+            "pressed_buttons": sorted(controller.pressed_buttons),
+            "cadence": controller.cadence.snapshot()
+        }
+    return result
+
+
+def get_recent_data():
+    """최근 수신 데이터를 응답용으로 변환 (읽을 때만 반올림/ISO 변환 수행)"""
+    joystick = None
+    button = None
+    
+    if recent_joystick.time_ns is not None:
+        joystick = {
+            "x": round(recent_joystick.x, 2),
+            "y": round(recent_joystick.y, 2),
+            "strength": recent_joystick.strength,
+            "keys": list(recent_joystick.keys),
+            "time": timebase.isoformat(recent_joystick.time_ns),
+            "source": recent_joystick.source,
+            "controller": recent_joystick.controller
+        }
+    
+    if recent_button.time_ns is not None:
+        button = {
+            "button": recent_button.button,
+            "pressed": recent_button.pressed,
+            "action": recent_button.action,
+            "key": recent_button.key,
+            "time": timebase.isoformat(recent_button.time_ns),
+            "source": recent_button.source,
+            "controller": recent_button.controller
+        }
+    
+    return {"joystick": joystick, "button": button}
+
+
+def get_status_snapshot(now=None):
+    """
+    서버 상태 및 데이터 수신 통계 (HTTP /status와 MQTT 상태 발행 공통)
+    
+    Args:
+        now: 기준 단조 시간 (나노초, 기본값: 현재)
+    
+    Returns:
+        dict: 상태 정보 (시간 값은 이 시점에 ISO 문자열로 변환)
+    """
+    if now is None:
+        now = timebase.now_ns()
+    
+    # 수신 수 (출처별 카운터 합산)
+    received = source_counters.totals()
+    
+    # 마지막 수신으로부터 경과 시간 계산
+    joystick_elapsed = timebase.elapsed_seconds(stats["last_joystick_ns"], now)
+    button_elapsed = timebase.elapsed_seconds(stats["last_button_ns"], now)
+    
+    # 데이터 수신 여부 판단 (5초 이내면 활성)
+    joystick_active = joystick_elapsed is not None and joystick_elapsed < 5.0
+    button_active = button_elapsed is not None and button_elapsed < 5.0
+    
+    return {
+        "status": "ok",
+        "server_running": True,
+        "server_start_time": timebase.isoformat(stats["server_start_ns"]),
+        "current_time": timebase.isoformat(now),
+        "statistics": {
+            "joystick": {
+                "total_received": received["joystick"],
+                "last_received": timebase.isoformat(stats["last_joystick_ns"]),
+                "elapsed_seconds": round(joystick_elapsed, 2) if joystick_elapsed is not None else None,
+                "is_active": joystick_active
+            },
+            "button": {
+                "total_received": received["button"],
+                "last_received": timebase.isoformat(stats["last_button_ns"]),
+                "elapsed_seconds": round(button_elapsed, 2) if button_elapsed is not None else None,
+                "is_active": button_active
+            }
+        },
+        "recent_data": get_recent_data(),
+        "summary": {
+            "receiving_data": joystick_active or button_active,
+            "message": "데이터 수신 중" if (joystick_active or button_active) else "데이터 수신 대기 중"
+        }
+    }
+
+
+def calculate_joystick_keys(x, y, controller=None):
+    """
+    조이스틱 입력값(x, y)을 방향 비트마스크로 변환 (히스테리시스 적용)
+    
+    키 집합은 controller.key_sets[mask], 방향 이름은 controller.joystick_results[mask]["keys_pressed"]
+    (미리 만들어 둔 값이므로 이벤트마다 새 집합/리스트를 만들지 않음)
     
     Args:
         x: 조이스틱 X 좌표 (-1.0 ~ 1.0)
         y: 조이스틱 Y 좌표 (-1.0 ~ 1.0)
+        controller: 컨트롤러 상태 (기본값: 기본 컨트롤러)
     
     Returns:
-        tuple: (target_keys: set, keys_to_press: list, is_active: bool)
-    """
-    target_keys = set()  # 눌려야 할 키 집합
-    keys_to_press = []  # 눌려야 할 키 이름 리스트
-    is_active = False  # 조이스틱이 활성 상태인지
-    
-    # 이전에 활성화된 키들 가져오기
-    previous_active_keys = last_joystick_state.get("active_keys", set())
-    
-    # 히스테리시스 적용: 키를 누르기 시작할 때는 높은 임계값, 떼기 시작할 때는 낮은 임계값 사용
-    # 위/아래 방향
-    up_was_active = config.KEY_MAPPING["up"] in previous_active_keys
-    down_was_active = config.KEY_MAPPING["down"] in previous_active_keys
-    
-    if up_was_active:
-        # 위 키가 이미 눌려있었으면 낮은 임계값으로 유지 (떨림 방지)
-        if y > config.JOYSTICK_THRESHOLD_OFF:
-            target_keys.add(config.KEY_MAPPING["up"])
-            keys_to_press.append("up")
-            is_active = True
-    else:
-        # 위 키가 눌려있지 않았으면 높은 임계값으로 시작
-        if y > config.JOYSTICK_THRESHOLD_ON:
-            target_keys.add(config.KEY_MAPPING["up"])
-            keys_to_press.append("up")
-            is_active = True
-    
-    if down_was_active:
-        # 아래 키가 이미 눌려있었으면 낮은 임계값으로 유지 (떨림 방지)
-        if y < -config.JOYSTICK_THRESHOLD_OFF:
-            target_keys.add(config.KEY_MAPPING["down"])
-            keys_to_press.append("down")
-            is_active = True
-    else:
-        # 아래 키가 눌려있지 않았으면 높은 임계값으로 시작
-        if y < -config.JOYSTICK_THRESHOLD_ON:
-            target_keys.add(config.KEY_MAPPING["down"])
-            keys_to_press.append("down")
-            is_active = True
-    
-    # 좌/우 방향
-    right_was_active = config.KEY_MAPPING["right"] in previous_active_keys
-    left_was_active = config.KEY_MAPPING["left"] in previous_active_keys
-    
-    if right_was_active:
-        # 오른쪽 키가 이미 눌려있었으면 낮은 임계값으로 유지 (떨림 방지)
-        if x > config.JOYSTICK_THRESHOLD_OFF:
-            target_keys.add(config.KEY_MAPPING["right"])
-            keys_to_press.append("right")
-            is_active = True
-    else:
-        # 오른쪽 키가 눌려있지 않았으면 높은 임계값으로 시작
-        if x > config.JOYSTICK_THRESHOLD_ON:
-            target_keys.add(config.KEY_MAPPING["right"])
-            keys_to_press.append("right")
-            is_active = True
-    
-    if left_was_active:
-        # 왼쪽 키가 이미 눌려있었으면 낮은 임계값으로 유지 (떨림 방지)
-        if x < -config.JOYSTICK_THRESHOLD_OFF:
-            target_keys.add(config.KEY_MAPPING["left"])
-            keys_to_press.append("left")
-            is_active = True
-    else:
-        # 왼쪽 키가 눌려있지 않았으면 높은 임계값으로 시작
-        if x < -config.JOYSTICK_THRESHOLD_ON:
-            target_keys.add(config.KEY_MAPPING["left"])
-            keys_to_press.append("left")
-            is_active = True
+        int: 눌려야 할 방향 비트 (DIR_UP | DIR_DOWN | DIR_RIGHT | DIR_LEFT, 0이면 중앙)
+    """
+    settings = tunables.current  # 설정 스냅샷 (파일이 바뀌어도 이 호출 안에서는 같은 값)
+    threshold_on = settings.joystick_threshold_on
+    threshold_off = settings.joystick_threshold_off
     
-    return target_keys, keys_to_press, is_active
+    if controller is None:
+        controller = default_controller
+    
+    # 히스테리시스 적용: 이미 눌려있던 방향은 낮은 임계값으로 유지(떨림 방지), 새로 누를 때는 높은 임계값
+    previous = controller.joystick.mask
+    mask = 0
+    if y > (threshold_off if previous & DIR_UP else threshold_on):
+        mask |= DIR_UP
+    if y < -(threshold_off if previous & DIR_DOWN else threshold_on):
+        mask |= DIR_DOWN
+    if x > (threshold_off if previous & DIR_RIGHT else threshold_on):
+        mask |= DIR_RIGHT
+    if x < -(threshold_off if previous & DIR_LEFT else threshold_on):
+        mask |= DIR_LEFT
+    return mask
+
+
+def warm_up():
+    """
+    입력 처리 경로를 미리 한 번 실행 (첫 이벤트 지연 제거, 상태는 변경하지 않음)
+    """
+    parse_joystick_data({"x": 0.0, "y": 0.0})
+    calculate_joystick_keys(0.0, 0.0)
+    parse_button_data({"button": next(iter(config.KEY_MAPPING))})
+    get_status_snapshot()
 
 
 def reset_all_states_internal():
     """
-    내부 상태 초기화 함수 (게임 재시작 시 사용)
+    내부 상태 초기화 함수 (게임 재시작 시 사용 - 모든 컨트롤러 초기화)
     """
-    # 모든 키 해제
+    # 재생 중인 매크로 취소 및 모든 키 해제
+    macros.player.cancel()
     keyboard_handler.release_all_keys()
     
-    # 조이스틱 상태 초기화
-    last_joystick_state["x"] = 0.0
-    last_joystick_state["y"] = 0.0
-    last_joystick_state["keys"] = set()
-    last_joystick_state["is_active"] = False
-    last_joystick_state["active_keys"] = set()
+    # 컨트롤러별 조이스틱/버튼 상태 초기화
+    for controller in list(controllers.values()):
+        controller.reset()
+
+
+# 중립 조이스틱 이벤트 (세션 종료 시 방향 키 해제)
+_NEUTRAL_JOYSTICK = codec.JoystickEvent(0.0, 0.0, 0, False)
+
+
+def release_controller(controller, source="Session", extra_buttons=()):
+    """
+    컨트롤러 하나의 조이스틱/버튼 입력을 모두 해제 (세션 종료 시, 다른 컨트롤러는 유지)
+    
+    입력 스케줄러를 거치므로 먼저 들어온 입력이 처리된 뒤에 해제된다.
     
-    # 버튼 상태 초기화
-    last_button_states.clear()
+    Args:
+        extra_buttons: 아직 처리되지 않았을 수 있는 눌린 버튼 이름 (세션이 기록한 상태)
+    """
+    submit_joystick_event(_NEUTRAL_JOYSTICK, source, controller)
+    for button in set(controller.pressed_buttons) | set(extra_buttons):
+        submit_button_event(codec.ButtonEvent(button, False), source, controller)
 
 
-def process_joystick_data_internal(data, source="HTTP"):
+def parse_joystick_data(data):
+    """
+    조이스틱 데이터 검증 및 변환
+    
+    Args:
+        data: 조이스틱 데이터 딕셔너리 {"x": float, "y": float, "strength": int, "reset": bool}
+    
+    Returns:
+        codec.JoystickEvent: (x: float, y: float, strength, reset_requested: bool)
+    
+    Raises:
+        ValueError: x, y가 숫자가 아닌 경우
+    """
+    return codec.joystick_from_dict(data)
+
+
+def process_joystick_data_internal(data, source="HTTP", controller=None):
     """
     조이스틱 데이터 처리 공통 함수 (HTTP/MQTT 공통)
     
     Args:
         data: 조이스틱 데이터 딕셔너리 {"x": float, "y": float, "strength": int, "reset": bool}
         source: 데이터 출처 ("HTTP" 또는 "MQTT")
+        controller: 컨트롤러 상태 (기본값: 기본 컨트롤러)
     
     Returns:
         dict: 처리 결과
     """
     try:
-        x = data.get('x', 0.0)
-        y = data.get('y', 0.0)
-        strength = data.get('strength', 0)
-        reset_requested = data.get('reset', False)
-        
-        # 데이터 타입 검증
-        try:
-            x = float(x)
-            y = float(y)
-        except (ValueError, TypeError):
-            error_msg = f"Invalid data type: x and y must be numbers"
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [Joystick/{source}] ⚠️ 에러: {error_msg}")
-            return {"status": "error", "message": error_msg}
-        
+        x, y, strength, reset_requested = parse_joystick_data(data)
+    except ValueError as e:
+        error_msg = str(e)
+        logger.error(f"Joystick/{source}", f"⚠️ 에러: {error_msg}")
+        return {"status": "error", "message": error_msg}
+    except Exception as e:
+        error_msg = f"Error processing joystick data: {e}"
+        logger.error(f"Joystick/{source}", f"⚠️ 에러: {error_msg}")
+        return {"status": "error", "message": str(e)}
+    
+    return apply_joystick_data(x, y, strength, reset_requested, source, controller)
+
+
+def _apply_joystick_keys(x, y, controller, now):
+    """
+    조이스틱 샘플을 컨트롤러 상태와 키 입력에 반영 (keyboard_lock 보유 상태에서 호출)
+    
+    Returns:
+        dict: 처리 결과 (controller.joystick_results[mask] - 미리 만든 응답)
+    """
+    # 키가 눌린 동안의 샘플 간격 학습 (중립 상태에서 쉬는 시간은 제외)
+    joystick_state = controller.joystick
+    if joystick_state.mask and controller.last_joystick_ns is not None:
+        controller.cadence.observe(now - controller.last_joystick_ns)
+    controller.last_joystick_ns = now
+    
+    # 조이스틱 입력값을 방향 비트마스크로 변환 (히스테리시스 적용)
+    mask = calculate_joystick_keys(x, y, controller)
+    target_keys = controller.key_sets[mask]
+    
+    changed = joystick_state.mask ^ mask
+    if changed:
+        counters.add(controller.transition_slot, _CHANGED_DIRECTIONS[changed])
+    
+    # 마지막 조이스틱 상태 저장 (미리 만든 키 집합을 그대로 참조 - 복사하지 않음)
+    joystick_state.x = x
+    joystick_state.y = y
+    joystick_state.mask = mask
+    joystick_state.keys = target_keys
+    
+    # 조이스틱 키 입력 처리 (press/release - 이 컨트롤러의 방향 키만)
+    keyboard_handler.update_joystick_keys(target_keys, controller.joystick_key_set)
+    return controller.joystick_results[mask]
+
+
+def _record_recent_joystick(x, y, strength, result, now, source, controller):
+    """최근 조이스틱 데이터 저장 (HTML 표시용)"""
+    recent = recent_joystick
+    recent.x = x
+    recent.y = y
+    recent.strength = strength
+    recent.keys = result["keys_pressed"]
+    recent.time_ns = now
+    recent.source = source
+    recent.controller = controller.controller_id
+
+
+def apply_joystick_data(x, y, strength, reset_requested, source="HTTP", controller=None):
+    """
+    검증된 조이스틱 데이터를 키 입력에 반영
+    
+    Args:
+        x, y: 조이스틱 좌표 (-1.0 ~ 1.0)
+        strength: 조이스틱 강도
+        reset_requested: 게임 재시작 요청 여부
+        source: 데이터 출처 ("HTTP" 또는 "MQTT")
+        controller: 컨트롤러 상태 (기본값: 기본 컨트롤러)
+    
+    Returns:
+        dict: 처리 결과
+    """
+    settings = tunables.current
+    if controller is None:
+        controller = default_controller
+    
+    try:
         # 게임 재시작 요청이 있으면 상태 초기화
         if reset_requested:
             reset_all_states_internal()
-            if config.ENABLE_VERBOSE_LOGGING:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] [Joystick/{source}] 게임 재시작 - 상태 초기화됨")
+            if settings.verbose:
+                logger.verbose(f"Joystick/{source}", "게임 재시작 - 상태 초기화됨")
         
         # 통계 업데이트
-        stats["joystick_count"] += 1
-        now = datetime.now()
-        stats["last_joystick_time"] = now
-        
-        # 조이스틱 입력값을 키 매핑으로 변환 (히스테리시스 적용)
-        target_keys, keys_to_press, is_active = calculate_joystick_keys(x, y)
+        counters.add(source_counters.slots(source)[_COUNT_JOYSTICK])
+        counters.add(controller.counter_slots[_COUNT_JOYSTICK])
+        now = timebase.now_ns()
+        stats["last_joystick_ns"] = now
         
-        # 마지막 조이스틱 상태 저장
-        last_joystick_state["x"] = x
-        last_joystick_state["y"] = y
-        last_joystick_state["keys"] = target_keys.copy()
-        last_joystick_state["is_active"] = is_active
-        last_joystick_state["active_keys"] = target_keys.copy()
+        with keyboard_handler.keyboard_lock:
+            result = _apply_joystick_keys(x, y, controller, now)
         
-        # 조이스틱 키 입력 처리 (press/release)
-        keyboard_handler.process_joystick_keys(target_keys)
+        _record_recent_joystick(x, y, strength, result, now, source, controller)
         
-        # 최근 데이터 저장
-        recent_data["last_joystick"] = {
-            "x": round(x, 2),
-            "y": round(y, 2),
-            "strength": strength,
-            "keys": keys_to_press,
-            "time": now.isoformat(),
-            "source": source
-        }
+        if settings.verbose:
+            if result["keys_pressed"]:
+                logger.verbose(f"Joystick/{source}", f"✓ 데이터 수신 - X: {x:.2f}, Y: {y:.2f} → Keys: {list(result['keys_pressed'])}", sample=10)
         
-        if config.ENABLE_VERBOSE_LOGGING:
-            if keys_to_press:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] [Joystick/{source}] ✓ 데이터 수신 - "
-                      f"X: {x:.2f}, Y: {y:.2f} → Keys: {keys_to_press}")
-        
-        return {
-            "status": "ok",
-            "received": True,
-            "keys_pressed": keys_to_press
-        }
+        return result
         
     except Exception as e:
         error_msg = f"Error processing joystick data: {e}"
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [Joystick/{source}] ⚠️ 에러: {error_msg}")
-        import traceback
-        if config.ENABLE_VERBOSE_LOGGING:
-            traceback.print_exc()
+        logger.exception(f"Joystick/{source}", f"⚠️ 에러: {error_msg}")
         return {"status": "error", "message": str(e)}
 
 
-def process_button_data_internal(data, source="HTTP"):
+def parse_button_data(data, key_mapping=None):
+    """
+    버튼 데이터 검증
+    
+    Args:
+        data: 버튼 데이터 딕셔너리 {"button": str, "pressed": bool}
+        key_mapping: 검증에 사용할 키 매핑 (기본값: config.KEY_MAPPING)
+    
+    Returns:
+        codec.ButtonEvent: (button: str, pressed: bool)
+    
+    Raises:
+        ValueError: 버튼 이름이 없거나 매핑되지 않은 버튼인 경우
+    """
+    return codec.button_from_dict(data, key_mapping)
+
+
+def process_button_data_internal(data, source="HTTP", controller=None):
     """
     버튼 데이터 처리 공통 함수 (HTTP/MQTT 공통)
     
     Args:
         data: 버튼 데이터 딕셔너리 {"button": str, "pressed": bool}
         source: 데이터 출처 ("HTTP" 또는 "MQTT")
+        controller: 컨트롤러 상태 (기본값: 기본 컨트롤러)
     
     Returns:
         dict: 처리 결과
     """
+    if controller is None:
+        controller = default_controller
+    
+    try:
+        button, pressed = parse_button_data(data, controller.key_mapping)
+    except ValueError as e:
+        error_msg = str(e)
+        logger.error(f"Button/{source}", f"⚠️ 에러: {error_msg}")
+        return {"status": "error", "message": error_msg}
+    except Exception as e:
+        error_msg = f"Error processing button data: {e}"
+        logger.error(f"Button/{source}", f"⚠️ 에러: {error_msg}")
+        return {"status": "error", "message": str(e)}
+    
+    return apply_button_data(button, pressed, source, controller)
+
+
+def _press_button_key(controller, button, key):
+    """버튼 키 누르기 (keyboard_lock 안에서 호출 - 조이스틱이 누른 방향 키와 추적 분리)"""
+    settings = tunables.current
+    if isinstance(key, Macro):
+        # 매크로 버튼: 재생 스레드에 맡기고 바로 반환
+        macros.player.start(key.name, owner=(controller.controller_id, button))
+        return
+    
+    is_joystick_key = key in controller.joystick_key_set
+    
+    if is_joystick_key and key in controller.joystick.keys:
+        keyboard_handler.pressed_button_keys.add(key)
+        if settings.verbose:
+            logger.verbose("Key", f"Button pressed, joystick key already active: {key}")
+    elif key in keyboard_handler.pressed_joystick_keys:
+        keyboard_handler.pressed_joystick_keys.discard(key)
+    
+    if key not in keyboard_handler.pressed_keyboard_keys:
+        try:
+            keyboard_handler.keyboard.press(key)
+            keyboard_handler.pressed_keyboard_keys.add(key)
+            keyboard_handler.pressed_button_keys.add(key)
+            if settings.verbose:
+                logger.verbose("Key", f"Pressed (Button): {key}")
+        except Exception as e:
+            if settings.verbose:
+                logger.error("Key", f"Error pressing key {key}: {e}")
+    else:
+        keyboard_handler.pressed_button_keys.add(key)
+
+
+def _release_button_key(controller, button, key):
+    """버튼 키 떼기 (keyboard_lock 안에서 호출 - 조이스틱이 같은 방향을 누르고 있으면 유지)"""
+    settings = tunables.current
+    if isinstance(key, Macro):
+        # 반복 매크로만 취소 (한 번 재생 매크로는 끝까지 재생)
+        macros.player.cancel(owner=(controller.controller_id, button), repeating_only=True)
+        return
+    
+    keyboard_handler.pressed_button_keys.discard(key)
+    
+    if key in controller.joystick_key_set and key in controller.joystick.keys:
+        keyboard_handler.pressed_joystick_keys.add(key)
+        if settings.verbose:
+            logger.verbose("Key", f"Button released, joystick continues: {key}")
+        return
+    
+    if key in keyboard_handler.pressed_keyboard_keys:
+        try:
+            keyboard_handler.keyboard.release(key)
+            keyboard_handler.pressed_keyboard_keys.discard(key)
+            keyboard_handler.pressed_joystick_keys.discard(key)
+            if settings.verbose:
+                logger.verbose("Key", f"Released (Button): {key}")
+        except Exception as e:
+            if settings.verbose:
+                logger.error("Key", f"Error releasing key {key}: {e}")
+
+
+def apply_button_data(button, pressed, source="HTTP", controller=None):
+    """
+    검증된 버튼 데이터를 키 입력에 반영
+    
+    Args:
+        button: 버튼 이름 (컨트롤러 키 매핑에 있는 이름)
+        pressed: 눌림 여부
+        source: 데이터 출처 ("HTTP" 또는 "MQTT")
+        controller: 컨트롤러 상태 (기본값: 기본 컨트롤러)
+    
+    Returns:
+        dict: 처리 결과
+    """
+    settings = tunables.current
+    if controller is None:
+        controller = default_controller
+    pressed_buttons = controller.pressed_buttons
+    keyboard_lock = keyboard_handler.keyboard_lock
+    pressed = bool(pressed)
+    
     try:
-        button = data.get('button', '')
-        pressed = data.get('pressed', False)
-        
-        # 버튼 이름 검증
-        if not button:
-            error_msg = "Button name is required"
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [Button/{source}] ⚠️ 에러: {error_msg}")
-            return {"status": "error", "message": error_msg}
-        
         # 통계 업데이트
-        stats["button_count"] += 1
-        now = datetime.now()
-        stats["last_button_time"] = now
-        
-        if button not in config.KEY_MAPPING:
-            error_msg = f"Unknown button: {button}. Available buttons: {list(config.KEY_MAPPING.keys())}"
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [Button/{source}] ⚠️ 에러: {error_msg}")
-            return {"status": "error", "message": error_msg}
+        counters.add(source_counters.slots(source)[_COUNT_BUTTON])
+        counters.add(controller.counter_slots[_COUNT_BUTTON])
+        now = timebase.now_ns()
+        stats["last_button_ns"] = now
+        controller.last_button_ns = now
         
-        key = config.KEY_MAPPING[button]
-        action = "pressed" if pressed else "released"
+        state = controller.buttons[button]
+        key = state.key
         
         # 빈 키 매핑 체크
         if not key:
-            return {"status": "ok", "message": f"Button {button} has no key mapping"}
+            return state.unmapped_result
         
-        # 이전 버튼 상태 확인 (중복 처리 방지)
-        previous_state = last_button_states.get(button, {}).get("pressed", False)
-        
-        # 상태가 변경되지 않았으면 처리하지 않음
-        if previous_state == pressed:
-            return {
-                "status": "ok",
-                "received": True,
-                "button": button,
-                "action": action,
-                "key": str(key),
-                "message": "State unchanged, skipped"
-            }
+        # 상태가 변경되지 않았으면 처리하지 않음 (중복 처리 방지)
+        if state.pressed == pressed:
+            return state.skipped_results[pressed]
         
         # 마지막 버튼 상태 저장
-        last_button_states[button] = {
-            "pressed": pressed,
-            "key": key,
-            "time": now
-        }
+        state.pressed = pressed
+        state.time_ns = now
+        counters.add(controller.transition_slot)
         
         # 상태가 변경되었을 때만 키 입력 처리
         if pressed:
-            if button not in keyboard_handler.pressed_keys:
-                with keyboard_handler.keyboard_lock:
-                    is_joystick_key = key in config.JOYSTICK_KEY_SET
-                    
-                    if is_joystick_key and key in last_joystick_state.get("active_keys", set()):
-                        keyboard_handler.pressed_button_keys.add(key)
-                        if config.ENABLE_VERBOSE_LOGGING:
-                            print(f"[Key] Button pressed, joystick key already active: {key}")
-                    elif is_joystick_key and key in keyboard_handler.pressed_joystick_keys:
-                        keyboard_handler.pressed_joystick_keys.discard(key)
-                    elif not is_joystick_key and key in keyboard_handler.pressed_joystick_keys:
-                        keyboard_handler.pressed_joystick_keys.discard(key)
-                    
-                    if key not in keyboard_handler.pressed_keyboard_keys:
-                        try:
-                            keyboard_handler.keyboard.press(key)
-                            keyboard_handler.pressed_keyboard_keys.add(key)
-                            keyboard_handler.pressed_button_keys.add(key)
-                            if config.ENABLE_VERBOSE_LOGGING:
-                                print(f"[Key] Pressed (Button): {key}")
-                        except Exception as e:
-                            if config.ENABLE_VERBOSE_LOGGING:
-                                print(f"Error pressing key {key}: {e}")
-                    else:
-                        keyboard_handler.pressed_button_keys.add(key)
-                
-                keyboard_handler.pressed_keys.add(button)
+            if button not in pressed_buttons:
+                with keyboard_lock:
+                    _press_button_key(controller, button, key)
+                pressed_buttons.add(button)
         else:
-            if button in keyboard_handler.pressed_keys:
-                with keyboard_handler.keyboard_lock:
-                    keyboard_handler.pressed_button_keys.discard(key)
-                    
-                    is_joystick_key = key in config.JOYSTICK_KEY_SET
-                    
-                    if is_joystick_key:
-                        should_keep_key = key in last_joystick_state.get("active_keys", set())
-                        
-                        if should_keep_key:
-                            keyboard_handler.pressed_joystick_keys.add(key)
-                            if config.ENABLE_VERBOSE_LOGGING:
-                                print(f"[Key] Button released, joystick continues: {key}")
-                        else:
-                            if key in keyboard_handler.pressed_keyboard_keys:
-                                try:
-                                    keyboard_handler.keyboard.release(key)
-                                    keyboard_handler.pressed_keyboard_keys.discard(key)
-                                    keyboard_handler.pressed_joystick_keys.discard(key)
-                                    if config.ENABLE_VERBOSE_LOGGING:
-                                        print(f"[Key] Released (Button): {key}")
-                                except Exception as e:
-                                    if config.ENABLE_VERBOSE_LOGGING:
-                                        print(f"Error releasing key {key}: {e}")
-                    else:
-                        if key in keyboard_handler.pressed_keyboard_keys:
-                            try:
-                                keyboard_handler.keyboard.release(key)
-                                keyboard_handler.pressed_keyboard_keys.discard(key)
-                                if config.ENABLE_VERBOSE_LOGGING:
-                                    print(f"[Key] Released (Button): {key}")
-                            except Exception as e:
-                                if config.ENABLE_VERBOSE_LOGGING:
-                                    print(f"Error releasing key {key}: {e}")
-                
-                keyboard_handler.pressed_keys.discard(button)
-            
-            if button in last_button_states:
-                del last_button_states[button]
+            if button in pressed_buttons:
+                with keyboard_lock:
+                    _release_button_key(controller, button, key)
+                pressed_buttons.discard(button)
+        
+        result = state.results[pressed]
         
         # 최근 데이터 저장
-        recent_data["last_button"] = {
-            "button": button,
-            "pressed": pressed,
-            "action": action,
-            "key": str(key),
-            "time": now.isoformat(),
-            "source": source
-        }
+        recent = recent_button
+        recent.button = button
+        recent.pressed = pressed
+        recent.action = result["action"]
+        recent.key = state.key_text
+        recent.time_ns = now
+        recent.source = source
+        recent.controller = controller.controller_id
         
-        if config.ENABLE_VERBOSE_LOGGING:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [Button/{source}] ✓ 데이터 수신 - "
-                  f"{button} {action} → Key: {key}")
+        if settings.verbose:
+            logger.verbose(f"Button/{source}", f"✓ 데이터 수신 - {button} {result['action']} → Key: {key}")
         
-        return {
+        return result
+        
+    except Exception as e:
+        error_msg = f"Error processing button data: {e}"
+        logger.exception(f"Button/{source}", f"⚠️ 에러: {error_msg}")
+        return {"status": "error", "message": str(e)}
+
+
+def apply_chord_data(mask, joystick=None, source="HTTP", controller=None):
+    """
+    검증된 코드(동시 입력)를 키 입력에 반영
+    
+    컨트롤러의 이전 버튼 비트마스크와 비교하여 바뀐 버튼만 keyboard_lock 한 번 안에서 모두 누르거나 떼고,
+    조이스틱 값이 있으면 방향 키도 같은 잠금 안에서 반영한다
+    (버튼 요청을 따로 보낼 때처럼 순서가 뒤바뀌거나 중간 상태가 출력되지 않음).
+    
+    Args:
+        mask: 눌린 버튼 비트마스크 (bit i = config.BINARY_BUTTON_CODES[i])
+        joystick: codec.JoystickEvent 또는 None (조이스틱 그대로 둠)
+        source: 데이터 출처 ("HTTP" 또는 "MQTT")
+        controller: 컨트롤러 상태 (기본값: 기본 컨트롤러)
+    
+    Returns:
+        dict: 처리 결과
+    """
+    settings = tunables.current
+    if controller is None:
+        controller = default_controller
+    button_states = controller.buttons
+    pressed_buttons = controller.pressed_buttons
+    key_mapping = controller.key_mapping
+    
+    try:
+        # 통계 업데이트
+        counters.add(source_counters.slots(source)[_COUNT_BUTTON])
+        counters.add(controller.counter_slots[_COUNT_BUTTON])
+        now = timebase.now_ns()
+        stats["last_button_ns"] = now
+        controller.last_button_ns = now
+        
+        previous = 0
+        for button in pressed_buttons:
+            previous |= codec.CHORD_BITS.get(button, 0)
+        changed = previous ^ mask
+        
+        pressed_list = []
+        released_list = []
+        joystick_result = None
+        if changed or joystick is not None:
+            with keyboard_handler.keyboard_lock:
+                # 뗀 버튼을 먼저 처리 (A → B 전환 시 두 키가 잠깐 같이 눌리지 않도록)
+                for button, bit in codec.CHORD_BITS.items():
+                    if changed & bit and not mask & bit:
+                        key = key_mapping.get(button)
+                        if key:
+                            _release_button_key(controller, button, key)
+                        pressed_buttons.discard(button)
+                        if button in button_states:
+                            button_states[button].pressed = False
+                        released_list.append(button)
+                for button, bit in codec.CHORD_BITS.items():
+                    if changed & bit and mask & bit:
+                        key = key_mapping.get(button)
+                        # 빈 키 매핑은 눌린 것으로 기록하지 않음 (apply_button_data와 동일)
+                        if not key:
+                            continue
+                        _press_button_key(controller, button, key)
+                        pressed_buttons.add(button)
+                        state = button_states[button]
+                        state.pressed = True
+                        state.time_ns = now
+                        pressed_list.append(button)
+                # 조이스틱 값도 같은 잠금 안에서 반영 (버튼과 방향 키 사이에 다른 입력이 끼어들지 않음)
+                if joystick is not None:
+                    joystick_result = _apply_joystick_keys(joystick.x, joystick.y, controller, now)
+        
+        if pressed_list or released_list:
+            counters.add(controller.transition_slot, len(pressed_list) + len(released_list))
+            recent = recent_button
+            recent.button = "+".join(pressed_list + released_list)
+            recent.pressed = bool(pressed_list)
+            recent.action = "chord"
+            recent.key = ", ".join(str(key_mapping[button]) for button in pressed_list + released_list)
+            recent.time_ns = now
+            recent.source = source
+            recent.controller = controller.controller_id
+            if settings.verbose:
+                logger.verbose(f"Chord/{source}", f"✓ 데이터 수신 - 누름 {pressed_list}, 뗌 {released_list}")
+        
+        result = {
             "status": "ok",
             "received": True,
-            "button": button,
-            "action": action,
-            "key": str(key)
+            "pressed": pressed_list,
+            "released": released_list
         }
+        if joystick is not None:
+            counters.add(source_counters.slots(source)[_COUNT_JOYSTICK])
+            counters.add(controller.counter_slots[_COUNT_JOYSTICK])
+            stats["last_joystick_ns"] = now
+            _record_recent_joystick(joystick.x, joystick.y, joystick.strength, joystick_result, now, source, controller)
+            result["keys_pressed"] = joystick_result["keys_pressed"]
+        return result
         
     except Exception as e:
-        error_msg = f"Error processing button data: {e}"
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [Button/{source}] ⚠️ 에러: {error_msg}")
-        import traceback
-        if config.ENABLE_VERBOSE_LOGGING:
-            traceback.print_exc()
+        error_msg = f"Error processing chord data: {e}"
+        logger.exception(f"Chord/{source}", f"⚠️ 에러: {error_msg}")
         return {"status": "error", "message": str(e)}
 
+
+class InputScheduler:
+    """
+    우선순위 입력 스케줄러
+    
+    부하가 높을 때 늦은 버튼 입력이 조이스틱 샘플 뒤에서 기다리지 않도록 입력을 두 단계로 나눠 처리한다.
+    - 높은 우선순위: 버튼 눌림/뗌, 코드(동시 입력), 재시작(reset) 요청 - 순서대로 모두 처리
+    - 낮은 우선순위: 조이스틱 샘플 - 최신 상태만 유지 (처리 전에 새 샘플이 오면 이전 샘플은 버림)
+    
+    키 입력은 전용 워커 스레드 하나에서만 처리되며, 요청 스레드는 큐에 넣고 바로 반환한다.
+    """
+    
+    def __init__(self, max_high_pending=256):
+        self.max_high_pending = max_high_pending
+        self._cond = threading.Condition()
+        self._high = collections.deque()  # [(kind, args, source, controller, enqueued_at)]
+        self._joystick = {}  # {controller_id: (args, source, controller, enqueued_at)} - 컨트롤러별 최신 샘플만 유지
+        self._thread = None
+        
+        # 클래스별 처리/버림 통계
+        self.processed_counts = {"button": 0, "chord": 0, "reset": 0, "joystick": 0}
+        self.dropped_counts = {"button": 0, "chord": 0, "reset": 0, "joystick": 0}
+        self.max_wait_ns = {"high": 0, "joystick": 0}
+        self._jitter = realtime.jitter["input_scheduler"]
+        self._latency = history.input_history.latency  # 큐 추가 → 적용 완료 시간 (입력 통계 기록용)
+    
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self):
+        """워커 스레드 시작"""
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="input-scheduler", daemon=True)
+        self._thread.start()
+    
+    def submit_high(self, kind, args, source, controller=None):
+        """
+        높은 우선순위 입력 추가 (버튼, 코드, 재시작)
+        
+        Returns:
+            bool: 큐에 추가되었는지 여부 (대기열이 가득 차면 False)
+        """
+        with self._cond:
+            if len(self._high) >= self.max_high_pending:
+                self.dropped_counts[kind] += 1
+                return False
+            if kind == "reset":
+                # 재시작 이전의 조이스틱 샘플은 의미가 없으므로 버림
+                self.dropped_counts["joystick"] += len(self._joystick)
+                self._joystick.clear()
+            elif kind == "chord" and args.joystick is not None:
+                # 코드에 포함된 조이스틱 값이 더 최신이므로 같은 컨트롤러의 대기 중인 샘플은 버림
+                lane_key = controller.controller_id if controller is not None else config.DEFAULT_CONTROLLER_ID
+                if self._joystick.pop(lane_key, None) is not None:
+                    self.dropped_counts["joystick"] += 1
+            self._high.append((kind, args, source, controller, timebase.now_ns()))
+            self._cond.notify()
+        return True
+    
+    def submit_joystick(self, args, source, controller=None):
+        """
+        조이스틱 샘플 추가 (같은 컨트롤러의 처리되지 않은 이전 샘플은 최신 샘플로 교체)
+        """
+        lane_key = controller.controller_id if controller is not None else config.DEFAULT_CONTROLLER_ID
+        with self._cond:
+            if lane_key in self._joystick:
+                self.dropped_counts["joystick"] += 1
+            self._joystick[lane_key] = (args, source, controller, timebase.now_ns())
+            self._cond.notify()
+        return True
+    
+    def pending(self):
+        """대기 중인 입력 수 {"high": int, "joystick": int}"""
+        with self._cond:
+            return {"high": len(self._high), "joystick": len(self._joystick)}
+    
+    def _next_item(self):
+        """다음 처리할 입력 꺼내기 (높은 우선순위 먼저)"""
+        with self._cond:
+            while not self._high and not self._joystick:
+                self._cond.wait()
+            if self._high:
+                kind, args, source, controller, enqueued_at = self._high.popleft()
+                lane = "high"
+            else:
+                lane_key = next(iter(self._joystick))
+                args, source, controller, enqueued_at = self._joystick.pop(lane_key)
+                kind = "joystick"
+                lane = "joystick"
+        
+        waited = timebase.now_ns() - enqueued_at
+        if waited > self.max_wait_ns[lane]:
+            self.max_wait_ns[lane] = waited
+        self._jitter.record(waited)
+        return kind, args, source, controller, enqueued_at
+    
+    def _run(self):
+        # 입력 처리용 코어 고정 및 우선순위 상향 (설정된 경우)
+        realtime.apply_critical("input_scheduler")
+        while True:
+            kind, args, source, controller, enqueued_at = self._next_item()
+            try:
+                if kind == "button":
+                    apply_button_data(*args, source=source, controller=controller)
+                elif kind == "chord":
+                    apply_chord_data(*args, source=source, controller=controller)
+                else:
+                    apply_joystick_data(*args, source=source, controller=controller)
+                self.processed_counts[kind] += 1
+                self._latency.record(timebase.now_ns() - enqueued_at)
+            except Exception as e:
+                logger.error("Scheduler", f"⚠️ 입력 처리 에러: {e}")
+    
+    def get_stats(self):
+        """스케줄러 통계 반환 (/status 표시용)"""
+        return {
+            "running": self.running,
+            "pending": self.pending(),
+            "processed": dict(self.processed_counts),
+            "dropped": dict(self.dropped_counts),
+            "max_wait_ms": {
+                lane: round(ns / 1_000_000, 2) for lane, ns in self.max_wait_ns.items()
+            }
+        }
+
+
+# 입력 스케줄러 (server.py에서 start() 호출 시 활성화)
+input_scheduler = InputScheduler(max_high_pending=config.INPUT_QUEUE_MAX_PENDING)
+
+# 큐에 추가된 입력에 대한 응답 (요청마다 새로 만들지 않음 - 버튼은 ButtonState.queued_results)
+# 조이스틱 샘플은 처리 전에 더 새로운 샘플로 교체될 수 있으므로 누를 키(keys_pressed)는 응답에 넣지 않음
+_QUEUED_RESULT = {"status": "ok", "received": True, "queued": True}
+# 큐가 가득 찬 경우 - 요청 형식 에러(400)와 구분하여 HTTP는 503 + Retry-After로 응답
+_QUEUE_FULL_RESULT = {"status": "error", "message": "Input queue is full", "overloaded": True}
+QUEUE_FULL_RETRY_AFTER = 1  # 큐가 가득 찼을 때 Retry-After (초)
+
+
+def submit_joystick_data(data, source="HTTP", controller=None):
+    """
+    조이스틱 데이터(딕셔너리)를 검증 후 스케줄러에 전달
+    
+    Args:
+        controller: 컨트롤러 상태 (기본값: 기본 컨트롤러)
+    
+    Returns:
+        dict: 처리 결과 (큐에 추가된 경우 {"status": "ok", "queued": True})
+    """
+    try:
+        event = parse_joystick_data(data)
+    except ValueError as e:
+        error_msg = str(e)
+        logger.error(f"Joystick/{source}", f"⚠️ 에러: {error_msg}")
+        return {"status": "error", "message": error_msg}
+    
+    return submit_joystick_event(event, source, controller)
+
+
+def submit_joystick_event(event, source="HTTP", controller=None):
+    """
+    검증된 조이스틱 이벤트를 스케줄러에 전달 (스케줄러가 꺼져 있으면 즉시 처리)
+    
+    Args:
+        event: codec.JoystickEvent
+        controller: 컨트롤러 상태 (기본값: 기본 컨트롤러)
+    
+    Returns:
+        dict: 처리 결과 (큐에 추가된 경우 {"status": "ok", "queued": True}, 큐가 가득 찬 경우 {"overloaded": True})
+    """
+    if not (config.INPUT_SCHEDULER_ENABLED and input_scheduler.running):
+        return apply_joystick_data(*event, source=source, controller=controller)
+    
+    # 재시작 요청은 높은 우선순위로 처리
+    if event.reset:
+        accepted = input_scheduler.submit_high("reset", event, source, controller)
+    else:
+        accepted = input_scheduler.submit_joystick(event, source, controller)
+    return _QUEUED_RESULT if accepted else _QUEUE_FULL_RESULT
+
+
+def submit_button_data(data, source="HTTP", controller=None):
+    """
+    버튼 데이터(딕셔너리)를 검증 후 스케줄러에 전달
+    
+    Args:
+        controller: 컨트롤러 상태 (기본값: 기본 컨트롤러)
+    
+    Returns:
+        dict: 처리 결과 (큐에 추가된 경우 {"status": "ok", "queued": True})
+    """
+    try:
+        event = parse_button_data(data, controller.key_mapping if controller is not None else None)
+    except ValueError as e:
+        error_msg = str(e)
+        logger.error(f"Button/{source}", f"⚠️ 에러: {error_msg}")
+        return {"status": "error", "message": error_msg}
+    
+    return submit_button_event(event, source, controller)
+
+
+def submit_button_event(event, source="HTTP", controller=None):
+    """
+    검증된 버튼 이벤트를 스케줄러에 전달 (스케줄러가 꺼져 있으면 즉시 처리)
+    
+    Args:
+        event: codec.ButtonEvent
+        controller: 컨트롤러 상태 (기본값: 기본 컨트롤러)
+    
+    Returns:
+        dict: 처리 결과 (큐에 추가된 경우 {"status": "ok", "queued": True, "button", "action", "key"},
+              큐가 가득 찬 경우 {"overloaded": True})
+    """
+    if not (config.INPUT_SCHEDULER_ENABLED and input_scheduler.running):
+        return apply_button_data(*event, source=source, controller=controller)
+    
+    accepted = input_scheduler.submit_high("button", event, source, controller)
+    if not accepted:
+        return _QUEUE_FULL_RESULT
+    state = (controller or default_controller).buttons[event.button]
+    return state.queued_results[bool(event.pressed)]
+
+
+def submit_chord_event(event, source="HTTP", controller=None):
+    """
+    검증된 코드 이벤트를 스케줄러에 전달 (스케줄러가 꺼져 있으면 즉시 처리)
+    
+    Args:
+        event: codec.ChordEvent
+        controller: 컨트롤러 상태 (기본값: 기본 컨트롤러)
+    
+    Returns:
+        dict: 처리 결과 (큐에 추가된 경우 {"status": "ok", "queued": True}, 큐가 가득 찬 경우 {"overloaded": True})
+    """
+    if not (config.INPUT_SCHEDULER_ENABLED and input_scheduler.running):
+        return apply_chord_data(*event, source=source, controller=controller)
+    
+    accepted = input_scheduler.submit_high("chord", event, source, controller)
+    return _QUEUED_RESULT if accepted else _QUEUE_FULL_RESULT
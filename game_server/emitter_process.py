@@ -0,0 +1,416 @@
+"""
+키 입력 출력 프로세스 모듈
+키보드 출력(pynput)을 별도 프로세스에서 실행하고, 웹 서버 프로세스는 공유 메모리 링 버퍼에 명령만 기록
+
+웹 서버 프로세스의 GIL은 요청 파싱, 템플릿 렌더링, JSON 생성과 키 출력이 함께 사용하므로
+부하가 높으면 키 입력 시점이 흔들린다. 출력 프로세스는 자체 GIL에서 명령을 꺼내 바로 출력한다.
+
+링 버퍼 구조 (multiprocessing.shared_memory):
+- 헤더 (64바이트): write_idx, read_idx, heartbeat_ns, emitted, state, pid (각 uint64)
+  - write_idx는 웹 서버 프로세스만, 나머지는 출력 프로세스만 기록 (단일 생산자/단일 소비자)
+- 슬롯 (32바이트 고정): op uint8, kind uint8, length uint8, name 29바이트
+- 슬롯을 기록한 뒤 명령마다 세마포어를 한 번 release하고, 출력 프로세스는 acquire한 횟수만큼만 슬롯을 읽는다
+  (세마포어 release/acquire가 프로세스 간 메모리 순서를 보장 - 공유 메모리의 write_idx만으로는 ARM처럼
+   메모리 순서가 약한 CPU에서 슬롯 내용보다 write_idx가 먼저 보일 수 있음. write_idx는 사용량 표시용)
+
+키 상태 추적(pressed_keyboard_keys 등)은 그대로 웹 서버 프로세스의 keyboard_handler가 담당하며,
+이 모듈은 keyboard_handler.set_backend()로 교체되는 백엔드(press/release)만 제공한다.
+"""
+
+import multiprocessing
+import os
+import signal
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+
+from . import config
+from . import logger
+from . import timebase
+from .keys import Key, SpecialKey
+
+# 헤더 필드 오프셋
+_HEADER = struct.Struct("<QQQQQQ")
+_HEADER_SIZE = 64
+_U64 = struct.Struct("<Q")
+_WRITE_IDX = 0
+_READ_IDX = 8
+_HEARTBEAT = 16
+_EMITTED = 24
+_STATE = 32
+_PID = 40
+
+_SLOT = struct.Struct("<BBB29s")
+_SLOT_SIZE = 32
+_MAX_NAME_BYTES = 29
+
+# 명령 종류
+OP_PRESS = 1
+OP_RELEASE = 2
+OP_SHUTDOWN = 3
+
+# 키 종류
+_KIND_CHAR = 0
+_KIND_SPECIAL = 1
+
+# 출력 프로세스 상태
+STATE_STARTING = 0
+STATE_RUNNING = 1
+STATE_BACKEND_ERROR = 2  # 키보드 백엔드 초기화 실패 (명령은 계속 꺼내지만 출력하지 못함)
+STATE_STOPPED = 3
+_STATE_NAMES = {
+    STATE_STARTING: "starting",
+    STATE_RUNNING: "running",
+    STATE_BACKEND_ERROR: "backend_error",
+    STATE_STOPPED: "stopped",
+}
+
+
+def _encode_key(key):
+    """키 기호 → (kind, 이름 바이트)"""
+    if isinstance(key, SpecialKey):
+        kind, name = _KIND_SPECIAL, key.name
+    elif isinstance(key, str):
+        kind, name = _KIND_CHAR, key
+    else:
+        raise ValueError(f"공유 메모리로 전달할 수 없는 키: {key!r}")
+    data = name.encode("utf-8")
+    if len(data) > _MAX_NAME_BYTES:
+        raise ValueError(f"키 이름이 너무 깁니다: {key!r}")
+    return kind, data
+
+
+def _decode_key(kind, data):
+    name = data.decode("utf-8")
+    return getattr(Key, name) if kind == _KIND_SPECIAL else name
+
+
+class RingBuffer:
+    """
+    공유 메모리 단일 생산자/단일 소비자 링 버퍼
+
+    Args:
+        shm: SharedMemory (헤더 + capacity개 슬롯)
+        capacity: 슬롯 수
+        wakeup: 명령마다 한 번 release하는 multiprocessing.Semaphore (슬롯 기록 완료 신호 겸 출력 프로세스 깨우기)
+    """
+
+    def __init__(self, shm, capacity, wakeup):
+        self.shm = shm
+        self.capacity = capacity
+        self.wakeup = wakeup
+        self._buf = shm.buf
+        self._write_idx = _U64.unpack_from(self._buf, _WRITE_IDX)[0]
+        self._read_idx = _U64.unpack_from(self._buf, _READ_IDX)[0]
+        self._encoded = {}  # {키: (kind, 이름 바이트)} 인코딩 캐시
+
+        # 생산자 통계
+        self.pushed = 0
+        self.dropped = 0
+        self.max_occupancy = 0
+
+    @staticmethod
+    def size_for(capacity):
+        return _HEADER_SIZE + capacity * _SLOT_SIZE
+
+    @classmethod
+    def create(cls, capacity, wakeup):
+        shm = shared_memory.SharedMemory(create=True, size=cls.size_for(capacity))
+        shm.buf[:_HEADER_SIZE] = bytes(_HEADER_SIZE)
+        return cls(shm, capacity, wakeup)
+
+    def _load(self, offset):
+        return _U64.unpack_from(self._buf, offset)[0]
+
+    def _store(self, offset, value):
+        _U64.pack_into(self._buf, offset, value)
+
+    # ------------------------------------------------------------------
+    # 생산자 (웹 서버 프로세스, keyboard_lock 안에서만 호출)
+    # ------------------------------------------------------------------
+
+    def push(self, op, key=None):
+        """
+        명령 추가
+
+        Returns:
+            bool: 추가 여부 (KEY_EMITTER_FULL_WAIT 동안 빈 슬롯이 없으면 False)
+        """
+        if key is None:
+            kind, name = _KIND_CHAR, b""
+        else:
+            encoded = self._encoded.get(key)
+            if encoded is None:
+                encoded = _encode_key(key)
+                self._encoded[key] = encoded
+            kind, name = encoded
+
+        index = self._write_idx
+        occupancy = index - self._load(_READ_IDX)
+        if occupancy >= self.capacity:
+            deadline = time.monotonic() + config.KEY_EMITTER_FULL_WAIT
+            while index - self._load(_READ_IDX) >= self.capacity:
+                if time.monotonic() >= deadline:
+                    self.dropped += 1
+                    return False
+                time.sleep(0.0005)
+            occupancy = index - self._load(_READ_IDX)
+
+        offset = _HEADER_SIZE + (index % self.capacity) * _SLOT_SIZE
+        _SLOT.pack_into(self._buf, offset, op, kind, len(name), name)
+        self._write_idx = index + 1
+        self._store(_WRITE_IDX, index + 1)
+        # 슬롯 기록 후 release (출력 프로세스는 acquire한 만큼만 읽으므로 기록이 끝난 슬롯만 보게 됨)
+        self.wakeup.release()
+
+        self.pushed += 1
+        if occupancy + 1 > self.max_occupancy:
+            self.max_occupancy = occupancy + 1
+        return True
+
+    # ------------------------------------------------------------------
+    # 소비자 (출력 프로세스)
+    # ------------------------------------------------------------------
+
+    def pop_available(self, timeout):
+        """
+        기록이 끝난 명령을 모두 꺼냄 (없으면 timeout초 동안 대기)
+
+        Returns:
+            list: [(op, key)] - 세마포어를 acquire한 횟수만큼 (생산자가 release한 슬롯만)
+        """
+        if not self.wakeup.acquire(timeout=timeout):
+            return []
+        count = 1
+        while self.wakeup.acquire(False):
+            count += 1
+
+        commands = []
+        for index in range(self._read_idx, self._read_idx + count):
+            offset = _HEADER_SIZE + (index % self.capacity) * _SLOT_SIZE
+            op, kind, length, name = _SLOT.unpack_from(self._buf, offset)
+            commands.append((op, _decode_key(kind, name[:length]) if op != OP_SHUTDOWN else None))
+        self._read_idx += count
+        self._store(_READ_IDX, self._read_idx)
+        return commands
+
+    def heartbeat(self, emitted, state):
+        self._store(_HEARTBEAT, timebase.now_ns())
+        self._store(_EMITTED, emitted)
+        self._store(_STATE, state)
+
+    # ------------------------------------------------------------------
+
+    def read_header(self):
+        """헤더 값 {"write_idx", "read_idx", "heartbeat_ns", "emitted", "state", "pid"}"""
+        values = _HEADER.unpack_from(self._buf, 0)
+        return dict(zip(("write_idx", "read_idx", "heartbeat_ns", "emitted", "state", "pid"), values))
+
+    def close(self):
+        self._buf = None
+        self.shm.close()
+
+
+def _emitter_main(shm_name, capacity, wakeup, parent_pid, backend_factory=None):
+    """출력 프로세스 진입점 (spawn으로 시작되므로 모듈 수준 함수)"""
+    from . import keyboard_handler
+    from . import realtime
+
+    # Ctrl+C는 웹 서버 프로세스가 처리하고 종료 명령을 보내므로 무시 (눌린 키를 떼기 전에 중단되지 않도록)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = RingBuffer(shm, capacity, wakeup)
+    ring._store(_PID, os.getpid())
+
+    # 입력 처리용 코어 고정 및 우선순위 상향 (설정된 경우, 결과는 출력 프로세스 로그로 출력)
+    realtime.apply_critical("emitter")
+
+    backend = backend_factory() if backend_factory is not None else keyboard_handler.PynputKeyboard()
+    state = STATE_RUNNING
+    warm = getattr(backend, "warm_up", None)
+    if warm is not None:
+        try:
+            warm(keyboard_handler.mapped_keys())
+        except Exception:
+            state = STATE_BACKEND_ERROR
+
+    pressed = set()
+    emitted = 0
+    try:
+        while True:
+            ring.heartbeat(emitted, state)
+            for op, key in ring.pop_available(timeout=0.1):
+                if op == OP_SHUTDOWN:
+                    return
+                try:
+                    if op == OP_PRESS:
+                        backend.press(key)
+                        pressed.add(key)
+                    else:
+                        backend.release(key)
+                        pressed.discard(key)
+                    emitted += 1
+                except Exception as e:
+                    logger.error("Emitter", f"⚠️ 키 출력 에러 ({key}): {e}")
+            # 웹 서버 프로세스가 비정상 종료되면 눌린 키를 모두 떼고 종료
+            if os.getppid() != parent_pid:
+                return
+    finally:
+        for key in pressed:
+            try:
+                backend.release(key)
+            except Exception:
+                pass
+        close = getattr(backend, "close", None)
+        if close is not None:
+            close()
+        ring.heartbeat(emitted, STATE_STOPPED)
+        logger.flush()
+        ring.close()
+
+
+class ProcessKeyboard:
+    """
+    별도 프로세스로 키를 출력하는 키보드 백엔드 (keyboard_handler.set_backend()에 전달)
+
+    press/release는 링 버퍼에 명령을 기록하고 바로 반환한다.
+
+    Args:
+        capacity: 링 버퍼 슬롯 수 (기본값: config.KEY_EMITTER_RING_SLOTS)
+        backend_factory: 출력 프로세스에서 키보드 백엔드를 만드는 함수 (기본값: pynput, 벤치마크/테스트용)
+    """
+
+    def __init__(self, capacity=None, backend_factory=None):
+        self.capacity = capacity or config.KEY_EMITTER_RING_SLOTS
+        self.backend_factory = backend_factory
+        self.ring = None
+        self.process = None
+        self._lock = threading.Lock()
+
+    def start(self, timeout=5.0):
+        """
+        링 버퍼 생성 및 출력 프로세스 시작 (첫 하트비트까지 대기)
+
+        Returns:
+            bool: 출력 프로세스가 제한 시간 안에 키 출력을 시작했는지 여부
+        """
+        with self._lock:
+            if self.process is None:
+                # 웹 서버 프로세스는 스레드가 많으므로 fork 대신 spawn 사용
+                context = multiprocessing.get_context("spawn")
+                wakeup = context.Semaphore(0)
+                self.ring = RingBuffer.create(self.capacity, wakeup)
+                self.process = context.Process(
+                    target=_emitter_main,
+                    args=(self.ring.shm.name, self.capacity, wakeup, os.getpid(), self.backend_factory),
+                    name="key-emitter",
+                    daemon=True
+                )
+                self.process.start()
+                logger.log("Emitter", f"키 출력 프로세스 시작 (PID {self.process.pid}, 슬롯 {self.capacity}개)")
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and self.process.is_alive():
+            state = self.ring.read_header()["state"]
+            if state != STATE_STARTING:
+                return state == STATE_RUNNING
+            time.sleep(0.01)
+        return False
+
+    def _push(self, op, key):
+        if self.ring is None:
+            raise RuntimeError("키 출력 프로세스가 시작되지 않았습니다")
+        if not self.ring.push(op, key):
+            raise RuntimeError("키 출력 링 버퍼가 가득 찼습니다")
+
+    def press(self, key):
+        self._push(OP_PRESS, key)
+
+    def release(self, key):
+        self._push(OP_RELEASE, key)
+
+    def warm_up(self, keys):
+        """출력 프로세스 시작 (키보드 백엔드는 출력 프로세스에서 초기화)"""
+        if not self.start():
+            raise RuntimeError("키 출력 프로세스의 키보드 백엔드를 초기화하지 못했습니다")
+
+    def stop(self, timeout=2.0):
+        """출력 프로세스 종료 (눌린 키는 출력 프로세스가 모두 뗀 뒤 종료) 및 공유 메모리 해제"""
+        with self._lock:
+            if self.process is None:
+                return
+            if self.process.is_alive():
+                # 링 버퍼 생산자는 keyboard_lock 안에서만 기록 (단일 생산자)
+                from . import keyboard_handler
+                with keyboard_handler.keyboard_lock:
+                    self.ring.push(OP_SHUTDOWN)
+                self.process.join(timeout)
+                if self.process.is_alive():
+                    self.process.terminate()
+                    self.process.join(timeout)
+            self.ring.close()
+            try:
+                self.ring.shm.unlink()
+            except FileNotFoundError:
+                pass
+            self.process = None
+
+    def get_stats(self):
+        """출력 프로세스 상태 및 링 버퍼 사용량 (/status 표시용)"""
+        if self.process is None:
+            return {"mode": "process", "alive": False}
+        header = self.ring.read_header()
+        heartbeat_age = timebase.elapsed_seconds(header["heartbeat_ns"]) if header["heartbeat_ns"] else None
+        alive = (
+            self.process.is_alive()
+            and heartbeat_age is not None
+            and heartbeat_age < config.KEY_EMITTER_HEARTBEAT_TIMEOUT
+        )
+        return {
+            "mode": "process",
+            "alive": alive,
+            "pid": self.process.pid,
+            "state": _STATE_NAMES.get(header["state"], "unknown"),
+            "heartbeat_age_ms": round(heartbeat_age * 1000, 1) if heartbeat_age is not None else None,
+            "occupancy": header["write_idx"] - header["read_idx"],
+            "max_occupancy": self.ring.max_occupancy,
+            "capacity": self.capacity,
+            "pushed": self.ring.pushed,
+            "emitted": header["emitted"],
+            "dropped": self.ring.dropped
+        }
+
+
+# 실행 중인 출력 프로세스 백엔드 (process 모드일 때만 설정)
+emitter = None
+
+
+def start_emitter(backend_factory=None):
+    """
+    출력 프로세스 시작 및 키보드 백엔드 교체
+
+    Returns:
+        bool: 출력 프로세스의 키보드 백엔드 초기화 성공 여부
+    """
+    global emitter
+    from . import keyboard_handler
+
+    if emitter is None:
+        emitter = ProcessKeyboard(backend_factory=backend_factory)
+        keyboard_handler.set_backend(emitter)
+    return emitter.start()
+
+
+def stop_emitter():
+    """출력 프로세스 종료 (keyboard_handler.release_all_keys() 이후 호출)"""
+    if emitter is not None:
+        emitter.stop()
+
+
+def get_emitter_stats():
+    """키 출력 방식 및 출력 프로세스 상태 (/status 표시용)"""
+    if emitter is None:
+        return {"mode": "thread"}
+    return emitter.get_stats()
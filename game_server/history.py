@@ -0,0 +1,266 @@
+"""
+입력 통계 기록 모듈
+초당 입력 수, 키 전환 수, 에러 수와 입력 지연 백분위수를 1초/10초/60초 구간의 고정 크기 원형 배열에 보관 (대시보드 차트용)
+
+- 처리 경로는 기존 카운터(counters 모듈)와 지연 히스토그램(LatencyHistogram.record - 구간 번호 계산 후 배열 값 하나 증가)만 갱신한다
+- 기록 스레드가 1초마다 누적 값의 증가량을 각 해상도의 현재 구간에 더한다 (구간이 바뀌면 지나간 칸만 비움 - 원본 이벤트를 저장하거나 훑지 않음)
+- 지연 백분위수는 구간마다 저장한 로그 구간 히스토그램에서 계산한다 (구간 폭 약 12~25%)
+
+지표:
+- events: 처리한 조이스틱/버튼 입력 수 (출처별 카운터 합)
+- transitions: 입력으로 바뀐 키 상태 수 (조이스틱 방향 변화, 버튼 누름/뗌)
+- errors: 에러 응답/처리하지 못한 메시지 수 (엔드포인트별 카운터 합)
+- latency: 입력이 입력 스케줄러 큐에 들어간 뒤 키 입력 적용을 마칠 때까지의 시간 (스케줄러를 사용할 때만)
+"""
+
+import threading
+from array import array
+
+from . import config
+from . import counters
+from . import logger
+from . import timebase
+
+METRICS = ("events", "transitions", "errors")
+
+# 지연 히스토그램 구간: 약 1µs(1024ns) 단위 값을 2의 거듭제곱마다 4칸으로 나눔 (마지막 칸은 그 이상 전부)
+LATENCY_BINS = 72
+_LATENCY_UNIT_SHIFT = 10
+
+
+def latency_bin(ns):
+    """지연 시간(ns) → 히스토그램 구간 번호"""
+    units = ns >> _LATENCY_UNIT_SHIFT if ns > 0 else 0
+    if units < 4:
+        return units
+    exponent = units.bit_length() - 3
+    return min(LATENCY_BINS - 1, (exponent << 2) + (units >> exponent))
+
+
+def _bin_bounds(index):
+    """구간 번호 → (하한, 상한) 단위 값"""
+    if index < 4:
+        return index, index + 1
+    exponent = (index >> 2) - 1
+    mantissa = (index & 3) + 4
+    return mantissa << exponent, (mantissa + 1) << exponent
+
+
+# 구간 대표값 (중간값, 밀리초)
+_BIN_MS = tuple(
+    round((low + high) / 2 * (1 << _LATENCY_UNIT_SHIFT) / 1_000_000, 3)
+    for low, high in map(_bin_bounds, range(LATENCY_BINS))
+)
+_EMPTY_BINS = array("I", bytes(4 * LATENCY_BINS))
+
+
+class LatencyHistogram:
+    """누적 지연 히스토그램 (기록은 스레드 하나에서만, 기록 스레드가 증가량을 읽어감)"""
+
+    __slots__ = ("bins",)
+
+    def __init__(self):
+        self.bins = array("Q", bytes(8 * LATENCY_BINS))
+
+    def record(self, ns):
+        self.bins[latency_bin(ns)] += 1
+
+
+def percentile_ms(bins, offset, fraction):
+    """히스토그램(bins[offset:offset + LATENCY_BINS])의 백분위수 (밀리초, 샘플이 없으면 None)"""
+    total = 0
+    for index in range(offset, offset + LATENCY_BINS):
+        total += bins[index]
+    if not total:
+        return None
+    target = max(1, int(total * fraction + 0.5))
+    seen = 0
+    for index in range(LATENCY_BINS):
+        seen += bins[offset + index]
+        if seen >= target:
+            return _BIN_MS[index]
+    return _BIN_MS[-1]
+
+
+class RollingSeries:
+    """
+    한 해상도의 원형 배열 (구간 길이 resolution초, 구간 size개)
+
+    칸마다 지표별 수와 지연 히스토그램을 저장한다. 구간 번호는 시작 후 경과 초 // resolution.
+    """
+
+    def __init__(self, resolution, size):
+        self.resolution = resolution
+        self.size = size
+        self.counts = tuple(array("Q", bytes(8 * size)) for _ in METRICS)
+        self.latency = array("I", bytes(4 * size * LATENCY_BINS))
+        self.first = None  # 처음 기록한 구간 번호
+        self.last = None  # 마지막으로 기록한 구간 번호
+
+    def _clear(self, index):
+        slot = index % self.size
+        for values in self.counts:
+            values[slot] = 0
+        offset = slot * LATENCY_BINS
+        self.latency[offset:offset + LATENCY_BINS] = _EMPTY_BINS
+
+    def add(self, second, deltas, latency_deltas):
+        """
+        second초에 발생한 증가량 더하기
+
+        Args:
+            second: 기록 시작 후 경과 초 (정수, 줄어들지 않음)
+            deltas: METRICS 순서의 증가량
+            latency_deltas: [(구간 번호, 증가량)] (0이 아닌 것만)
+        """
+        index = second // self.resolution
+        if self.last is None:
+            self.first = self.last = index
+            self._clear(index)
+        elif index > self.last:
+            # 건너뛴 칸 비우기 (최대 size칸)
+            for skipped in range(max(self.last + 1, index - self.size + 1), index + 1):
+                self._clear(skipped)
+            self.last = index
+        elif index < self.last:
+            return
+        slot = index % self.size
+        for values, delta in zip(self.counts, deltas):
+            if delta:
+                values[slot] += delta
+        offset = slot * LATENCY_BINS
+        for bin_index, delta in latency_deltas:
+            self.latency[offset + bin_index] += delta
+
+    def snapshot(self, completed_seconds):
+        """
+        끝난 구간의 초당 값 (오래된 것부터)
+
+        Args:
+            completed_seconds: 기록이 끝난 초 수 (이 시각 이전에 끝난 구간만 포함 - 진행 중인 구간은 값이 작게 보이므로 제외)
+        """
+        result = {"interval": self.resolution, "end_index": None}
+        for name in METRICS:
+            result[name] = []
+        result["p50_ms"] = []
+        result["p99_ms"] = []
+        if self.first is None:
+            return result
+
+        end = min(completed_seconds // self.resolution - 1, self.last)
+        start = max(self.first, end - self.size + 1)
+        result["end_index"] = end
+        for index in range(start, end + 1):
+            slot = index % self.size
+            for name, values in zip(METRICS, self.counts):
+                result[name].append(round(values[slot] / self.resolution, 2))
+            offset = slot * LATENCY_BINS
+            result["p50_ms"].append(percentile_ms(self.latency, offset, 0.5))
+            result["p99_ms"].append(percentile_ms(self.latency, offset, 0.99))
+        return result
+
+
+class InputHistory:
+    """
+    해상도별 입력 통계 기록 (tick()은 기록 스레드 하나에서만, snapshot()은 아무 스레드에서나)
+
+    Args:
+        resolutions: [(구간 길이 초, 구간 수)]
+    """
+
+    def __init__(self, resolutions=None):
+        self.series = tuple(RollingSeries(resolution, size) for resolution, size in (resolutions or config.HISTORY_RESOLUTIONS))
+        self.latency = LatencyHistogram()
+        self.start_ns = None
+        self.completed_seconds = 0  # 기록이 끝난 초 수 (시작 후)
+        self._previous = None  # (지표별 누적 값, 지연 히스토그램 복사본)
+        self._lock = threading.Lock()  # 기록과 조회 사이만 보호 (처리 경로는 잠그지 않음)
+
+    def _totals(self):
+        """지표별 누적 값 (METRICS 순서)"""
+        events = transitions = errors = 0
+        for (group_name, _, kind), total in counters.snapshot().items():
+            if group_name == "source":
+                events += total
+            elif group_name == "keys":
+                transitions += total
+            elif group_name == "endpoint" and kind == "errors":
+                errors += total
+        return events, transitions, errors
+
+    def tick(self, now=None):
+        """지난 tick 이후의 증가량을 방금 끝난 초의 구간에 더함 (초 경계 직후에 호출)"""
+        if now is None:
+            now = timebase.now_ns()
+        totals = self._totals()
+        bins = array("Q", self.latency.bins)
+        with self._lock:
+            if self.start_ns is None:
+                # 첫 tick은 기준점만 기록 (시작 전에 쌓인 값은 구간에 넣지 않음, 구간은 초 경계에 맞춤)
+                self.start_ns = now // timebase.NS_PER_SECOND * timebase.NS_PER_SECOND
+                self._previous = (totals, bins)
+                return
+            second = max(self.completed_seconds, (now - self.start_ns) // timebase.NS_PER_SECOND - 1)
+            previous_totals, previous_bins = self._previous
+            deltas = tuple(total - previous for total, previous in zip(totals, previous_totals))
+            latency_deltas = [
+                (index, bins[index] - previous_bins[index])
+                for index in range(LATENCY_BINS)
+                if bins[index] != previous_bins[index]
+            ]
+            for series in self.series:
+                series.add(second, deltas, latency_deltas)
+            self._previous = (totals, bins)
+            self.completed_seconds = second + 1
+
+    def snapshot(self, resolution=None):
+        """
+        해상도별 구간 값 (/history 응답용)
+
+        Returns:
+            dict: {해상도(초): {"interval", "end", 지표별 초당 값 목록, "p50_ms", "p99_ms"}} - 목록은 오래된 구간부터
+        """
+        with self._lock:
+            start_ns = self.start_ns
+            completed = self.completed_seconds
+            result = {
+                series.resolution: series.snapshot(completed)
+                for series in self.series
+                if resolution is None or series.resolution == resolution
+            }
+        for data in result.values():
+            end_index = data.pop("end_index")
+            # 마지막 구간이 끝난 시각 (ISO 문자열)
+            data["end"] = None if end_index is None else timebase.isoformat(
+                start_ns + (end_index + 1) * data["interval"] * timebase.NS_PER_SECOND
+            )
+        return result
+
+
+# 입력 통계 기록 (server.py에서 start_history()로 기록 스레드 시작)
+input_history = InputHistory()
+_history_thread = None
+_history_lock = threading.Lock()
+
+
+def history_loop():
+    """초 경계마다 input_history.tick() 호출"""
+    while True:
+        now = timebase.now_ns()
+        next_ns = (now // timebase.NS_PER_SECOND + 1) * timebase.NS_PER_SECOND
+        timebase.sleep((next_ns - now) / timebase.NS_PER_SECOND)
+        try:
+            input_history.tick()
+        except Exception as e:
+            logger.error("History", f"⚠️ 입력 통계 기록 에러: {e}")
+
+
+def start_history():
+    """입력 통계 기록 스레드 시작 (한 번만)"""
+    global _history_thread
+    with _history_lock:
+        if _history_thread is not None:
+            return
+        input_history.tick()
+        _history_thread = threading.Thread(target=history_loop, name="input-history", daemon=True)
+        _history_thread.start()
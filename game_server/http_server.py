@@ -0,0 +1,233 @@
+"""
+HTTP 서버 모듈
+Flask 개발 서버(연결마다 스레드 생성) 대신 고정 크기 작업 스레드 풀로 요청을 처리하는 서버 모드
+
+- 작업 스레드 수 제한 (HTTP_WORKERS) + 대기 연결 수 제한 (HTTP_MAX_PENDING, 초과 시 503)
+- HTTP/1.1 keep-alive (유휴 연결은 HTTP_KEEPALIVE_TIMEOUT초 후 종료하여 작업 스레드 반환)
+- 수락한 소켓에 TCP_NODELAY 설정 (작은 JSON 응답이 Nagle 알고리즘으로 지연되지 않도록)
+
+키보드 백엔드는 이 프로세스 하나가 소유하므로 멀티 프로세스 모드는 제공하지 않는다.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+from werkzeug.wsgi import LimitedStream
+
+from . import config
+from . import logger
+
+# 대기열이 가득 찼을 때 보내는 응답 (작업 스레드를 사용하지 않고 수락 스레드에서 바로 전송)
+_BUSY_RESPONSE = (
+    b"HTTP/1.1 503 Service Unavailable\r\n"
+    b"Content-Length: 0\r\n"
+    b"Retry-After: 1\r\n"
+    b"Connection: close\r\n\r\n"
+)
+
+SERVER_MODES = ("pooled", "async", "dev")
+
+# keep-alive를 유지하면서 남은 요청 본문을 읽어 버릴 최대 크기 (이보다 크면 연결 종료)
+_MAX_DRAIN_BYTES = 64 * 1024
+
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    """
+    HTTP/1.1 keep-alive + TCP_NODELAY 요청 처리기 (요청마다 접근 로그를 출력하지 않음)
+
+    werkzeug의 run_wsgi()는 응답 후 소켓에 남은 데이터를 모두 읽어 버리고 항상 "Connection: close"를 보내므로
+    keep-alive를 쓸 수 없다. 여기서는 응답 본문을 모아 Content-Length와 함께 보내고,
+    요청 본문은 Content-Length만큼만 읽어 버려 같은 연결에서 다음 요청을 받을 수 있게 한다.
+    (이 서버의 응답은 작은 JSON/HTML이므로 스트리밍 응답은 지원하지 않음)
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # StreamRequestHandler.setup()에서 TCP_NODELAY 설정
+    timeout = config.HTTP_KEEPALIVE_TIMEOUT  # 유휴 keep-alive 연결 종료 시간 (초)
+
+    def make_environ(self):
+        environ = super().make_environ()
+        self._request_body = None
+        if environ.get("wsgi.input_terminated"):
+            # chunked 요청 본문은 남은 부분을 안전하게 버릴 수 없으므로 연결 종료
+            self.close_connection = True
+            return environ
+        try:
+            content_length = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            content_length = -1
+        if content_length < 0 or content_length > _MAX_DRAIN_BYTES:
+            self.close_connection = True
+            return environ
+        self._request_body = LimitedStream(self.rfile, content_length)
+        environ["wsgi.input"] = self._request_body
+        return environ
+
+    def run_wsgi(self):
+        if self.headers.get("Expect", "").lower().strip() == "100-continue":
+            self.wfile.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+
+        self.environ = environ = self.make_environ()
+        response = []  # [status, headers]
+        body = []
+
+        def start_response(status, headers, exc_info=None):
+            response[:] = [status, headers]
+            return body.append
+
+        try:
+            application_iter = self.server.app(environ, start_response)
+            try:
+                for data in application_iter:
+                    body.append(data)
+            finally:
+                if hasattr(application_iter, "close"):
+                    application_iter.close()
+        except Exception as e:
+            logger.error("HTTP", f"⚠️ 요청 처리 에러 ({self.command} {self.path}): {e}")
+            response[:] = ["500 Internal Server Error", [("Content-Type", "text/plain; charset=utf-8")]]
+            body = [b"Internal Server Error"]
+            self.close_connection = True
+
+        status, headers = response
+        code, _, reason = status.partition(" ")
+        code = int(code)
+        payload = b"".join(body)
+
+        self.send_response(code, reason)
+        for key, value in headers:
+            if key.lower() not in ("content-length", "connection", "transfer-encoding"):
+                self.send_header(key, value)
+        if not (100 <= code < 200 or code in (204, 304)):
+            self.send_header("Content-Length", str(len(payload)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        if payload and self.command != "HEAD":
+            self.wfile.write(payload)
+
+        # 응용이 읽지 않은 요청 본문(예: 속도 제한 429 응답)을 버려 다음 요청과 섞이지 않도록 함
+        if self._request_body is not None and not self.close_connection:
+            try:
+                self._request_body.exhaust()
+            except Exception:
+                self.close_connection = True
+
+    def log_request(self, code="-", size="-"):
+        logger.verbose("HTTP", f"{self.command} {self.path} {code}", sample=10)
+
+    def log_error(self, format, *args):
+        # 유휴 keep-alive 연결 종료("Request timed out") 등은 정상 동작이므로 상세 로그로만 출력
+        logger.verbose("HTTP", f"{self.address_string()} {format % args}")
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    고정 크기 스레드 풀 WSGI 서버
+
+    수락한 연결은 작업 스레드 풀에 전달되며, 작업 스레드와 대기열이 모두 차면 503으로 바로 거절한다.
+    keep-alive 연결은 유휴 시간 동안 작업 스레드 하나를 차지하므로 HTTP_WORKERS는 동시에 접속하는
+    컨트롤러/대시보드 수보다 크게 설정한다.
+    """
+
+    multithread = True
+
+    def __init__(self, host, port, app, workers=None, max_pending=None):
+        super().__init__(host, port, app, handler=KeepAliveRequestHandler)
+        self.workers = workers or config.HTTP_WORKERS
+        self.max_pending = config.HTTP_MAX_PENDING if max_pending is None else max_pending
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="http-worker")
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+
+        # 통계
+        self.active_connections = 0
+        self.rejected_count = 0
+        self._stats_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        """연결을 작업 스레드 풀에 전달 (수락 스레드는 블로킹하지 않음)"""
+        if not self._slots.acquire(blocking=False):
+            self.rejected_count += 1
+            try:
+                request.sendall(_BUSY_RESPONSE)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        self._pool.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        with self._stats_lock:
+            self.active_connections += 1
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._stats_lock:
+                self.active_connections -= 1
+            self._slots.release()
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False)
+
+    def get_stats(self):
+        """서버 통계 (/status 표시용)"""
+        return {
+            "mode": "pooled",
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "active_connections": self.active_connections,
+            "rejected": self.rejected_count
+        }
+
+
+# 실행 중인 서버 (pooled/async 모드일 때만 설정)
+active_server = None
+
+
+def get_server_stats():
+    """HTTP 서버 통계 반환 (/status 표시용)"""
+    if active_server is None:
+        return {"mode": "dev"}
+    return active_server.get_stats()
+
+
+def serve(app, host, port, mode="pooled"):
+    """
+    HTTP 서버 실행 (블로킹)
+
+    Args:
+        app: Flask 앱
+        mode: "pooled" (스레드 풀 + keep-alive), "async" (asyncio 이벤트 루프, game_server.async_server)
+              또는 "dev" (Flask 개발 서버, 연결마다 스레드)
+    """
+    global active_server
+
+    if mode == "dev":
+        app.run(host=host, port=port, debug=False, threaded=True, use_reloader=False)
+        return
+
+    if mode == "async":
+        from . import async_server
+        server = async_server.AsyncHTTPServer(app, host, port)
+        active_server = server
+        logger.log("HTTP", f"asyncio 서버 시작 (Flask 처리 스레드 {server.wsgi_workers}개, "
+                           f"keep-alive {config.HTTP_KEEPALIVE_TIMEOUT}초)")
+        try:
+            async_server.run(server)
+        finally:
+            active_server = None
+        return
+
+    server = PooledWSGIServer(host, port, app)
+    active_server = server
+    logger.log("HTTP", f"스레드 풀 서버 시작 (작업 스레드 {server.workers}개, 대기 {server.max_pending}개, "
+                       f"keep-alive {config.HTTP_KEEPALIVE_TIMEOUT}초)")
+    try:
+        server.serve_forever()
+    finally:
+        active_server = None
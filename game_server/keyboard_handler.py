@@ -4,15 +4,69 @@
 """
 
 import threading
-import time
-from datetime import datetime
-from pynput.keyboard import Controller
 
 from . import config
+from . import logger
+from . import timebase
+from . import tunables
+from .keys import Macro, SpecialKey
 
 
-# 키보드 컨트롤러
-keyboard = Controller()
+class PynputKeyboard:
+    """
+    pynput 키보드 백엔드 (지연 초기화)
+    
+    pynput은 import 시점에 디스플레이(X 서버)에 연결하므로, 처음 키를 누르거나 warm_up()을 호출할 때까지
+    import와 Controller 생성을 미룬다. 디스플레이가 없는 환경에서도 대시보드/상태 API는 정상 동작한다.
+    """
+    
+    def __init__(self):
+        self._controller = None
+        self._pynput_key = None
+        self._init_error = None
+        self._translated = {}  # {키 기호: pynput 키} 변환 캐시
+    
+    def _ensure_controller(self):
+        if self._controller is not None:
+            return self._controller
+        if self._init_error is not None:
+            raise RuntimeError(f"키보드 백엔드를 사용할 수 없습니다: {self._init_error}")
+        try:
+            from pynput.keyboard import Controller, Key
+            self._pynput_key = Key
+            self._controller = Controller()
+        except Exception as e:
+            # 실패를 기억하여 이벤트마다 import를 다시 시도하지 않음
+            self._init_error = e
+            logger.error("Key", f"⚠️ 키보드 백엔드 초기화 실패 (디스플레이가 없는 환경일 수 있습니다): {e}")
+            raise RuntimeError(f"키보드 백엔드를 사용할 수 없습니다: {e}")
+        return self._controller
+    
+    def translate(self, key):
+        """키 기호 → pynput 키 (문자 키는 그대로 사용)"""
+        translated = self._translated.get(key)
+        if translated is None:
+            translated = getattr(self._pynput_key, key.name) if isinstance(key, SpecialKey) else key
+            self._translated[key] = translated
+        return translated
+    
+    def press(self, key):
+        controller = self._ensure_controller()
+        controller.press(self.translate(key))
+    
+    def release(self, key):
+        controller = self._ensure_controller()
+        controller.release(self.translate(key))
+    
+    def warm_up(self, keys):
+        """Controller 생성 및 키 변환을 미리 수행 (첫 입력 지연 제거)"""
+        self._ensure_controller()
+        for key in keys:
+            self.translate(key)
+
+
+# 키보드 백엔드 (set_backend()로 교체 가능)
+keyboard = PynputKeyboard()
 
 # 키 입력 동기화를 위한 Lock (끊김 방지)
 keyboard_lock = threading.Lock()
@@ -24,38 +78,79 @@ pressed_button_keys = set()  # 버튼으로 눌린 키 추적 (조이스틱과 
 pressed_joystick_keys = set()  # 조이스틱으로 눌린 키 추적 (버튼과 분리)
 
 
+def set_backend(backend):
+    """
+    키보드 백엔드 교체 (press(key), release(key) 메서드를 가진 객체)
+    
+    모든 모듈이 keyboard_handler.keyboard를 호출 시점에 참조하므로 교체 즉시 반영된다.
+    """
+    global keyboard
+    with keyboard_lock:
+        keyboard = backend
+
+
+def mapped_keys():
+    """키 매핑에 사용된 모든 키 (기본 + 컨트롤러별 매핑 + 매크로 단계의 키, 매크로 참조 자체는 제외)"""
+    from . import macros
+    keys = {key for key in config.KEY_MAPPING.values() if key and not isinstance(key, Macro)}
+    for key_mapping in config.CONTROLLER_KEY_MAPPINGS.values():
+        keys.update(key for key in key_mapping.values() if key and not isinstance(key, Macro))
+    keys.update(macros.macro_keys())
+    return list(keys)
+
+
+def warm_up():
+    """
+    키보드 백엔드 미리 초기화 (서버 시작 시 호출)
+    
+    Returns:
+        bool: 성공 여부 (디스플레이가 없는 환경 등에서는 False)
+    """
+    warm = getattr(keyboard, "warm_up", None)
+    if warm is None:
+        return True
+    try:
+        warm(mapped_keys())
+        return True
+    except Exception:
+        return False
+
+
 def press_key(key):
     """키보드 키 누르기 (동기화 처리로 끊김 방지, 중복 방지)"""
+    settings = tunables.current
     try:
         with keyboard_lock:
             # 키가 이미 눌려있지 않으면 누르기 (중복 방지)
             if key not in pressed_keyboard_keys:
                 keyboard.press(key)
                 pressed_keyboard_keys.add(key)
-                if config.ENABLE_VERBOSE_LOGGING:
-                    print(f"[Key] Pressed: {key}")
+                if settings.verbose:
+                    logger.verbose("Key", f"Pressed: {key}")
     except Exception as e:
-        if config.ENABLE_VERBOSE_LOGGING:
-            print(f"Error pressing key {key}: {e}")
+        if settings.verbose:
+            logger.error("Key", f"Error pressing key {key}: {e}")
 
 
 def release_key(key):
     """키보드 키 떼기 (동기화 처리로 끊김 방지, 확실한 해제 보장)"""
+    settings = tunables.current
     try:
         with keyboard_lock:
             # 키가 눌려있으면 떼기 (확실한 해제 보장)
             if key in pressed_keyboard_keys:
                 keyboard.release(key)
                 pressed_keyboard_keys.discard(key)
-                if config.ENABLE_VERBOSE_LOGGING:
-                    print(f"[Key] Released: {key}")
+                if settings.verbose:
+                    logger.verbose("Key", f"Released: {key}")
     except Exception as e:
-        if config.ENABLE_VERBOSE_LOGGING:
-            print(f"Error releasing key {key}: {e}")
+        if settings.verbose:
+            logger.error("Key", f"Error releasing key {key}: {e}")
 
 
 def release_all_keys():
     """모든 키보드 키 떼기 (동기화 처리로 끊김 방지)"""
+    settings = tunables.current
     try:
         with keyboard_lock:
             # 현재 눌려있는 모든 키보드 키를 떼기
@@ -64,8 +159,8 @@ def release_all_keys():
                 try:
                     keyboard.release(key)
                 except Exception as e:
-                    if config.ENABLE_VERBOSE_LOGGING:
-                        print(f"Error releasing key {key}: {e}")
+                    if settings.verbose:
+                        logger.error("Key", f"Error releasing key {key}: {e}")
             pressed_keyboard_keys.clear()
             
             # 버튼 및 조이스틱 추적도 초기화
@@ -73,77 +168,92 @@ def release_all_keys():
             pressed_button_keys.clear()
             pressed_joystick_keys.clear()
     except Exception as e:
-        if config.ENABLE_VERBOSE_LOGGING:
-            print(f"Error releasing all keys: {e}")
+        if settings.verbose:
+            logger.error("Key", f"Error releasing all keys: {e}")
 
 
-def process_joystick_keys(target_keys):
+def process_joystick_keys(target_keys, joystick_key_set=None):
     """
     조이스틱 키 입력 처리 (press/release)
     버튼과 조이스틱 키를 분리하여 추적하여 간섭 방지
     
     Args:
         target_keys: 눌려야 할 키 집합
+        joystick_key_set: 이 조이스틱의 방향 키 집합 (기본값: config.JOYSTICK_KEY_SET)
+                          - 다른 컨트롤러의 방향 키는 건드리지 않음
     """
     with keyboard_lock:
-        # 조이스틱으로 눌려야 하는 키 (조이스틱 방향 키만)
-        target_joystick_keys = target_keys & config.JOYSTICK_KEY_SET
-        
-        # 조이스틱으로 눌려야 하는데 안 눌려있는 키 → 누르기
-        # 버튼이 이미 눌려있는 키는 물리적으로 누르지 않지만, 조이스틱 추적에는 포함
-        keys_to_add_physically = target_joystick_keys - pressed_keyboard_keys - pressed_button_keys
-        for key in keys_to_add_physically:
+        update_joystick_keys(target_keys, joystick_key_set)
+
+
+def update_joystick_keys(target_keys, joystick_key_set=None):
+    """
+    조이스틱 키 입력 처리 (keyboard_lock 보유 상태에서 호출 - 다른 키 입력과 한 번의 잠금으로 묶을 때)
+    
+    Args:
+        target_keys: 눌려야 할 키 집합
+        joystick_key_set: 이 조이스틱의 방향 키 집합 (기본값: config.JOYSTICK_KEY_SET)
+    """
+    settings = tunables.current
+    if joystick_key_set is None:
+        joystick_key_set = config.JOYSTICK_KEY_SET
+    
+    # 집합 연산(교집합/차집합)은 이벤트마다 새 집합을 만들므로, 작은 키 집합(최대 4개)을 돌며 멤버십만 확인
+    # 처리 순서는 누르기 → 추적 인계 → 유지 → 떼기 (단계마다 모든 키를 처리)
+    
+    # 조이스틱으로 눌려야 하는데 안 눌려있는 키 → 누르기
+    # 버튼이 이미 눌려있는 키는 물리적으로 누르지 않지만, 조이스틱 추적에는 포함
+    for key in target_keys:
+        if key in joystick_key_set and key not in pressed_keyboard_keys and key not in pressed_button_keys:
             try:
                 keyboard.press(key)
                 pressed_keyboard_keys.add(key)
                 pressed_joystick_keys.add(key)
             except Exception as e:
-                if config.ENABLE_VERBOSE_LOGGING:
-                    print(f"Error pressing key {key}: {e}")
-        
-        # 이미 눌려있지만 조이스틱 추적에 없는 키 추가 (버튼을 떼고 난 후 조이스틱이 계속 같은 방향일 때)
-        # 버튼이 눌려있지 않고, 키가 이미 눌려있고, 조이스틱이 이 키를 눌러야 하면 추적에 추가
-        keys_already_pressed = (target_joystick_keys & pressed_keyboard_keys) - pressed_button_keys - pressed_joystick_keys
-        for key in keys_already_pressed:
+                if settings.verbose:
+                    logger.error("Key", f"Error pressing key {key}: {e}")
+    
+    # 이미 눌려있지만 조이스틱 추적에 없는 키 추가 (버튼을 떼고 난 후 조이스틱이 계속 같은 방향일 때)
+    # 버튼이 눌려있지 않고, 키가 이미 눌려있고, 조이스틱이 이 키를 눌러야 하면 추적에 추가
+    for key in target_keys:
+        if (key in joystick_key_set and key in pressed_keyboard_keys
+                and key not in pressed_button_keys and key not in pressed_joystick_keys):
             # 조이스틱 추적에 추가 (물리적으로는 이미 눌려있음)
             pressed_joystick_keys.add(key)
-            if config.ENABLE_VERBOSE_LOGGING:
-                print(f"[Key] Joystick takes over already pressed key: {key}")
-        
-        # 이미 눌려있고 조이스틱 추적에도 있는 키는 유지 (키가 지속적으로 눌려있도록 보장)
-        # 키가 이미 눌려있고 조이스틱이 이 키를 눌러야 하면, 주기적으로 다시 눌러서 지속성 보장
-        keys_to_maintain = target_joystick_keys & pressed_joystick_keys & pressed_keyboard_keys
-        for key in keys_to_maintain:
+            if settings.verbose:
+                logger.verbose("Key", f"Joystick takes over already pressed key: {key}")
+    
+    # 이미 눌려있고 조이스틱 추적에도 있는 키는 유지 (키가 지속적으로 눌려있도록 보장)
+    # 키가 이미 눌려있고 조이스틱이 이 키를 눌러야 하면, 주기적으로 다시 눌러서 지속성 보장
+    for key in target_keys:
+        if key in joystick_key_set and key in pressed_joystick_keys and key in pressed_keyboard_keys:
             # 키가 이미 눌려있지만, 지속성을 위해 주기적으로 다시 누르기
             # 일부 시스템에서는 키가 자동으로 해제될 수 있으므로 주기적으로 다시 눌러야 함
             try:
                 # 키를 release 후 press하여 지속성 보장 (더 확실한 방법)
                 keyboard.release(key)
-                time.sleep(0.001)  # 매우 짧은 딜레이
+                timebase.sleep(0.001)  # 매우 짧은 딜레이
                 keyboard.press(key)
             except Exception as e:
-                if config.ENABLE_VERBOSE_LOGGING:
-                    print(f"Error maintaining key {key}: {e}")
-        
-        # 조이스틱으로 눌려있는데 뗴야 하는 키 → 떼기
-        # 버튼이 눌려있는 키는 건드리지 않음
-        keys_to_remove = (pressed_joystick_keys & config.JOYSTICK_KEY_SET) - target_joystick_keys
-        for key in keys_to_remove:
-            # 버튼이 이 키를 사용 중이면 건드리지 않음
-            if key not in pressed_button_keys:
-                try:
-                    keyboard.release(key)
-                    pressed_keyboard_keys.discard(key)
-                    pressed_joystick_keys.discard(key)
-                except Exception as e:
-                    if config.ENABLE_VERBOSE_LOGGING:
-                        print(f"Error releasing key {key}: {e}")
-            else:
-                # 버튼이 사용 중이면 조이스틱 추적에서만 제거 (물리적 키는 유지)
-                pressed_joystick_keys.discard(key)
-        
-        # 조이스틱 키 추적 업데이트 (버튼과 분리)
-        # 조이스틱 키만 유지하고 새로운 키 추가
-        pressed_joystick_keys &= config.JOYSTICK_KEY_SET  # 조이스틱 키만 유지
-        pressed_joystick_keys |= target_joystick_keys  # 새로운 조이스틱 키 추가 (버튼이 눌러도 추적)
-
+                if settings.verbose:
+                    logger.error("Key", f"Error maintaining key {key}: {e}")
+    
+    # 조이스틱으로 눌려있는데 떼야 하는 키 → 떼기
+    # 버튼이 눌려있는 키는 건드리지 않음 (조이스틱 추적에서만 제거, 물리적 키는 유지)
+    # 이 조이스틱의 방향 키만 확인 (다른 컨트롤러의 키는 유지)
+    for key in joystick_key_set:
+        if key in target_keys or key not in pressed_joystick_keys:
+            continue
+        if key not in pressed_button_keys:
+            try:
+                keyboard.release(key)
+                pressed_keyboard_keys.discard(key)
+            except Exception as e:
+                if settings.verbose:
+                    logger.error("Key", f"Error releasing key {key}: {e}")
+        pressed_joystick_keys.discard(key)
+    
+    # 조이스틱 키 추적 업데이트 (버튼과 분리 - 버튼이 눌러 물리적으로 누르지 않은 키도 추적)
+    for key in target_keys:
+        if key in joystick_key_set:
+            pressed_joystick_keys.add(key)
@@ -0,0 +1,76 @@
+"""
+키 정의 모듈
+pynput을 import하지 않고 특수 키를 표현하기 위한 기호 키 (실제 키 변환은 keyboard_handler에서 처음 사용할 때 수행)
+"""
+
+
+class SpecialKey:
+    """
+    특수 키 기호 (예: Key.space, Key.up)
+
+    같은 이름의 키는 항상 같은 객체이므로 집합/딕셔너리에서 빠르게 비교된다.
+    문자열 표현은 pynput과 동일하게 "Key.space" 형식이다.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"Key.{self.name}"
+
+    __str__ = __repr__
+
+    def __reduce__(self):
+        # 다른 프로세스로 전달되어도 같은 객체로 복원
+        return (_special_key, (self.name,))
+
+
+def _special_key(name):
+    """이름 → SpecialKey (pickle 복원용, 같은 이름이면 같은 객체)"""
+    return getattr(Key, name)
+
+
+class _KeyNamespace:
+    """pynput.keyboard.Key와 같은 방식으로 사용하는 특수 키 모음 (Key.up, Key.enter 등)"""
+
+    def __init__(self):
+        self._keys = {}
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        key = self._keys.get(name)
+        if key is None:
+            key = SpecialKey(name)
+            self._keys[name] = key
+        return key
+
+
+Key = _KeyNamespace()
+
+
+class Macro:
+    """
+    매크로 참조 (키 매핑 값으로 사용, 예: "Y": Macro("hadouken"))
+
+    버튼을 누르면 키 대신 config.MACROS[name]의 키 입력 순서를 서버에서 재생한다 (game_server/macros.py).
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, other):
+        return isinstance(other, Macro) and other.name == self.name
+
+    def __hash__(self):
+        return hash(("macro", self.name))
+
+    def __repr__(self):
+        return f"Macro({self.name!r})"
+
+    def __str__(self):
+        return f"macro:{self.name}"
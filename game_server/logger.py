@@ -0,0 +1,177 @@
+"""
+로깅 모듈
+입력 처리 경로에서 출력(I/O)을 하지 않도록 로그 레코드를 큐에 넣고 백그라운드 스레드에서 출력
+"""
+
+import atexit
+import json
+import queue
+import sys
+import threading
+import time
+import traceback
+
+from . import config
+from . import timebase
+
+
+# 로그 레코드 큐 (가득 차면 새 레코드를 버림 - 입력 처리를 막지 않기 위함)
+_records = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+_writer_thread = None
+_writer_lock = threading.Lock()
+
+# 반복 에러 속도 제한 상태 {key: [window_start_ns, count_in_window, suppressed]}
+_rate_state = {}
+_rate_lock = threading.Lock()
+_RATE_WINDOW_NS = timebase.seconds_to_ns(config.LOG_RATE_WINDOW)
+
+# 샘플링 카운터 {key: count}
+_sample_counts = {}
+
+# 로깅 통계
+log_stats = {
+    "enqueued": 0,
+    "dropped": 0,  # 큐가 가득 차서 버린 레코드 수
+    "suppressed": 0,  # 속도 제한/샘플링으로 생략된 레코드 수
+}
+
+
+def _format_record(record):
+    """레코드를 출력용 문자열로 변환 (백그라운드 스레드에서만 호출)"""
+    timestamp, level, tag, message, fields = record
+    if config.LOG_FORMAT == "json":
+        entry = {
+            "time": timebase.isoformat(timestamp),
+            "level": level,
+            "tag": tag,
+            "message": message,
+        }
+        if fields:
+            entry.update(fields)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+    line = f"[{timebase.clock_text(timestamp)}] [{tag}] {message}"
+    if fields:
+        line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+    return line
+
+
+def _writer_loop():
+    """로그 레코드를 꺼내 출력하는 백그라운드 루프"""
+    while True:
+        record = _records.get()
+        try:
+            if record is None:
+                return
+            print(_format_record(record), file=sys.stdout, flush=True)
+        except Exception:
+            pass
+        finally:
+            _records.task_done()
+
+
+def _ensure_writer():
+    """백그라운드 출력 스레드 시작 (최초 로그 시 한 번만)"""
+    global _writer_thread
+    if _writer_thread is not None:
+        return
+    with _writer_lock:
+        if _writer_thread is None:
+            thread = threading.Thread(target=_writer_loop, name="log-writer", daemon=True)
+            thread.start()
+            _writer_thread = thread
+
+
+def _enqueue(level, tag, message, fields):
+    _ensure_writer()
+    try:
+        _records.put_nowait((timebase.now_ns(), level, tag, message, fields))
+        log_stats["enqueued"] += 1
+    except queue.Full:
+        log_stats["dropped"] += 1
+
+
+def _allow_rate(key):
+    """
+    반복 로그 속도 제한 (LOG_RATE_WINDOW초 동안 key당 LOG_RATE_LIMIT개까지 허용)
+
+    Returns:
+        tuple: (허용 여부, 이번 창 이전에 생략된 레코드 수)
+    """
+    now = timebase.now_ns()
+    with _rate_lock:
+        state = _rate_state.get(key)
+        if state is None or now - state[0] >= _RATE_WINDOW_NS:
+            suppressed = state[2] if state is not None else 0
+            if len(_rate_state) >= config.LOG_RATE_MAX_KEYS and state is None:
+                _rate_state.clear()
+            _rate_state[key] = [now, 1, 0]
+            return True, suppressed
+        if state[1] < config.LOG_RATE_LIMIT:
+            state[1] += 1
+            return True, 0
+        state[2] += 1
+        log_stats["suppressed"] += 1
+        return False, 0
+
+
+def log(tag, message, level="info", key=None, **fields):
+    """
+    로그 기록 (큐에 넣기만 하므로 Lock을 잡은 상태에서도 안전)
+
+    Args:
+        tag: 로그 분류 (예: "Joystick/HTTP", "MQTT")
+        message: 로그 메시지
+        level: "info", "warning", "error", "debug"
+        key: 속도 제한 키 (지정하면 같은 키의 반복 로그를 제한)
+        **fields: 구조화된 추가 필드
+    """
+    if key is not None:
+        allowed, suppressed = _allow_rate(key)
+        if not allowed:
+            return
+        if suppressed:
+            fields["suppressed"] = suppressed
+    _enqueue(level, tag, message, fields)
+
+
+def error(tag, message, key=None, **fields):
+    """에러 로그 (기본적으로 tag 기준 속도 제한 적용)"""
+    log(tag, message, level="error", key=key if key is not None else ("error", tag), **fields)
+
+
+def exception(tag, message, **fields):
+    """에러 로그 + 상세 로그 모드에서는 traceback 포함"""
+    if config.ENABLE_VERBOSE_LOGGING:
+        fields["traceback"] = traceback.format_exc()
+    error(tag, message, **fields)
+
+
+def verbose(tag, message, sample=1, **fields):
+    """
+    상세 로그 (ENABLE_VERBOSE_LOGGING일 때만 기록)
+
+    Args:
+        sample: N이면 같은 tag의 로그를 N개 중 1개만 기록 (고빈도 로그용)
+    """
+    if not config.ENABLE_VERBOSE_LOGGING:
+        return
+    if sample > 1:
+        count = _sample_counts.get(tag, 0) + 1
+        _sample_counts[tag] = count
+        if count % sample != 1:
+            log_stats["suppressed"] += 1
+            return
+    _enqueue("debug", tag, message, fields)
+
+
+def flush(timeout=1.0):
+    """대기 중인 로그를 모두 출력할 때까지 기다림 (종료 시 사용)"""
+    if _writer_thread is None:
+        return
+    deadline = time.monotonic() + timeout
+    while _records.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+atexit.register(flush)
@@ -0,0 +1,333 @@
+"""
+매크로 모듈
+키 매핑이 Macro("이름")인 버튼을 누르면 config.MACROS의 키 입력 순서를 서버에서 정해진 시간에 재생
+
+- 재생은 전용 스레드 하나가 타이머 힙(다음 단계의 예정 시각 순)으로 처리한다
+  (요청 스레드나 입력 스케줄러에서 sleep하지 않으므로 다른 입력을 막지 않음)
+- 예정 시각 직전(MACRO_SPIN)은 sleep(0)으로 양보하며 기다리고, 늦게 실행된 시간은 realtime.jitter["macro"]에 기록
+  (GIL과 CPU를 놓지 않는 바쁜 대기는 실시간 우선순위에서 다른 스레드를 굶길 수 있음)
+- 재생 중인 매크로는 취소할 수 있으며, 취소하면 매크로가 누른 키를 바로 뗀다
+"""
+
+import heapq
+import itertools
+import threading
+
+from . import config
+from . import keyboard_handler
+from . import logger
+from . import realtime
+from . import timebase
+
+# 단계 종류
+PRESS = "press"
+RELEASE = "release"
+
+
+def compile_steps(steps):
+    """
+    매크로 단계 → 시간표 [(시작 후 ns, PRESS/RELEASE, 키)], 전체 길이(ns)
+
+    Raises:
+        ValueError: 알 수 없는 단계이거나 시간이 음수인 경우
+    """
+    timeline = []
+    offset = 0
+    for step in steps:
+        kind = step[0] if step else None
+        if kind in (PRESS, RELEASE) and len(step) == 2 and step[1]:
+            timeline.append((offset, kind, step[1]))
+        elif kind == "tap" and len(step) == 3 and step[1] and step[2] >= 0:
+            timeline.append((offset, PRESS, step[1]))
+            offset += timebase.seconds_to_ns(step[2])
+            timeline.append((offset, RELEASE, step[1]))
+        elif kind == "wait" and len(step) == 2 and step[1] >= 0:
+            offset += timebase.seconds_to_ns(step[1])
+        else:
+            raise ValueError(f"Invalid macro step: {step!r}")
+    return timeline, offset
+
+
+class MacroDefinition:
+    """컴파일된 매크로 (시간표, 반복 여부)"""
+
+    __slots__ = ("name", "timeline", "duration_ns", "repeat")
+
+    def __init__(self, name, spec):
+        if isinstance(spec, dict):
+            steps = spec.get("steps", ())
+            self.repeat = bool(spec.get("repeat", False))
+        else:
+            steps = spec
+            self.repeat = False
+        self.name = name
+        self.timeline, self.duration_ns = compile_steps(steps)
+        if self.repeat and self.duration_ns <= 0:
+            raise ValueError("Repeating macro must take time (add a wait or tap step)")
+
+
+class MacroRun:
+    """재생 중인 매크로 하나"""
+
+    __slots__ = ("run_id", "macro", "owner", "start_ns", "index", "held", "cancelled")
+
+    def __init__(self, run_id, macro, owner, start_ns):
+        self.run_id = run_id
+        self.macro = macro
+        self.owner = owner
+        self.start_ns = start_ns
+        self.index = 0
+        self.held = set()  # 이 매크로가 누른 키 (취소/종료 시 해제)
+        self.cancelled = False
+
+    def next_due_ns(self):
+        return self.start_ns + self.macro.timeline[self.index][0]
+
+
+class MacroPlayer:
+    """
+    매크로 재생기 (타이머 힙 + 전용 스레드)
+
+    키 입력은 재생 스레드에서만 수행하고, start()/cancel()은 힙에 넣고 바로 반환한다.
+    """
+
+    def __init__(self, definitions=None, max_active=None):
+        self.definitions = definitions if definitions is not None else {}
+        self.max_active = max_active or config.MACRO_MAX_ACTIVE
+        self._cond = threading.Condition()
+        self._heap = []  # [(due_ns, tie, MacroRun)]
+        self._tie = itertools.count()
+        self._run_ids = itertools.count(1)
+        self._runs = {}  # {run_id: MacroRun}
+        self._thread = None
+        self._jitter = realtime.jitter["macro"]
+        self.counts = {"started": 0, "completed": 0, "cancelled": 0, "rejected": 0}
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start_thread(self):
+        """재생 스레드 시작 (처음 매크로를 재생할 때 자동으로 호출)"""
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="macro-player", daemon=True)
+        self._thread.start()
+
+    def start(self, name, owner=None):
+        """
+        매크로 재생 시작
+
+        Args:
+            name: config.MACROS의 이름
+            owner: 매크로를 시작한 버튼 (controller_id, button) - 같은 버튼의 매크로가 재생 중이면 다시 시작하지 않음
+
+        Returns:
+            int: 재생 ID (시작하지 못하면 None)
+        """
+        macro = self.definitions.get(name)
+        if macro is None:
+            logger.error("Macro", f"⚠️ 정의되지 않은 매크로: {name}")
+            return None
+        with self._cond:
+            if owner is not None:
+                for run in self._runs.values():
+                    if run.owner == owner and not run.cancelled:
+                        return run.run_id
+            if len(self._runs) >= self.max_active:
+                self.counts["rejected"] += 1
+                logger.error("Macro", f"⚠️ 동시 재생 매크로 수 제한({self.max_active}개) 초과 - 무시: {name}")
+                return None
+            run = MacroRun(next(self._run_ids), macro, owner, timebase.now_ns())
+            self._runs[run.run_id] = run
+            self.counts["started"] += 1
+            if macro.timeline:
+                self._push(run, run.next_due_ns())
+            else:
+                self._push(run, run.start_ns)
+        self.start_thread()
+        if config.ENABLE_VERBOSE_LOGGING:
+            logger.verbose("Macro", f"재생 시작: {name} (#{run.run_id})")
+        return run.run_id
+
+    def _push(self, run, due_ns):
+        heapq.heappush(self._heap, (due_ns, next(self._tie), run))
+        self._cond.notify()
+
+    def cancel(self, run_id=None, owner=None, repeating_only=False):
+        """
+        매크로 취소 (매크로가 누른 키는 재생 스레드가 바로 해제)
+
+        Args:
+            run_id: 취소할 재생 ID (None이면 owner 또는 전체)
+            owner: 이 버튼이 시작한 매크로만 취소
+            repeating_only: 반복 매크로만 취소 (버튼을 뗐을 때 - 한 번 재생 매크로는 끝까지 재생)
+
+        Returns:
+            int: 취소한 매크로 수
+        """
+        cancelled = 0
+        now = timebase.now_ns()
+        with self._cond:
+            for run in list(self._runs.values()):
+                if run.cancelled:
+                    continue
+                if run_id is not None and run.run_id != run_id:
+                    continue
+                if owner is not None and run.owner != owner:
+                    continue
+                if repeating_only and not run.macro.repeat:
+                    continue
+                run.cancelled = True
+                self._push(run, now)
+                cancelled += 1
+        return cancelled
+
+    def _next_due(self):
+        """다음 실행할 매크로 꺼내기 (예정 시각 MACRO_SPIN 전까지 대기)"""
+        spin_ns = timebase.seconds_to_ns(config.MACRO_SPIN)
+        with self._cond:
+            while True:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due_ns = self._heap[0][0]
+                wait_ns = due_ns - timebase.now_ns() - spin_ns
+                if wait_ns > 0:
+                    self._cond.wait(wait_ns / 1_000_000_000)
+                    continue
+                due_ns, _, run = heapq.heappop(self._heap)
+                return due_ns, run
+
+    def _run(self):
+        # 입력 처리용 코어 고정 및 우선순위 상향 (설정된 경우)
+        realtime.apply_critical("macro")
+        while True:
+            due_ns, run = self._next_due()
+            now = timebase.now_ns()
+            while now < due_ns:
+                timebase.sleep(0)
+                now = timebase.now_ns()
+            self._jitter.record(now - due_ns)
+            try:
+                self._step(run, now)
+            except Exception as e:
+                logger.error("Macro", f"⚠️ 매크로 재생 에러 ({run.macro.name}): {e}")
+                self._finish(run, "cancelled")
+
+    def _step(self, run, now):
+        """예정 시각이 된 단계 실행 후 다음 단계 예약 (재생 스레드에서만 호출)"""
+        if run.cancelled:
+            if run.run_id in self._runs:
+                self._finish(run, "cancelled")
+            return
+
+        timeline = run.macro.timeline
+        while run.index < len(timeline) and run.start_ns + timeline[run.index][0] <= now:
+            _, kind, key = timeline[run.index]
+            if kind == PRESS:
+                self._press(run, key)
+            else:
+                self._release(run, key)
+            run.index += 1
+
+        if run.index < len(timeline):
+            with self._cond:
+                if not run.cancelled:
+                    self._push(run, run.next_due_ns())
+            return
+
+        if run.macro.repeat:
+            # 반복: 이전 재생 시작 시각 기준으로 다음 재생 예약 (늦어져도 주기가 밀리지 않음)
+            run.start_ns += run.macro.duration_ns
+            if run.start_ns < now:
+                run.start_ns = now
+            run.index = 0
+            with self._cond:
+                if not run.cancelled:
+                    self._push(run, run.next_due_ns())
+            return
+
+        self._finish(run, "completed")
+
+    def _finish(self, run, outcome):
+        for key in list(run.held):
+            self._release(run, key)
+        with self._cond:
+            if self._runs.pop(run.run_id, None) is None:
+                return
+            self.counts[outcome] += 1
+        if config.ENABLE_VERBOSE_LOGGING:
+            logger.verbose("Macro", f"재생 {'완료' if outcome == 'completed' else '취소'}: {run.macro.name} (#{run.run_id})")
+
+    def _press(self, run, key):
+        with keyboard_handler.keyboard_lock:
+            # 다른 입력(버튼/조이스틱)이 이미 누른 키는 건드리지 않음
+            if key in keyboard_handler.pressed_keyboard_keys:
+                return
+            try:
+                keyboard_handler.keyboard.press(key)
+                keyboard_handler.pressed_keyboard_keys.add(key)
+                run.held.add(key)
+            except Exception as e:
+                if config.ENABLE_VERBOSE_LOGGING:
+                    logger.error("Key", f"Error pressing macro key {key}: {e}")
+
+    def _release(self, run, key):
+        if key not in run.held:
+            return
+        with keyboard_handler.keyboard_lock:
+            run.held.discard(key)
+            # 이미 다른 곳(/stop의 release_all_keys 등)에서 뗀 키는 다시 떼지 않음
+            if key not in keyboard_handler.pressed_keyboard_keys:
+                return
+            try:
+                keyboard_handler.keyboard.release(key)
+            except Exception as e:
+                if config.ENABLE_VERBOSE_LOGGING:
+                    logger.error("Key", f"Error releasing macro key {key}: {e}")
+            keyboard_handler.pressed_keyboard_keys.discard(key)
+
+    def get_stats(self):
+        """재생 중인 매크로 및 통계 (/status 표시용)"""
+        with self._cond:
+            active = [
+                {"id": run.run_id, "macro": run.macro.name, "owner": "/".join(run.owner) if run.owner else None}
+                for run in self._runs.values()
+            ]
+            counts = dict(self.counts)
+        return {"defined": sorted(self.definitions), "active": active, **counts}
+
+
+def load_definitions(macros=None):
+    """config.MACROS 컴파일 (잘못된 매크로는 에러를 기록하고 제외)"""
+    if macros is None:
+        macros = config.MACROS
+    definitions = {}
+    for name, spec in macros.items():
+        try:
+            definitions[name] = MacroDefinition(name, spec)
+        except (ValueError, TypeError, IndexError) as e:
+            logger.error("Macro", f"⚠️ 매크로 설정 오류 ({name}): {e}")
+    return definitions
+
+
+# 매크로 재생기 (스레드는 처음 재생할 때 시작)
+player = MacroPlayer(load_definitions())
+
+
+def macro_keys(macros=None):
+    """매크로에 사용된 모든 키 (키보드 백엔드 warm-up용)"""
+    if macros is None:
+        macros = config.MACROS
+    keys = set()
+    for spec in macros.values():
+        steps = spec.get("steps", ()) if isinstance(spec, dict) else spec
+        for step in steps:
+            if step and step[0] in (PRESS, RELEASE, "tap") and len(step) > 1 and step[1]:
+                keys.add(step[1])
+    return keys
+
+
+def get_macro_stats():
+    return player.get_stats()
@@ -3,13 +3,18 @@ MQTT 클라이언트 모듈
 MQTT 브로커와의 통신 처리
 """
 
+import collections
 import json
 import threading
 import time
-from datetime import datetime
 
+from . import codec
 from . import config
+from . import counters
 from . import data_processor
+from . import logger
+from . import rate_limit
+from . import session
 from . import utils
 
 # MQTT 클라이언트 (초기화는 나중에)
@@ -17,66 +22,287 @@ mqtt_client = None
 mqtt_connected = False
 mqtt_lock = threading.Lock()
 
+# 연결 상태 이벤트 (연결되면 set, 끊기면 clear - sleep으로 상태를 확인하지 않음)
+mqtt_connected_event = threading.Event()
+_publisher_thread = None
 
-def on_mqtt_connect(client, userdata, flags, rc):
-    """MQTT 연결 콜백"""
+# 상태 토픽 별칭 (MQTT v5 - 두 번째 발행부터 토픽 이름 대신 2바이트 별칭 전송)
+_STATUS_TOPIC_ALIAS = 1
+_status_alias = {"enabled": False, "sent": False}
+
+
+def on_mqtt_connect(client, userdata, flags, rc, properties=None):
+    """MQTT 연결 콜백 (MQTT v5에서는 CONNACK 속성도 전달됨)"""
     global mqtt_connected
     if rc == 0:
         mqtt_connected = True
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [MQTT] ✓ 브로커에 연결되었습니다 ({config.MQTT_BROKER_HOST}:{config.MQTT_BROKER_PORT})")
+        mqtt_connected_event.set()
+        logger.log("MQTT", f"✓ 브로커에 연결되었습니다 ({config.MQTT_BROKER_HOST}:{config.MQTT_BROKER_PORT})")
         
-        # 토픽 구독
-        joystick_topic = f"{config.MQTT_TOPIC_PREFIX}/joystick"
-        button_topic = f"{config.MQTT_TOPIC_PREFIX}/button"
-        status_topic = f"{config.MQTT_TOPIC_PREFIX}/status"
+        # 토픽 별칭은 연결마다 새로 등록해야 함 (브로커가 허용한 경우에만 사용)
+        with mqtt_lock:
+            _status_alias["enabled"] = getattr(properties, "TopicAliasMaximum", 0) >= _STATUS_TOPIC_ALIAS
+            _status_alias["sent"] = False
         
-        client.subscribe(joystick_topic)
-        client.subscribe(button_topic)
-        client.subscribe(status_topic)
+        # 토픽 구독 (기존 단일 플레이어 토픽 + 플레이어별 와일드카드 토픽, 각각 코덱 접미사 포함, 종류별 QoS)
+        # 한 토픽이 여러 필터에 맞으면 브로커가 같은 메시지를 여러 번 전달하므로 필터가 겹치지 않게 구성
+        # (코덱 접미사는 + 대신 이름을 지정 - 예: {prefix}/button/+ 는 컨트롤러 "button"의 {prefix}/button/joystick 과 겹침)
+        subscriptions = []
+        for event_type in _EVENT_HANDLERS:
+            qos = config.MQTT_QOS[event_type]
+            subscriptions.append((f"{config.MQTT_TOPIC_PREFIX}/{event_type}", qos))
+            subscriptions.append((f"{config.MQTT_TOPIC_PREFIX}/+/{event_type}", qos))
+            for codec_name in sorted(_TOPIC_CODECS):
+                subscriptions.append((f"{config.MQTT_TOPIC_PREFIX}/{event_type}/{codec_name}", qos))
+                subscriptions.append((f"{config.MQTT_TOPIC_PREFIX}/+/{event_type}/{codec_name}", qos))
+        client.subscribe(subscriptions)
         
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [MQTT] 토픽 구독: {joystick_topic}, {button_topic}, {status_topic}")
+        logger.log("MQTT", "토픽 구독: " + ", ".join(f"{topic} (QoS {qos})" for topic, qos in subscriptions))
         
         # 연결 성공 메시지 발행
         publish_mqtt_status({"status": "connected", "message": "MQTT 연결 성공"})
     else:
         mqtt_connected = False
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [MQTT] ⚠️ 연결 실패: 코드 {rc}")
+        mqtt_connected_event.clear()
+        logger.error("MQTT", f"⚠️ 연결 실패: 코드 {rc} (재연결은 자동으로 시도됩니다)")
 
 
-def on_mqtt_disconnect(client, userdata, rc):
+def on_mqtt_disconnect(client, userdata, rc, properties=None):
     """MQTT 연결 끊김 콜백"""
     global mqtt_connected
     mqtt_connected = False
-    print(f"[{datetime.now().strftime('%H:%M:%S')}] [MQTT] ⚠️ 브로커 연결이 끊어졌습니다")
+    mqtt_connected_event.clear()
+    # 별칭 등록은 연결과 함께 사라짐 (재연결 전에 발행되는 상태도 별칭만 보내지 않도록)
+    with mqtt_lock:
+        _status_alias["sent"] = False
+    if rc != 0:
+        logger.error("MQTT", f"⚠️ 브로커 연결이 끊어졌습니다 (코드 {rc}) - 재연결 대기 중")
+
+
+class MqttInbox:
+    """
+    MQTT 수신 메시지 대기열 (paho 네트워크 스레드와 메시지 처리 분리)
+    
+    paho 네트워크 스레드는 메시지를 넣기만 하고, JSON 디코딩과 키 입력 처리는 워커 스레드에서 수행한다.
+    - 조이스틱 토픽: 최신 메시지만 유지 (처리 전에 새 메시지가 오면 이전 메시지를 교체)
+    - 그 외 토픽: 순서대로 모두 처리, 대기열이 가득 차면 새 메시지를 버림
+    """
+    
+    def __init__(self, max_pending=256):
+        self.max_pending = max_pending
+        self._cond = threading.Condition()
+        self._order = collections.deque()  # [(route, payload) 또는 (route, None) - None이면 최신 조이스틱 값 사용]
+        self._latest_joystick = {}  # {route: payload}
+        self._thread = None
+        
+        # 통계
+        self.max_depth = 0
+        self.dropped_count = 0  # 대기열이 가득 차서 버린 메시지 수
+        self.coalesced_count = 0  # 최신 조이스틱 메시지로 교체된 메시지 수
+        self.processed_count = 0
+    
+    def start(self):
+        """워커 스레드 시작 (한 번만)"""
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="mqtt-inbox", daemon=True)
+            self._thread.start()
+    
+    def put(self, route, payload, is_joystick):
+        """
+        메시지 추가 (paho 네트워크 스레드에서 호출 - 디코딩하지 않고 바로 반환)
+        
+        Args:
+            route: (controller_id, event_type) - 조이스틱은 컨트롤러별로 최신 값만 유지
+        
+        Returns:
+            bool: 추가 여부 (대기열이 가득 차서 버리면 False)
+        """
+        with self._cond:
+            if is_joystick and route in self._latest_joystick:
+                # 아직 처리되지 않은 이전 조이스틱 메시지를 최신 값으로 교체 (대기열 위치는 유지)
+                self._latest_joystick[route] = payload
+                self.coalesced_count += 1
+                return True
+            
+            if len(self._order) >= self.max_pending:
+                self.dropped_count += 1
+                return False
+            
+            if is_joystick:
+                self._latest_joystick[route] = payload
+                self._order.append((route, None))
+            else:
+                self._order.append((route, payload))
+            
+            depth = len(self._order)
+            if depth > self.max_depth:
+                self.max_depth = depth
+            self._cond.notify()
+        return True
+    
+    def depth(self):
+        return len(self._order)
+    
+    def _take(self):
+        with self._cond:
+            while not self._order:
+                self._cond.wait()
+            route, payload = self._order.popleft()
+            if payload is None:
+                payload = self._latest_joystick.pop(route)
+        return route, payload
+    
+    def _run(self):
+        while True:
+            route, payload = self._take()
+            handle_mqtt_payload(route, payload)
+            self.processed_count += 1
+    
+    def get_stats(self):
+        return {
+            "queue_depth": self.depth(),
+            "max_queue_depth": self.max_depth,
+            "dropped": self.dropped_count,
+            "coalesced": self.coalesced_count,
+            "processed": self.processed_count
+        }
+
+
+# MQTT 수신 대기열 (init_mqtt_client()에서 워커 시작)
+mqtt_inbox = MqttInbox(max_pending=config.MQTT_INBOX_MAX_PENDING)
+
+
+# 이벤트 종류별 (디코딩 함수, 처리 함수)
+_EVENT_HANDLERS = {
+    "joystick": (codec.decode_joystick, data_processor.submit_joystick_event),
+    "button": (codec.decode_button, data_processor.submit_button_event),
+    "chord": (codec.decode_chord, data_processor.submit_chord_event),
+    "reset": (codec.decode_reset, data_processor.submit_joystick_event),
+    "session": (codec.decode_session, session.handle_frame),
+}
+
+# 토픽 접미사로 선택할 수 있는 코덱 (없으면 JSON)
+_TOPIC_CODECS = {codec.JSON, codec.BINARY, codec.MSGPACK}
+
+# 이벤트 종류별 속도 제한 분류 (코드/재시작은 버튼과, 세션 프레임은 조이스틱과 같은 제한 적용)
+_RATE_LIMIT_CLASSES = {
+    "joystick": "joystick", "button": "button", "chord": "button", "reset": "button", "session": "joystick"
+}
+
+# 메시지 종류별 요청 수 카운터 슬롯 (엔드포인트 "mqtt/{종류}")
+_ENDPOINT_SLOTS = {event_type: counters.endpoint_counters.slots(f"mqtt/{event_type}") for event_type in _EVENT_HANDLERS}
+
+# 토픽 해석 캐시 {topic: (controller_id, event_type, codec) 또는 None}
+_topic_routes = {}
+_TOPIC_ROUTES_MAX = 1024
+_MAX_CONTROLLER_ID_LENGTH = 64
+
+
+def resolve_topic(topic):
+    """
+    토픽 → (controller_id, event_type, codec) 해석 (토픽마다 한 번만 파싱하고 캐시)
+    
+    - {prefix}/joystick, {prefix}/button → 기본 컨트롤러
+    - {prefix}/{controller_id}/joystick, {prefix}/{controller_id}/button → 해당 컨트롤러
+    - {prefix}/{controller_id}/chord → 여러 버튼(비트마스크) + 선택적 조이스틱을 한 메시지로
+    - {prefix}/{controller_id}/session → 세션 프레임 (game_server/session.py, 최신 값만 남기지 않고 모두 처리)
+    - 끝에 /bin, /msgpack, /json을 붙이면 해당 코덱으로 디코딩 (예: {prefix}/p2/joystick/bin)
+    
+    Returns:
+        tuple: (controller_id, event_type, codec) 또는 처리 대상이 아니면 None
+    """
+    try:
+        return _topic_routes[topic]
+    except KeyError:
+        pass
+    
+    route = None
+    prefix = config.MQTT_TOPIC_PREFIX + "/"
+    if topic.startswith(prefix):
+        parts = topic[len(prefix):].split("/")
+        codec_name = codec.JSON
+        if len(parts) > 1 and parts[-1] in _TOPIC_CODECS:
+            codec_name = parts.pop()
+        if len(parts) == 1:
+            controller_id, event_type = config.DEFAULT_CONTROLLER_ID, parts[0]
+        elif len(parts) == 2:
+            controller_id, event_type = parts
+        else:
+            controller_id, event_type = None, None
+        if event_type in _EVENT_HANDLERS and controller_id and len(controller_id) <= _MAX_CONTROLLER_ID_LENGTH:
+            route = (controller_id, event_type, codec_name)
+    
+    # 임의의 토픽으로 캐시가 커지지 않도록 제한
+    if len(_topic_routes) >= _TOPIC_ROUTES_MAX:
+        _topic_routes.clear()
+    _topic_routes[topic] = route
+    return route
 
 
 def on_mqtt_message(client, userdata, msg):
-    """MQTT 메시지 수신 콜백"""
+    """MQTT 메시지 수신 콜백 (paho 네트워크 스레드 - 대기열에 넣기만 함)"""
     try:
         topic = msg.topic
-        payload = msg.payload.decode('utf-8')
+        route = resolve_topic(topic)
+        if route is None:
+            return
+        
+        event_type = route[1]
+        slots = _ENDPOINT_SLOTS[event_type]
+        counters.add(slots[counters.ENDPOINT_REQUESTS])
+        
+        # 컨트롤러 수 제한을 넘는 ID는 속도 제한 버킷을 만들기 전에 버림
+        controller = data_processor.get_controller(route[0])
+        if controller is None:
+            logger.error("MQTT", f"⚠️ 컨트롤러 수 제한({config.MAX_CONTROLLERS}개) 초과 - 무시: {route[0]}")
+            counters.add(slots[counters.ENDPOINT_ERRORS])
+            return
+        
+        # 속도 제한 확인 (디코딩 전에 조용히 버림 - MQTT는 응답할 대상이 없음)
+        # 토픽 문자열(코덱 접미사 등)이 아니라 컨트롤러별로 제한 - 키는 컨트롤러 객체 (HTTP의 IP 문자열 키와 겹치지 않음)
+        if not rate_limit.allow_event(_RATE_LIMIT_CLASSES[event_type], controller, source="MQTT"):
+            counters.add(slots[counters.ENDPOINT_ERRORS])
+            return
+        mqtt_inbox.put(route, msg.payload, event_type == "joystick")
+        
+    except Exception as e:
+        logger.exception("MQTT", f"⚠️ 메시지 수신 에러: {e}")
+
+
+def handle_mqtt_payload(route, payload):
+    """MQTT 메시지 디코딩 및 처리 (MqttInbox 워커 스레드에서 호출)"""
+    controller_id, event_type, codec_name = route
+    try:
+        controller = data_processor.get_controller(controller_id)
+        if controller is None:
+            logger.error("MQTT", f"⚠️ 컨트롤러 수 제한({config.MAX_CONTROLLERS}개) 초과 - 무시: {controller_id}")
+            counters.add(_ENDPOINT_SLOTS[event_type][counters.ENDPOINT_ERRORS])
+            return
         
-        # JSON 파싱
+        decode, submit = _EVENT_HANDLERS[event_type]
         try:
-            data = json.loads(payload)
-        except json.JSONDecodeError:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [MQTT] ⚠️ 잘못된 JSON 형식: {payload}")
+            event = decode(payload, codec_name, controller.key_mapping)
+        except ValueError as e:
+            logger.error("MQTT", f"⚠️ 잘못된 메시지 형식 ({event_type}/{codec_name}): {e}")
+            counters.add(_ENDPOINT_SLOTS[event_type][counters.ENDPOINT_ERRORS])
             return
         
-        # 토픽에 따라 처리
-        if topic.endswith("/joystick"):
-            data_processor.process_joystick_data_internal(data, source="MQTT")
-        elif topic.endswith("/button"):
-            data_processor.process_button_data_internal(data, source="MQTT")
-        elif topic.endswith("/status"):
-            # 상태 요청에 응답 (MQTT 상태 발행 루프와 동일한 방식으로 처리)
-            pass  # 상태는 주기적으로 자동 발행되므로 여기서는 처리하지 않음
+        submit(event, source="MQTT", controller=controller)
         
     except Exception as e:
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [MQTT] ⚠️ 메시지 처리 에러: {e}")
-        import traceback
-        if config.ENABLE_VERBOSE_LOGGING:
-            traceback.print_exc()
+        logger.exception("MQTT", f"⚠️ 메시지 처리 에러: {e}")
+
+
+def get_mqtt_stats():
+    """MQTT 상태 및 수신 대기열 통계 (/status 표시용)"""
+    stats = mqtt_inbox.get_stats()
+    stats["connected"] = mqtt_connected
+    stats["protocol"] = config.MQTT_PROTOCOL
+    stats["qos"] = dict(config.MQTT_QOS)
+    stats["status_topic_alias"] = _status_alias["enabled"]
+    return stats
 
 
 def publish_mqtt_status(status_data):
@@ -88,126 +314,176 @@ def publish_mqtt_status(status_data):
         return
     
     try:
-        topic = f"{config.MQTT_TOPIC_PREFIX}/status"
-        payload = json.dumps(status_data, ensure_ascii=False)
-        mqtt_client.publish(topic, payload, qos=1, retain=False)
+        topic, properties, registers_alias = _status_publish_target()
+        # 공백 없는 JSON (라즈베리파이 브로커/무선 구간 전송량 절감)
+        payload = json.dumps(status_data, ensure_ascii=False, separators=(",", ":"))
+        info = mqtt_client.publish(topic, payload, qos=config.MQTT_QOS["status"], retain=False, properties=properties)
+        if registers_alias:
+            from paho.mqtt.client import MQTT_ERR_SUCCESS
+            
+            # 토픽 이름과 별칭을 함께 보낸 발행이 전송 대기열에 들어간 뒤에만 별칭만 보내기 시작
+            if info.rc == MQTT_ERR_SUCCESS:
+                with mqtt_lock:
+                    _status_alias["sent"] = True
     except Exception as e:
         if config.ENABLE_VERBOSE_LOGGING:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [MQTT] ⚠️ 상태 발행 에러: {e}")
+            logger.error("MQTT", f"⚠️ 상태 발행 에러: {e}")
+
+
+def _status_publish_target():
+    """
+    상태 발행 토픽과 속성 (MQTT v5에서 브로커가 허용하면 토픽 별칭 사용)
+    
+    Returns:
+        tuple: (topic, properties, 별칭 등록 여부) - 별칭 등록 후에는 빈 토픽 + 별칭 속성
+    """
+    topic = f"{config.MQTT_TOPIC_PREFIX}/status"
+    with mqtt_lock:
+        if not _status_alias["enabled"]:
+            return topic, None, False
+        alias_sent = _status_alias["sent"]
+    
+    from paho.mqtt.packettypes import PacketTypes
+    from paho.mqtt.properties import Properties
+    
+    properties = Properties(PacketTypes.PUBLISH)
+    properties.TopicAlias = _STATUS_TOPIC_ALIAS
+    # 등록될 때까지는 토픽 이름과 별칭을 함께 보내고, 이후에는 별칭만 전송
+    if alias_sent:
+        return "", properties, False
+    return topic, properties, True
+
+
+def _create_client():
+    """paho 클라이언트 생성 (paho-mqtt 1.x/2.x, MQTT 3.1.1/5 지원)"""
+    import paho.mqtt.client as mqtt
+    
+    protocol = mqtt.MQTTv5 if config.MQTT_PROTOCOL == "5" else mqtt.MQTTv311
+    if hasattr(mqtt, "CallbackAPIVersion"):
+        # paho-mqtt 2.x: 기존 콜백 시그니처(VERSION1) 사용
+        return mqtt.Client(mqtt.CallbackAPIVersion.VERSION1, client_id=config.MQTT_CLIENT_ID, protocol=protocol)
+    return mqtt.Client(client_id=config.MQTT_CLIENT_ID, protocol=protocol)
 
 
-def init_mqtt_client(cached_server_ips):
-    """MQTT 클라이언트 초기화 및 연결"""
+def init_mqtt_client(client_factory=None):
+    """
+    MQTT 클라이언트 초기화 및 비동기 연결 시작 (블로킹 없음)
+    
+    연결은 paho 네트워크 스레드에서 진행되며, 브로커에 연결할 수 없으면
+    MQTT_RECONNECT_MIN_DELAY ~ MQTT_RECONNECT_MAX_DELAY 사이에서 지수적으로 늘어나는 간격으로 재시도한다.
+    연결 상태는 mqtt_connected_event로 확인한다.
+    
+    Args:
+        client_factory: 클라이언트 생성 함수 (테스트용, 기본값: paho 클라이언트)
+    
+    Returns:
+        bool: 연결 시도를 시작했는지 여부 (연결 완료 여부가 아님)
+    """
     global mqtt_client, mqtt_connected
     
-    if not config.MQTT_AVAILABLE:
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [MQTT] ⚠️ paho-mqtt가 설치되지 않아 MQTT 기능을 사용할 수 없습니다")
-        return False
+    if client_factory is None:
+        if not config.MQTT_AVAILABLE:
+            logger.error("MQTT", "⚠️ paho-mqtt가 설치되지 않아 MQTT 기능을 사용할 수 없습니다 (pip install paho-mqtt)")
+            return False
+        client_factory = _create_client
     
     if not config.MQTT_ENABLED:
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [MQTT] ℹ️ MQTT가 비활성화되어 있습니다 (MQTT_ENABLED=false)")
+        logger.log("MQTT", "ℹ️ MQTT가 비활성화되어 있습니다 (MQTT_ENABLED=false)")
         return False
     
     try:
-        import paho.mqtt.client as mqtt
-        
         # MQTT 클라이언트 생성
-        mqtt_client = mqtt.Client(client_id=config.MQTT_CLIENT_ID)
+        client = client_factory()
         
         # 인증 설정
         if config.MQTT_USERNAME and config.MQTT_PASSWORD:
-            mqtt_client.username_pw_set(config.MQTT_USERNAME, config.MQTT_PASSWORD)
+            client.username_pw_set(config.MQTT_USERNAME, config.MQTT_PASSWORD)
         
         # 콜백 설정
-        mqtt_client.on_connect = on_mqtt_connect
-        mqtt_client.on_disconnect = on_mqtt_disconnect
-        mqtt_client.on_message = on_mqtt_message
+        client.on_connect = on_mqtt_connect
+        client.on_disconnect = on_mqtt_disconnect
+        client.on_message = on_mqtt_message
         
-        # 연결 시도
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [MQTT] 브로커에 연결 중... ({config.MQTT_BROKER_HOST}:{config.MQTT_BROKER_PORT})")
+        # 재연결 간격 (지수 백오프: 실패할 때마다 2배, 최대 max_delay)
+        client.reconnect_delay_set(min_delay=config.MQTT_RECONNECT_MIN_DELAY, max_delay=config.MQTT_RECONNECT_MAX_DELAY)
         
-        try:
-            mqtt_client.connect(config.MQTT_BROKER_HOST, config.MQTT_BROKER_PORT, keepalive=60)
-            mqtt_client.loop_start()  # 백그라운드 스레드에서 루프 실행
-            
-            # 연결 확인을 위해 잠시 대기
-            time.sleep(1)
-            
-            if mqtt_connected:
-                return True
-            else:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] [MQTT] ⚠️ 브로커 연결 실패 (mosquitto가 실행 중인지 확인하세요)")
-                return False
-                
-        except Exception as e:
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [MQTT] ⚠️ 브로커 연결 에러: {e}")
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] [MQTT] 💡 mosquitto 브로커가 실행 중인지 확인하세요")
-            return False
+        logger.log("MQTT", f"브로커 연결 시작 (백그라운드)... ({config.MQTT_BROKER_HOST}:{config.MQTT_BROKER_PORT})")
+        
+        mqtt_connected = False
+        mqtt_connected_event.clear()
+        mqtt_client = client
+        
+        # 수신 메시지 처리 워커 시작 (paho 네트워크 스레드에서는 처리하지 않음)
+        mqtt_inbox.start()
+        
+        # 비동기 연결: 실제 연결과 재시도는 loop_start()의 네트워크 스레드에서 수행
+        client.connect_async(config.MQTT_BROKER_HOST, config.MQTT_BROKER_PORT, keepalive=60)
+        client.loop_start()
+        return True
             
     except Exception as e:
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] [MQTT] ⚠️ 초기화 에러: {e}")
+        logger.error("MQTT", f"⚠️ 초기화 에러: {e}")
+        return False
+
+
+def wait_until_connected(timeout=None):
+    """
+    브로커 연결까지 대기 (테스트/도구용)
+    
+    Returns:
+        bool: 제한 시간 안에 연결되었는지 여부
+    """
+    return mqtt_connected_event.wait(timeout)
+
+
+def start_mqtt(client_factory=None):
+    """
+    MQTT 클라이언트와 상태 발행 스레드 시작 (server.py에서 호출, 즉시 반환)
+    
+    Returns:
+        bool: 시작 여부
+    """
+    global _publisher_thread
+    
+    if not init_mqtt_client(client_factory):
         return False
+    
+    if _publisher_thread is None:
+        _publisher_thread = threading.Thread(target=mqtt_status_publisher_loop, name="mqtt-status", daemon=True)
+        _publisher_thread.start()
+    return True
+
+
+def stop_mqtt():
+    """MQTT 연결 종료 (서버 종료 시)"""
+    global mqtt_connected
+    client = mqtt_client
+    if client is None:
+        return
+    try:
+        client.disconnect()
+        client.loop_stop()
+    except Exception as e:
+        logger.error("MQTT", f"⚠️ 종료 에러: {e}")
+    mqtt_connected = False
+    mqtt_connected_event.clear()
 
 
-def mqtt_status_publisher_loop(cached_server_ips):
-    """주기적으로 서버 상태를 MQTT로 발행하는 루프"""
+def mqtt_status_publisher_loop():
+    """주기적으로 서버 상태를 MQTT로 발행하는 루프 (연결된 동안에만 발행)"""
     while True:
+        # 연결될 때까지 대기 (연결 이벤트 사용 - 연결 전에는 깨어나지 않음)
+        mqtt_connected_event.wait()
         try:
-            if mqtt_connected:
-                # 서버 상태 가져오기 (Flask 컨텍스트 없이 직접 데이터 구성)
-                now = datetime.now()
-                
-                # 마지막 수신으로부터 경과 시간 계산
-                joystick_elapsed = None
-                button_elapsed = None
-                
-                if data_processor.stats["last_joystick_time"]:
-                    joystick_elapsed = (now - data_processor.stats["last_joystick_time"]).total_seconds()
-                
-                if data_processor.stats["last_button_time"]:
-                    button_elapsed = (now - data_processor.stats["last_button_time"]).total_seconds()
-                
-                joystick_active = joystick_elapsed is not None and joystick_elapsed < 5.0
-                button_active = button_elapsed is not None and button_elapsed < 5.0
-                
-                server_ips = utils.get_all_local_ips(use_cache=True, cache_var=cached_server_ips)
-                
-                status_data = {
-                    "status": "ok",
-                    "server_running": True,
-                    "server_start_time": data_processor.stats["server_start_time"].isoformat(),
-                    "current_time": now.isoformat(),
-                    "server_ips": server_ips,
-                    "statistics": {
-                        "joystick": {
-                            "total_received": data_processor.stats["joystick_count"],
-                            "last_received": data_processor.stats["last_joystick_time"].isoformat() if data_processor.stats["last_joystick_time"] else None,
-                            "elapsed_seconds": round(joystick_elapsed, 2) if joystick_elapsed is not None else None,
-                            "is_active": joystick_active
-                        },
-                        "button": {
-                            "total_received": data_processor.stats["button_count"],
-                            "last_received": data_processor.stats["last_button_time"].isoformat() if data_processor.stats["last_button_time"] else None,
-                            "elapsed_seconds": round(button_elapsed, 2) if button_elapsed is not None else None,
-                            "is_active": button_active
-                        }
-                    },
-                    "recent_data": {
-                        "joystick": data_processor.recent_data["last_joystick"],
-                        "button": data_processor.recent_data["last_button"]
-                    },
-                    "summary": {
-                        "receiving_data": joystick_active or button_active,
-                        "message": "데이터 수신 중" if (joystick_active or button_active) else "데이터 수신 대기 중"
-                    },
-                    "mqtt_connected": mqtt_connected
-                }
-                
-                publish_mqtt_status(status_data)
+            # 서버 상태 가져오기 (Flask 컨텍스트 없이 직접 데이터 구성)
+            status_data = data_processor.get_status_snapshot()
+            status_data["server_ips"] = utils.get_server_ips()
+            status_data["mqtt_connected"] = mqtt_connected
+            
+            publish_mqtt_status(status_data)
         except Exception as e:
             if config.ENABLE_VERBOSE_LOGGING:
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] [MQTT] 상태 발행 루프 에러: {e}")
+                logger.verbose("MQTT", f"상태 발행 루프 에러: {e}")
         
         # 5초마다 상태 발행
-        time.sleep(5)
-
+        time.sleep(config.MQTT_STATUS_INTERVAL)
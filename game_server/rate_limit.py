@@ -0,0 +1,133 @@
+"""
+속도 제한 모듈
+클라이언트별 토큰 버킷으로 입력 폭주 차단 (한 클라이언트가 다른 플레이어를 방해하지 못하도록)
+"""
+
+import threading
+from collections import OrderedDict
+
+from . import config
+from . import counters
+from . import timebase
+
+
+class TokenBucket:
+    """토큰 버킷 상태 (남은 토큰 수, 마지막 보충 시각 - 단조 시간 나노초)"""
+
+    __slots__ = ("tokens", "last")
+
+    def __init__(self, burst, now):
+        self.tokens = float(burst)
+        self.last = now
+
+
+class RateLimiter:
+    """
+    클라이언트 키별 토큰 버킷 모음
+
+    버킷 수는 max_clients로 제한되며, 가장 오래 사용되지 않은 버킷부터 제거한다.
+    """
+
+    def __init__(self, rate, burst, max_clients=1024):
+        self.rate = float(rate)
+        self._rate_per_ns = self.rate / timebase.NS_PER_SECOND
+        self.burst = float(burst)
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()  # {client_key: TokenBucket}
+        self._lock = threading.Lock()
+
+    def allow(self, client_key, now=None):
+        """
+        이벤트 1개를 허용할지 판단
+
+        Returns:
+            bool: 허용 여부 (토큰이 없으면 False)
+        """
+        if now is None:
+            now = timebase.now_ns()
+
+        with self._lock:
+            bucket = self._buckets.get(client_key)
+            if bucket is None:
+                bucket = TokenBucket(self.burst, now)
+                self._buckets[client_key] = bucket
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client_key)
+                # 경과 시간만큼 토큰 보충 (최대 burst)
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.last) * self._rate_per_ns)
+                bucket.last = now
+
+            if bucket.tokens >= 1.0:
+                bucket.tokens -= 1.0
+                return True
+            return False
+
+    def retry_after(self):
+        """토큰 1개가 보충되는 데 걸리는 시간 (초)"""
+        return 1.0 / self.rate if self.rate > 0 else 1.0
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+# 이벤트 종류별 속도 제한기
+limiters = {
+    event_type: RateLimiter(rate, burst, max_clients=config.RATE_LIMIT_MAX_CLIENTS)
+    for event_type, (rate, burst) in config.RATE_LIMITS.items()
+}
+
+# 속도 제한 통계 - 출처별 차단된 이벤트 수 (여러 웹/MQTT 스레드가 올리므로 counters 샤드 사용)
+_EVENT_TYPES = tuple(config.RATE_LIMITS)
+_EVENT_INDEX = {event_type: index for index, event_type in enumerate(_EVENT_TYPES)}
+throttled_counters = counters.group("throttled", _EVENT_TYPES)
+
+
+def allow_event(event_type, client_key, source="HTTP"):
+    """
+    이벤트 허용 여부 확인 (JSON 파싱 전에 호출하여 차단 비용 최소화)
+
+    Args:
+        event_type: 이벤트 종류 ("joystick", "button")
+        client_key: 클라이언트 식별자 (HTTP는 IP, MQTT는 컨트롤러 - 클라이언트가 마음대로 바꿀 수 있는 값은 사용하지 말 것)
+        source: 데이터 출처 ("HTTP" 또는 "MQTT")
+
+    Returns:
+        bool: 허용 여부
+    """
+    if not config.RATE_LIMIT_ENABLED:
+        return True
+
+    limiter = limiters.get(event_type)
+    if limiter is None or limiter.allow(client_key):
+        return True
+
+    counters.add(throttled_counters.slots(source)[_EVENT_INDEX[event_type]])
+    return False
+
+
+def retry_after_seconds(event_type):
+    """429 응답의 Retry-After 값 (정수 초, 최소 1)"""
+    limiter = limiters.get(event_type)
+    if limiter is None:
+        return 1
+    return max(1, int(limiter.retry_after() + 0.999))
+
+
+def get_rate_limit_stats():
+    """속도 제한 통계 반환 (/status 표시용)"""
+    throttled = {event_type: {} for event_type in _EVENT_TYPES}
+    for (group_name, source, event_type), total in counters.snapshot().items():
+        if group_name == "throttled" and total:
+            throttled[event_type][source] = total
+    return {
+        "enabled": config.RATE_LIMIT_ENABLED,
+        "limits": {
+            event_type: {"rate": limiter.rate, "burst": limiter.burst}
+            for event_type, limiter in limiters.items()
+        },
+        "throttled": throttled,
+        "throttled_total": sum(sum(counts.values()) for counts in throttled.values())
+    }
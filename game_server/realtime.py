@@ -0,0 +1,170 @@
+"""
+실행 우선순위 모듈
+입력 처리 스레드의 CPU 고정(affinity), 실시간 스케줄링(SCHED_FIFO), nice 설정 및 스케줄링 지연(jitter) 통계
+
+- configure_process(): 서버 시작 직후 메인 스레드에서 호출 - 이후 생성되는 웹/MQTT 스레드는
+  CRITICAL_CPUS를 제외한 코어에서 실행 (Linux에서 affinity는 스레드 단위이며 생성한 스레드에서 상속됨)
+- apply_critical(name): 입력 처리 스레드가 시작할 때 스스로 호출 - CRITICAL_CPUS 고정 및 우선순위 상향
+
+권한이 없거나 지원하지 않는 플랫폼에서는 경고만 기록하고 기본 스케줄링으로 계속 실행한다.
+"""
+
+import collections
+import os
+import threading
+
+from . import config
+from . import logger
+
+
+class JitterStats:
+    """
+    스케줄링 지연 통계 (예정 시각보다 늦게 실행된 시간)
+
+    기록은 스레드 하나에서만 하고, 조회 시 최근 샘플로 백분위수를 계산한다.
+    """
+
+    def __init__(self, window=None):
+        self._samples = collections.deque(maxlen=window or config.JITTER_WINDOW)
+        self.count = 0
+        self.max_ns = 0
+
+    def record(self, late_ns):
+        if late_ns < 0:
+            late_ns = 0
+        self._samples.append(late_ns)
+        self.count += 1
+        if late_ns > self.max_ns:
+            self.max_ns = late_ns
+
+    def snapshot(self):
+        """{"count", "p50_ms", "p99_ms", "max_ms"} (최근 샘플 기준, max_ms는 시작 이후 최대)"""
+        samples = sorted(self._samples)
+        if not samples:
+            return {"count": 0, "p50_ms": None, "p99_ms": None, "max_ms": None}
+        return {
+            "count": self.count,
+            "p50_ms": round(samples[len(samples) // 2] / 1_000_000, 3),
+            "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] / 1_000_000, 3),
+            "max_ms": round(self.max_ns / 1_000_000, 3)
+        }
+
+
+# 스레드별 스케줄링 지연 통계
+jitter = {
+    "watchdog": JitterStats(),  # 입력 감시 주기 타이머가 늦게 깬 시간
+    "input_scheduler": JitterStats(),  # 입력이 큐에 들어간 뒤 스케줄러 스레드가 꺼낼 때까지의 시간
+    "macro": JitterStats(),  # 매크로 단계가 예정 시각보다 늦게 실행된 시간
+}
+
+# 적용 결과 {이름: {"cpus": [...], "policy": str, "nice": int, "errors": [...]}}
+thread_settings = {}
+_settings_lock = threading.Lock()
+
+
+def parse_cpu_list(text):
+    """ "3", "2,3", "2-3" → {2, 3} (빈 문자열이면 빈 집합)"""
+    cpus = set()
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cpus.update(range(int(start), int(end) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus
+
+
+def critical_cpus():
+    """입력 처리 스레드용 코어 (사용 가능한 코어와 교집합, 설정 없으면 빈 집합)"""
+    if not config.CRITICAL_CPUS or not hasattr(os, "sched_getaffinity"):
+        return set()
+    try:
+        requested = parse_cpu_list(config.CRITICAL_CPUS)
+    except ValueError:
+        logger.error("Realtime", f"⚠️ CRITICAL_CPUS 형식이 잘못되었습니다: {config.CRITICAL_CPUS}")
+        return set()
+    return requested & os.sched_getaffinity(0)
+
+
+def _record(name, settings):
+    with _settings_lock:
+        thread_settings[name] = settings
+    if settings["errors"]:
+        logger.log("Realtime", f"⚠️ [{name}] 일부 설정을 적용하지 못했습니다: {'; '.join(settings['errors'])}",
+                   level="warning")
+    elif settings["cpus"] is not None or settings["policy"] != "other" or settings["nice"]:
+        logger.log("Realtime", f"[{name}] CPU {settings['cpus']}, 스케줄링 {settings['policy']}, nice {settings['nice']}")
+
+
+def configure_process():
+    """
+    메인 스레드를 입력 처리용 코어 밖으로 고정 (이후 생성되는 웹/MQTT 스레드에 상속)
+
+    서버 시작 시 다른 스레드를 만들기 전에 호출한다.
+    """
+    cpus = critical_cpus()
+    if not cpus:
+        return
+    settings = {"cpus": None, "policy": "other", "nice": 0, "errors": []}
+    web_cpus = os.sched_getaffinity(0) - cpus
+    if not web_cpus:
+        settings["errors"].append(f"CRITICAL_CPUS {sorted(cpus)}가 사용 가능한 모든 코어를 차지하여 웹 스레드는 고정하지 않음")
+    else:
+        try:
+            os.sched_setaffinity(0, web_cpus)
+            settings["cpus"] = sorted(web_cpus)
+        except OSError as e:
+            settings["errors"].append(f"affinity: {e}")
+    _record("web", settings)
+
+
+def apply_critical(name):
+    """
+    현재 스레드를 입력 처리 스레드로 설정 (CRITICAL_CPUS 고정, SCHED_FIFO, nice)
+
+    Args:
+        name: 통계에 표시할 스레드 이름 ("watchdog", "input_scheduler", "macro", "emitter")
+    """
+    settings = {"cpus": None, "policy": "other", "nice": 0, "errors": []}
+
+    cpus = critical_cpus()
+    if cpus:
+        try:
+            os.sched_setaffinity(0, cpus)
+            settings["cpus"] = sorted(cpus)
+        except OSError as e:
+            settings["errors"].append(f"affinity: {e}")
+
+    if config.CRITICAL_SCHED_FIFO:
+        if hasattr(os, "sched_setscheduler"):
+            try:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(config.CRITICAL_RT_PRIORITY))
+                settings["policy"] = f"fifo:{config.CRITICAL_RT_PRIORITY}"
+            except OSError as e:
+                settings["errors"].append(f"SCHED_FIFO: {e}")
+        else:
+            settings["errors"].append("SCHED_FIFO: 지원하지 않는 플랫폼")
+
+    if config.CRITICAL_NICE and settings["policy"] == "other":
+        try:
+            # Linux에서 PRIO_PROCESS + 스레드 ID는 해당 스레드에만 적용
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), config.CRITICAL_NICE)
+            settings["nice"] = config.CRITICAL_NICE
+        except (OSError, AttributeError) as e:
+            settings["errors"].append(f"nice: {e}")
+
+    _record(name, settings)
+    return settings
+
+
+def get_realtime_stats():
+    """스레드별 설정 및 스케줄링 지연 통계 (/status 표시용)"""
+    with _settings_lock:
+        settings = {name: dict(value) for name, value in thread_settings.items()}
+    return {
+        "critical_cpus": sorted(critical_cpus()),
+        "threads": settings,
+        "jitter": {name: stats.snapshot() for name, stats in jitter.items()}
+    }
@@ -0,0 +1,238 @@
+"""
+세션 프로토콜 모듈
+keepalive + keyframe/delta 프레임으로 컨트롤러 연결 상태를 정확히 추적
+
+클라이언트는 값이 바뀌지 않으면 데이터를 보내지 않으므로, 세션 없이는 "키를 계속 누르고 있음"과
+"연결 끊김"을 구분할 수 없어 입력 감시 루프가 기한으로 추정한다 (cadence.py).
+세션을 사용하는 클라이언트는 다음 프레임을 보낸다 (HTTP POST /session, MQTT {prefix}/{player}/session):
+
+- keyframe: 전체 상태 (조이스틱 + 모든 눌린 버튼) - 세션 시작/재동기화 시
+- delta: 바뀐 값만 (조이스틱 또는 일부 버튼)
+- keepalive: 상태 변화 없음 - keepalive 간격마다 전송 (데이터가 없는 작은 프레임)
+- bye: 세션 종료 (키 바로 해제)
+
+keepalive 간격 × SESSION_MISSED_KEEPALIVES 동안 프레임이 없으면 세션을 종료하고 해당 컨트롤러의 키를 바로 해제한다.
+seq가 이전 프레임 이하인 프레임(중복/순서 뒤바뀜)은 버리고, 세션이 기록한 상태와 같은 값은 다시 처리하지 않는다.
+"""
+
+import threading
+
+from . import codec
+from . import config
+from . import data_processor
+from . import logger
+from . import timebase
+
+
+class Session:
+    """세션 하나의 상태 (클라이언트가 마지막으로 보낸 조이스틱/버튼 상태 포함)"""
+
+    __slots__ = (
+        "session_id", "controller", "source", "keepalive_ns", "timeout_ns", "started_ns", "last_seen_ns",
+        "last_seq", "joystick", "pressed_buttons", "frame_counts", "skipped"
+    )
+
+    def __init__(self, session_id, controller, source, now):
+        self.session_id = session_id
+        self.controller = controller
+        self.source = source
+        self.started_ns = now
+        self.last_seen_ns = now
+        self.last_seq = None
+        self.joystick = None  # 마지막으로 적용한 (x, y) - None이면 아직 적용하지 않음
+        self.pressed_buttons = set(controller.pressed_buttons)
+        self.frame_counts = {kind: 0 for kind in codec.FRAME_KINDS}
+        self.skipped = 0  # 같은 값이라 처리하지 않은 조이스틱/버튼 수 + 버린 프레임 수
+        self.set_keepalive(None)
+
+    def set_keepalive(self, keepalive_ms):
+        """keepalive 간격 설정 (None이면 기본값, 허용 범위로 제한)"""
+        if keepalive_ms is None:
+            interval = config.SESSION_KEEPALIVE_INTERVAL
+        else:
+            interval = min(max(keepalive_ms / 1000, config.SESSION_KEEPALIVE_MIN), config.SESSION_KEEPALIVE_MAX)
+        self.keepalive_ns = timebase.seconds_to_ns(interval)
+        self.timeout_ns = self.keepalive_ns * config.SESSION_MISSED_KEEPALIVES
+
+
+# 세션 목록 {session_id: Session}
+sessions = {}
+_sessions_lock = threading.Lock()
+
+# 세션 통계
+session_stats = {
+    "started": 0,
+    "ended": 0,  # bye로 종료
+    "expired": 0,  # keepalive가 끊겨 종료
+    "replaced": 0,  # 같은 세션 ID가 다른 컨트롤러의 keyframe을 보내 이전 세션을 종료
+    "resync": 0,  # 알 수 없는 세션의 delta/keepalive (keyframe 재전송 요청)
+    "stale": 0,  # seq가 이전 이하라 버린 프레임
+}
+
+_RESYNC_RESULT = {"status": "error", "message": "Unknown session - send a keyframe", "resync": True}
+
+
+def _end_session(session, reason):
+    """
+    세션 제거 및 컨트롤러 키 해제 (_sessions_lock 안에서 호출)
+
+    컨트롤러를 다른 세션이 이어받았으면 키를 해제하지 않는다 (새 세션이 누르고 있는 키 유지).
+    """
+    if sessions.get(session.session_id) is session:
+        del sessions[session.session_id]
+    if session.controller.session is session:
+        session.controller.session = None
+        data_processor.release_controller(session.controller, f"Session/{session.source}", session.pressed_buttons)
+    session_stats[reason] += 1
+    logger.log("Session", f"세션 종료 ({reason}): {session.session_id} [{session.controller.controller_id}]")
+
+
+def _apply_joystick(session, joystick, source):
+    """세션이 기록한 값과 다를 때만 조이스틱 적용"""
+    position = (joystick.x, joystick.y)
+    if position == session.joystick and not joystick.reset:
+        session.skipped += 1
+        return 0
+    session.joystick = position
+    data_processor.submit_joystick_event(joystick, source, session.controller)
+    return 1
+
+
+def _apply_button(session, button, source):
+    """세션이 기록한 값과 다를 때만 버튼 적용"""
+    pressed = bool(button.pressed)
+    if pressed == (button.button in session.pressed_buttons):
+        session.skipped += 1
+        return 0
+    if pressed:
+        session.pressed_buttons.add(button.button)
+    else:
+        session.pressed_buttons.discard(button.button)
+    data_processor.submit_button_event(button, source, session.controller)
+    return 1
+
+
+def handle_frame(frame, source="HTTP", controller=None):
+    """
+    세션 프레임 처리
+
+    Args:
+        frame: codec.SessionFrame
+        source: 데이터 출처 ("HTTP" 또는 "MQTT")
+        controller: 컨트롤러 상태 (MQTT는 토픽에서 결정, HTTP는 None이면 frame.controller 또는 기본 컨트롤러)
+
+    Returns:
+        dict: 처리 결과 (알 수 없는 세션이면 {"resync": True})
+    """
+    if controller is None:
+        controller = data_processor.get_controller(frame.controller or config.DEFAULT_CONTROLLER_ID)
+        if controller is None:
+            return {"status": "error", "message": f"Too many controllers (max {config.MAX_CONTROLLERS})"}
+
+    now = timebase.now_ns()
+    with _sessions_lock:
+        session = sessions.get(frame.session)
+
+        if frame.kind == codec.FRAME_BYE:
+            if session is not None:
+                session.frame_counts[codec.FRAME_BYE] += 1
+                _end_session(session, "ended")
+            return {"status": "ok", "session": frame.session, "ended": True}
+
+        if frame.kind == codec.FRAME_KEYFRAME:
+            if session is None or session.controller is not controller:
+                if session is None and len(sessions) >= config.SESSION_MAX:
+                    return {"status": "error", "message": f"Too many sessions (max {config.SESSION_MAX})"}
+                if session is not None:
+                    # 같은 세션 ID가 다른 컨트롤러로 옮겨감 - 이전 세션을 종료하여 이전 컨트롤러의 키 해제
+                    _end_session(session, "replaced")
+                session = Session(frame.session, controller, source, now)
+                sessions[frame.session] = session
+                session_stats["started"] += 1
+                logger.log("Session", f"세션 시작: {frame.session} [{controller.controller_id}]")
+            # 다른 세션이 같은 컨트롤러를 쓰고 있었으면 새 세션으로 교체 (이전 세션은 만료/종료될 때 키를 해제하지 않음)
+            controller.session = session
+            # keyframe은 seq를 다시 시작할 수 있음
+            session.last_seq = frame.seq
+        elif session is None:
+            session_stats["resync"] += 1
+            return _RESYNC_RESULT
+        elif frame.seq is not None and session.last_seq is not None and frame.seq <= session.last_seq:
+            # 중복되었거나 늦게 도착한 프레임 (MQTT QoS 1 재전송 등)
+            session.last_seen_ns = now
+            session.skipped += 1
+            session_stats["stale"] += 1
+            return {"status": "ok", "session": frame.session, "stale": True}
+        else:
+            if frame.seq is not None:
+                session.last_seq = frame.seq
+
+        session.last_seen_ns = now
+        session.frame_counts[frame.kind] += 1
+        if frame.keepalive_ms is not None:
+            session.set_keepalive(frame.keepalive_ms)
+
+        applied = 0
+        if frame.kind == codec.FRAME_KEYFRAME:
+            # 전체 상태: 조이스틱이 없으면 중립, 목록에 없는 버튼은 뗀 것으로 처리
+            joystick = frame.joystick if frame.joystick is not None else data_processor._NEUTRAL_JOYSTICK
+            applied += _apply_joystick(session, joystick, source)
+            listed = {button.button for button in frame.buttons}
+            for button in frame.buttons:
+                applied += _apply_button(session, button, source)
+            for name in list(session.pressed_buttons - listed):
+                applied += _apply_button(session, codec.ButtonEvent(name, False), source)
+        elif frame.kind == codec.FRAME_DELTA:
+            if frame.joystick is not None:
+                applied += _apply_joystick(session, frame.joystick, source)
+            for button in frame.buttons:
+                applied += _apply_button(session, button, source)
+
+        return {
+            "status": "ok",
+            "session": frame.session,
+            "seq": session.last_seq,
+            "applied": applied,
+            "timeout_ms": session.timeout_ns // 1_000_000
+        }
+
+
+def expire_sessions(now=None):
+    """
+    keepalive가 끊긴 세션 종료 (입력 감시 루프에서 주기적으로 호출)
+
+    Returns:
+        int: 종료된 세션 수
+    """
+    if not sessions:
+        return 0
+    if now is None:
+        now = timebase.now_ns()
+    expired = 0
+    with _sessions_lock:
+        for session in list(sessions.values()):
+            if now - session.last_seen_ns > session.timeout_ns:
+                _end_session(session, "expired")
+                expired += 1
+    return expired
+
+
+def get_session_stats(now=None):
+    """세션 목록 및 통계 (/status 표시용)"""
+    if now is None:
+        now = timebase.now_ns()
+    with _sessions_lock:
+        active = {
+            session_id: {
+                "controller": session.controller.controller_id,
+                "source": session.source,
+                "age_seconds": round(timebase.elapsed_seconds(session.started_ns, now), 1),
+                "last_seen_ms": round((now - session.last_seen_ns) / 1_000_000, 1),
+                "timeout_ms": session.timeout_ns // 1_000_000,
+                "seq": session.last_seq,
+                "frames": dict(session.frame_counts),
+                "skipped": session.skipped
+            }
+            for session_id, session in sessions.items()
+        }
+    return {"active": len(active), "sessions": active, **session_stats}
@@ -0,0 +1,204 @@
+"""
+입력 시뮬레이션 모듈
+가상 시계와 기록용 키보드 백엔드로 입력 처리(조이스틱/버튼/세션)와 입력 감시 루프를 실제 시간 없이 실행
+
+- timebase.now_ns / timebase.sleep을 가상 시계로 교체하므로 모든 모듈이 가상 시간을 사용한다
+- 입력 이벤트는 예정 시각 순으로 실행하고, 그 사이에는 입력 감시 주기(WATCHDOG_INTERVAL)마다 watchdog_tick()을 호출한다
+- 실제 sleep과 디스플레이가 없으므로 수천 초 분량의 입력을 1초 안에 재생하여 키가 눌린 채 남거나 늦게 해제되는 문제를 확인할 수 있다
+
+입력 스케줄러 스레드는 사용하지 않고 apply_* 함수를 바로 호출한다.
+매크로 재생은 전용 스레드의 실제 대기를 사용하므로 시뮬레이션하지 않는다 (매크로 버튼은 사용하지 말 것).
+
+사용 예:
+    with simulation.Simulation() as sim:
+        sim.every(0.02, sim.joystick, 1.0, 0.0, until=30.0)
+        sim.run_until(40.0)
+        assert not sim.keyboard.held
+"""
+
+import heapq
+import itertools
+
+from . import cadence
+from . import data_processor
+from . import keyboard_handler
+from . import macros
+from . import session
+from . import timebase
+from . import watchdog
+
+
+class VirtualClock:
+    """가상 단조 시계 (나노초 정수, advance()/sleep()으로만 진행)"""
+
+    def __init__(self, start_ns=0):
+        self.now = start_ns
+
+    def now_ns(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += timebase.seconds_to_ns(seconds)
+
+    def advance_to(self, t_ns):
+        if t_ns > self.now:
+            self.now = t_ns
+
+
+class RecordingKeyboard:
+    """
+    기록용 키보드 백엔드 (keyboard_handler.set_backend()로 설치)
+
+    누름/뗌을 가상 시간과 함께 기록하고, 현재 눌린 키와 누른 시각을 추적한다.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.events = []  # [(t_ns, "press"/"release", key)]
+        self.held = {}  # {key: 누른 시각 ns}
+        self.spurious_releases = 0  # 눌리지 않은 키를 뗀 횟수
+
+    def press(self, key):
+        now = self.clock.now
+        self.events.append((now, "press", key))
+        self.held.setdefault(key, now)
+
+    def release(self, key):
+        self.events.append((self.clock.now, "release", key))
+        if self.held.pop(key, None) is None:
+            self.spurious_releases += 1
+
+    def warm_up(self, keys):
+        pass
+
+    def presses(self, key=None):
+        """누른 횟수 (key가 None이면 전체)"""
+        return sum(1 for _, action, k in self.events if action == "press" and (key is None or k == key))
+
+    def stuck_keys(self, limit_seconds):
+        """limit_seconds보다 오래 눌린 키 {key: 눌린 시간(초)}"""
+        now = self.clock.now
+        return {
+            key: timebase.elapsed_seconds(since, now)
+            for key, since in self.held.items()
+            if now - since > timebase.seconds_to_ns(limit_seconds)
+        }
+
+
+class Simulation:
+    """
+    가상 시간 입력 시뮬레이션 (with 문 안에서만 시계/키보드 백엔드가 교체됨)
+
+    Args:
+        tick: 입력 감시 주기 (초, 기본 watchdog.WATCHDOG_INTERVAL)
+        start: 가상 시계 시작 시각 (초)
+    """
+
+    def __init__(self, tick=None, start=1000.0):
+        self.clock = VirtualClock(timebase.seconds_to_ns(start))
+        self.keyboard = RecordingKeyboard(self.clock)
+        self.tick_ns = timebase.seconds_to_ns(tick or watchdog.WATCHDOG_INTERVAL)
+        self.start_ns = self.clock.now
+        self.ticks = 0
+        self._events = []  # [(t_ns, tie, fn, args)]
+        self._tie = itertools.count()
+        self._next_tick_ns = self.clock.now + self.tick_ns
+        self._saved = None
+
+    def __enter__(self):
+        self._saved = (timebase.now_ns, timebase.sleep, keyboard_handler.keyboard)
+        timebase.now_ns = self.clock.now_ns
+        timebase.sleep = self.clock.sleep
+        keyboard_handler.set_backend(self.keyboard)
+        self.reset()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        now_ns, sleep, keyboard = self._saved
+        timebase.now_ns = now_ns
+        timebase.sleep = sleep
+        keyboard_handler.set_backend(keyboard)
+        return False
+
+    def reset(self):
+        """입력 상태 초기화 (키 해제, 세션/추가 컨트롤러 제거, 기본 컨트롤러 시간/간격 모델 초기화)"""
+        macros.player.cancel()
+        with session._sessions_lock:
+            session.sessions.clear()
+        data_processor.reset_all_states_internal()
+        for controller_id in list(data_processor.controllers):
+            if controller_id != data_processor.default_controller.controller_id:
+                del data_processor.controllers[controller_id]
+        controller = data_processor.default_controller
+        controller.last_joystick_ns = None
+        controller.last_button_ns = None
+        controller.last_reapply_ns = None
+        controller.session = None
+        controller.cadence = cadence.ArrivalModel()
+        # 이전 시뮬레이션에서 남은 키를 뗀 기록은 제외
+        self.keyboard.events.clear()
+        self.keyboard.held.clear()
+        self.keyboard.spurious_releases = 0
+
+    @property
+    def elapsed(self):
+        """시뮬레이션 시작 후 가상 경과 시간 (초)"""
+        return timebase.elapsed_seconds(self.start_ns, self.clock.now)
+
+    def at(self, seconds, fn, *args):
+        """시작 후 seconds초에 fn(*args) 실행 예약"""
+        t_ns = self.start_ns + timebase.seconds_to_ns(seconds)
+        heapq.heappush(self._events, (t_ns, next(self._tie), fn, args))
+
+    def every(self, interval, fn, *args, until, start=0.0):
+        """start초부터 until초까지 interval초마다 fn(*args) 실행 예약"""
+        interval_ns = timebase.seconds_to_ns(interval)
+        t_ns = self.start_ns + timebase.seconds_to_ns(start)
+        end_ns = self.start_ns + timebase.seconds_to_ns(until)
+        while t_ns <= end_ns:
+            heapq.heappush(self._events, (t_ns, next(self._tie), fn, args))
+            t_ns += interval_ns
+
+    def run_until(self, seconds):
+        """
+        시작 후 seconds초까지 진행 (예약된 입력을 시각 순으로 실행, 그 사이 입력 감시 주기마다 watchdog_tick)
+
+        같은 시각이면 입력을 먼저 실행한다.
+        """
+        end_ns = self.start_ns + timebase.seconds_to_ns(seconds)
+        while True:
+            next_event_ns = self._events[0][0] if self._events else None
+            if next_event_ns is not None and next_event_ns <= self._next_tick_ns and next_event_ns <= end_ns:
+                t_ns, _, fn, args = heapq.heappop(self._events)
+                self.clock.advance_to(t_ns)
+                fn(*args)
+            elif self._next_tick_ns <= end_ns:
+                self.clock.advance_to(self._next_tick_ns)
+                watchdog.watchdog_tick(self.clock.now)
+                self.ticks += 1
+                self._next_tick_ns += self.tick_ns
+            else:
+                break
+        self.clock.advance_to(end_ns)
+
+    def run_for(self, seconds):
+        """현재 시각부터 seconds초 더 진행"""
+        self.run_until(self.elapsed + seconds)
+
+    # 입력 (HTTP/MQTT 요청과 같은 처리 함수를 바로 호출)
+
+    def controller(self, controller_id=None):
+        if controller_id is None:
+            return data_processor.default_controller
+        return data_processor.get_controller(controller_id)
+
+    def joystick(self, x, y, controller_id=None):
+        return data_processor.apply_joystick_data(x, y, 0, False, "Sim", self.controller(controller_id))
+
+    def button(self, button, pressed, controller_id=None):
+        return data_processor.apply_button_data(button, pressed, "Sim", self.controller(controller_id))
+
+    def frame(self, frame, controller_id=None):
+        """세션 프레임 (codec.SessionFrame)"""
+        controller = self.controller(controller_id) if controller_id is not None else None
+        return session.handle_frame(frame, "Sim", controller)
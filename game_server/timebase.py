@@ -0,0 +1,50 @@
+"""
+시간 기준 모듈
+내부 시간은 모두 time.monotonic_ns() 정수로 다루고, 벽시계(datetime) 변환은 응답을 만들 때만 수행
+"""
+
+import time
+from datetime import datetime
+
+NS_PER_SECOND = 1_000_000_000
+
+# 단조 시계 → 벽시계 변환 기준점 (프로세스 시작 시 한 번만 계산)
+_MONO_ORIGIN_NS = time.monotonic_ns()
+_WALL_ORIGIN_NS = time.time_ns()
+
+# 현재 단조 시간 (나노초)
+now_ns = time.monotonic_ns
+
+# 대기 (초) - 입력 처리 경로의 짧은 대기는 이 함수를 사용 (시뮬레이션에서 가상 시계로 교체)
+sleep = time.sleep
+
+
+def seconds_to_ns(seconds):
+    """초 → 나노초 정수"""
+    return int(seconds * NS_PER_SECOND)
+
+
+def elapsed_seconds(since_ns, now=None):
+    """since_ns 이후 경과 시간 (초, since_ns가 None이면 None)"""
+    if since_ns is None:
+        return None
+    if now is None:
+        now = now_ns()
+    return (now - since_ns) / NS_PER_SECOND
+
+
+def to_datetime(mono_ns):
+    """단조 시간 → 벽시계 datetime"""
+    return datetime.fromtimestamp((_WALL_ORIGIN_NS + (mono_ns - _MONO_ORIGIN_NS)) / NS_PER_SECOND)
+
+
+def isoformat(mono_ns):
+    """단조 시간 → ISO 8601 문자열 (None이면 None)"""
+    if mono_ns is None:
+        return None
+    return to_datetime(mono_ns).isoformat()
+
+
+def clock_text(mono_ns):
+    """단조 시간 → 'HH:MM:SS' 문자열 (로그 출력용)"""
+    return to_datetime(mono_ns).strftime('%H:%M:%S')
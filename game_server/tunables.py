@@ -0,0 +1,277 @@
+"""
+실행 중 변경 가능한 설정 모듈
+튜닝 값 파일(JSON)을 감시하여 서버를 다시 시작하지 않고 임계값/타임아웃/상세 로그 설정을 바꿈
+
+- 파일을 검증한 뒤 변경할 수 없는 스냅샷(Tunables)으로 만들어 `current`를 한 번에 교체한다
+  (교체는 변수 대입 하나이므로 읽는 쪽은 잠금 없이 항상 완전한 이전 값 또는 새 값을 봄)
+- 입력 처리 경로는 이벤트마다 `settings = tunables.current`로 한 번만 읽고 지역 변수로 사용한다
+- 감시는 Linux inotify(디렉터리 감시 - 편집기가 파일을 새로 만들어 바꿔도 감지), 사용할 수 없으면 주기적 stat 비교
+- 잘못된 파일은 에러를 기록하고 이전 스냅샷을 유지, 파일에 없는 값은 config.py 기본값 사용
+
+파일 형식 (config.py 이름 그대로):
+    {"JOYSTICK_THRESHOLD_ON": 0.35, "JOYSTICK_THRESHOLD_OFF": 0.3, "INACTIVITY_RELEASE_TIMEOUT": 0.5,
+     "ENABLE_VERBOSE_LOGGING": false, "USER_CLEANUP_TIMEOUT": 3600}
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import threading
+from collections import namedtuple
+
+from . import config
+from . import logger
+from . import timebase
+
+# 설정 스냅샷 (namedtuple이므로 만든 뒤에는 바뀌지 않음)
+Tunables = namedtuple("Tunables", (
+    "joystick_threshold_on",
+    "joystick_threshold_off",
+    "inactivity_release_timeout",
+    "inactivity_release_ns",
+    "verbose",
+    "user_cleanup_timeout",
+))
+
+# 파일 키 → config.py 기본값 이름 (검증 후 config 모듈 속성에도 반영하여 다른 모듈과 값을 맞춤)
+TUNABLE_NAMES = (
+    "JOYSTICK_THRESHOLD_ON",
+    "JOYSTICK_THRESHOLD_OFF",
+    "INACTIVITY_RELEASE_TIMEOUT",
+    "ENABLE_VERBOSE_LOGGING",
+    "USER_CLEANUP_TIMEOUT",
+)
+
+# 서버 시작 시의 config.py 값 (파일에서 지운 값은 이 값으로 돌아감)
+_defaults = {name: getattr(config, name) for name in TUNABLE_NAMES}
+
+
+def _number(values, name, low, high):
+    value = values[name]
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{name} must be a number")
+    if not low < value <= high:
+        raise ValueError(f"{name} must be in ({low}, {high}]")
+    return float(value)
+
+
+def compile_tunables(overrides=None):
+    """
+    설정 값 검증 및 스냅샷 생성
+
+    Args:
+        overrides: {config 이름: 값} - 없는 값은 서버 시작 시의 config.py 값
+
+    Returns:
+        Tunables
+
+    Raises:
+        ValueError: 알 수 없는 이름이거나 값이 범위를 벗어난 경우
+    """
+    overrides = overrides or {}
+    unknown = set(overrides) - set(TUNABLE_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown tunables: {sorted(unknown)}. Available: {list(TUNABLE_NAMES)}")
+    values = dict(_defaults, **overrides)
+
+    threshold_on = _number(values, "JOYSTICK_THRESHOLD_ON", 0.0, 1.0)
+    threshold_off = _number(values, "JOYSTICK_THRESHOLD_OFF", 0.0, 1.0)
+    if threshold_off > threshold_on:
+        raise ValueError("JOYSTICK_THRESHOLD_OFF must not be greater than JOYSTICK_THRESHOLD_ON")
+    release_timeout = _number(values, "INACTIVITY_RELEASE_TIMEOUT", 0.0, config.ADAPTIVE_RELEASE_MAX)
+    cleanup_timeout = _number(values, "USER_CLEANUP_TIMEOUT", 0.0, float("inf"))
+    verbose = values["ENABLE_VERBOSE_LOGGING"]
+    if not isinstance(verbose, bool):
+        raise ValueError("ENABLE_VERBOSE_LOGGING must be true or false")
+
+    return Tunables(
+        threshold_on,
+        threshold_off,
+        release_timeout,
+        timebase.seconds_to_ns(release_timeout),
+        verbose,
+        cleanup_timeout,
+    )
+
+
+# 현재 설정 스냅샷 (교체만 하고 수정하지 않음)
+current = compile_tunables()
+
+# 불러오기 통계
+tunables_stats = {
+    "path": None,
+    "watch": None,  # "inotify" 또는 "poll"
+    "reloads": 0,
+    "errors": 0,
+    "last_error": None,
+    "loaded_ns": None,
+}
+
+
+def apply(snapshot):
+    """스냅샷 교체 (config 모듈 속성도 같은 값으로 갱신 - 입력 처리 경로 밖의 코드용)"""
+    global current
+    config.JOYSTICK_THRESHOLD_ON = snapshot.joystick_threshold_on
+    config.JOYSTICK_THRESHOLD_OFF = snapshot.joystick_threshold_off
+    config.INACTIVITY_RELEASE_TIMEOUT = snapshot.inactivity_release_timeout
+    config.ENABLE_VERBOSE_LOGGING = snapshot.verbose
+    config.USER_CLEANUP_TIMEOUT = snapshot.user_cleanup_timeout
+    current = snapshot
+
+
+def load_file(path):
+    """
+    튜닝 값 파일을 읽어 스냅샷 교체
+
+    Returns:
+        bool: 교체 여부 (파일이 없거나 잘못되었으면 이전 스냅샷 유지)
+    """
+    try:
+        with open(path, "rb") as f:
+            overrides = json.loads(f.read().decode("utf-8") or "{}")
+        if not isinstance(overrides, dict):
+            raise ValueError("Tunables file must contain a JSON object")
+        snapshot = compile_tunables(overrides)
+    except (OSError, ValueError, UnicodeDecodeError) as e:
+        tunables_stats["errors"] += 1
+        tunables_stats["last_error"] = str(e)
+        logger.error("Tunables", f"⚠️ 튜닝 값을 불러오지 못했습니다 - 이전 값 유지 ({path}): {e}")
+        return False
+
+    previous = current
+    apply(snapshot)
+    tunables_stats["reloads"] += 1
+    tunables_stats["last_error"] = None
+    tunables_stats["loaded_ns"] = timebase.now_ns()
+    changed = [field for field in Tunables._fields if getattr(previous, field) != getattr(snapshot, field)]
+    if changed:
+        logger.log("Tunables", "튜닝 값 변경: " + ", ".join(f"{field}={getattr(snapshot, field)}" for field in changed))
+    return True
+
+
+# inotify (linux/inotify.h)
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_NONBLOCK = getattr(os, "O_NONBLOCK", 0)
+_IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0)
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def _inotify_watch(directory):
+    """디렉터리 inotify 감시 시작 → 파일 디스크립터 (사용할 수 없으면 None)"""
+    if not _IN_CLOEXEC:
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_MODIFY
+    if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _read_names(fd):
+    """inotify 이벤트에서 파일 이름 목록 읽기"""
+    try:
+        data = os.read(fd, 4096)
+    except BlockingIOError:
+        return []
+    names = []
+    offset = 0
+    while offset + _EVENT_HEADER.size <= len(data):
+        _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+        offset += _EVENT_HEADER.size
+        names.append(data[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace"))
+        offset += length
+    return names
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class TunablesWatcher:
+    """튜닝 값 파일 감시 스레드 (inotify, 사용할 수 없으면 주기적 stat 비교)"""
+
+    def __init__(self, path, poll_interval=None):
+        self.path = os.path.abspath(path)
+        self.poll_interval = poll_interval or config.TUNABLES_POLL_INTERVAL
+        self._stop = threading.Event()
+        self._thread = None
+        self._fd = None
+
+    def start(self):
+        load_file(self.path)
+        self._fd = _inotify_watch(os.path.dirname(self.path))
+        tunables_stats["path"] = self.path
+        tunables_stats["watch"] = "inotify" if self._fd is not None else "poll"
+        target = self._watch_inotify if self._fd is not None else self._watch_poll
+        self._thread = threading.Thread(target=target, name="tunables-watcher", daemon=True)
+        self._thread.start()
+        logger.log("Tunables", f"튜닝 값 파일 감시 ({tunables_stats['watch']}): {self.path}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _watch_inotify(self):
+        name = os.path.basename(self.path)
+        while not self._stop.is_set():
+            readable, _, _ = select.select([self._fd], [], [], 0.5)
+            if not readable or name not in _read_names(self._fd):
+                continue
+            # 편집기가 여러 번 나눠 쓰는 경우를 모아서 한 번만 읽음
+            self._stop.wait(config.TUNABLES_SETTLE)
+            while select.select([self._fd], [], [], 0)[0]:
+                _read_names(self._fd)
+            if _file_signature(self.path) is not None:
+                load_file(self.path)
+
+    def _watch_poll(self):
+        signature = _file_signature(self.path)
+        while not self._stop.wait(self.poll_interval):
+            new_signature = _file_signature(self.path)
+            if new_signature != signature:
+                signature = new_signature
+                if new_signature is not None:
+                    load_file(self.path)
+
+
+watcher = None
+
+
+def start_watching(path=None):
+    """튜닝 값 파일 감시 시작 (경로가 없으면 config.TUNABLES_FILE, 둘 다 없으면 사용 안 함)"""
+    global watcher
+    path = path or config.TUNABLES_FILE
+    if not path or watcher is not None:
+        return None
+    watcher = TunablesWatcher(path)
+    watcher.start()
+    return watcher
+
+
+def get_tunables_stats():
+    """현재 값 및 불러오기 통계 (/status 표시용)"""
+    stats = dict(tunables_stats)
+    stats["loaded"] = timebase.isoformat(stats.pop("loaded_ns"))
+    stats["values"] = current._asdict()
+    return stats
@@ -0,0 +1,91 @@
+"""
+접속자 추적 모듈
+최근 활동 순서로 정렬된 접속자 인덱스 (만료/최대 개수 제한 지원)
+"""
+
+import threading
+from collections import OrderedDict
+
+from . import timebase
+
+
+class ConnectedUsers:
+    """
+    최근 활동 순서를 유지하는 접속자 저장소
+
+    - 활동 기록(touch): O(1) - 항목을 맨 뒤(최신)로 이동
+    - 만료(expire): 맨 앞(가장 오래된)에서 오래된 항목만 꺼냄
+    - 최대 개수(max_entries)를 넘으면 가장 오래된 항목부터 제거 (IP 위조 폭주 대비)
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # {ip: {"first_seen": ns, "last_seen": ns, "request_count": int}}
+        self._lock = threading.Lock()
+        self.evicted_count = 0  # 최대 개수 초과로 제거된 접속자 수
+
+    def touch(self, ip, now=None):
+        """접속자 활동 기록 (없으면 추가, 있으면 최신으로 이동)"""
+        with self._lock:
+            # Lock 안에서 시간을 구해야 순서(오래된 → 최신)가 시간 순서와 일치함
+            if now is None:
+                now = timebase.now_ns()
+            info = self._entries.get(ip)
+            if info is None:
+                info = {
+                    "first_seen": now,
+                    "last_seen": now,
+                    "request_count": 0
+                }
+                self._entries[ip] = info
+                # 최대 개수 초과 시 가장 오래된 접속자 제거
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evicted_count += 1
+            else:
+                self._entries.move_to_end(ip)
+
+            info["last_seen"] = now
+            info["request_count"] += 1
+
+    def expire(self, timeout_seconds, now=None):
+        """
+        timeout_seconds 이상 활동이 없는 접속자 제거
+
+        Returns:
+            int: 제거된 접속자 수
+        """
+        if now is None:
+            now = timebase.now_ns()
+        timeout_ns = timebase.seconds_to_ns(timeout_seconds)
+
+        removed = 0
+        with self._lock:
+            # 앞쪽이 가장 오래된 항목이므로 만료되지 않은 항목을 만나면 중단
+            while self._entries:
+                ip, info = next(iter(self._entries.items()))
+                if now - info["last_seen"] <= timeout_ns:
+                    break
+                self._entries.popitem(last=False)
+                removed += 1
+        return removed
+
+    def snapshot(self):
+        """
+        최근 활동 순(최신 먼저)의 접속자 목록 반환
+
+        Returns:
+            list: [(ip, info_copy), ...]
+        """
+        with self._lock:
+            return [(ip, dict(info)) for ip, info in reversed(self._entries.items())]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, ip):
+        return ip in self._entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -5,6 +5,13 @@
 
 import os
 import socket
+import struct
+import sys
+import threading
+import time
+
+from . import config
+from . import logger
 
 
 def resolve_server_port(cli_port=None, default_port=8443):
@@ -76,3 +83,136 @@ def get_all_local_ips(use_cache=True, cache_var=None):
     
     return result
 
+
+
+# 네트워크 인터페이스 주소 스냅샷 (백그라운드 스레드가 갱신, 요청 처리에서는 읽기만 함)
+_server_ips_snapshot = None
+_ip_monitor_thread = None
+_ip_monitor_lock = threading.Lock()
+
+
+def _read_default_route_subnets():
+    """
+    /proc/net/route에서 기본 경로 인터페이스의 서브넷 목록 읽기
+
+    Returns:
+        list: [(network: int, mask: int), ...] (네트워크 바이트 순서를 정수로 변환한 값)
+    """
+    with open("/proc/net/route") as f:
+        rows = [line.split() for line in f.readlines()[1:]]
+
+    default_ifaces = {row[0] for row in rows if len(row) > 7 and row[1] == "00000000"}
+    subnets = []
+    for row in rows:
+        if len(row) > 7 and row[0] in default_ifaces and row[1] != "00000000":
+            network = struct.unpack("<I", bytes.fromhex(row[1]))[0]
+            mask = struct.unpack("<I", bytes.fromhex(row[7]))[0]
+            subnets.append((network, mask))
+    return subnets
+
+
+def read_interface_ips():
+    """
+    로컬 인터페이스 IPv4 주소 읽기 (Linux /proc/net 사용 - DNS 조회나 외부 연결 없음)
+
+    기본 경로(default route)가 있는 인터페이스의 주소를 맨 앞에 둔다.
+
+    Returns:
+        list: IP 주소 문자열 목록 (127.x.x.x 제외)
+    """
+    ips = []
+    with open("/proc/net/fib_trie") as f:
+        previous = None
+        for line in f:
+            stripped = line.strip()
+            if stripped.startswith("|--"):
+                previous = stripped[3:].strip()
+            elif stripped == "/32 host LOCAL" and previous:
+                if not previous.startswith("127.") and previous not in ips:
+                    ips.append(previous)
+                previous = None
+
+    try:
+        subnets = _read_default_route_subnets()
+    except OSError:
+        subnets = []
+
+    def is_primary(ip):
+        value = struct.unpack("<I", socket.inet_aton(ip))[0]
+        return any(value & mask == network for network, mask in subnets)
+
+    # 기본 경로 인터페이스 주소를 앞쪽으로 (안정 정렬)
+    ips.sort(key=lambda ip: not is_primary(ip))
+    return ips
+
+
+def _discover_server_ips():
+    """현재 플랫폼에서 사용할 수 있는 방법으로 서버 IP 목록 조회"""
+    if sys.platform.startswith("linux"):
+        try:
+            ips = read_interface_ips()
+            return ips if ips else ["127.0.0.1"]
+        except OSError:
+            pass
+    # /proc/net이 없는 플랫폼: 기존 방식 (DNS 조회가 포함되므로 백그라운드 스레드에서만 호출)
+    return get_all_local_ips(use_cache=False)
+
+
+def refresh_server_ips():
+    """
+    서버 IP 스냅샷 갱신
+
+    Returns:
+        bool: 주소 목록이 바뀌었는지 여부
+    """
+    global _server_ips_snapshot
+    ips = _discover_server_ips()
+    if ips == _server_ips_snapshot:
+        return False
+    previous = _server_ips_snapshot
+    _server_ips_snapshot = ips
+    if previous is not None:
+        logger.log("Network", f"서버 IP 주소 변경: {', '.join(previous)} → {', '.join(ips)}")
+    return True
+
+
+def _ip_monitor_loop():
+    """주기적으로 인터페이스 주소를 다시 읽어 스냅샷 갱신"""
+    interval = config.NETWORK_REFRESH_INTERVAL if sys.platform.startswith("linux") else config.NETWORK_FALLBACK_REFRESH_INTERVAL
+    while True:
+        try:
+            refresh_server_ips()
+        except Exception as e:
+            logger.error("Network", f"⚠️ IP 주소 갱신 에러: {e}")
+        time.sleep(interval)
+
+
+def start_ip_monitor():
+    """백그라운드 IP 감시 스레드 시작 (한 번만)"""
+    global _ip_monitor_thread
+    with _ip_monitor_lock:
+        if _ip_monitor_thread is not None:
+            return
+        _ip_monitor_thread = threading.Thread(target=_ip_monitor_loop, name="ip-monitor", daemon=True)
+        _ip_monitor_thread.start()
+
+
+def get_server_ips():
+    """
+    최신 서버 IP 스냅샷 반환 (요청 처리용 - 블로킹 조회 없음)
+
+    감시 스레드가 아직 첫 결과를 만들지 않았다면 Linux에서는 /proc/net을 바로 읽고,
+    그 외 플랫폼에서는 갱신될 때까지 ["127.0.0.1"]을 반환한다.
+    """
+    snapshot = _server_ips_snapshot
+    if snapshot is not None:
+        return snapshot
+
+    start_ip_monitor()
+    if sys.platform.startswith("linux"):
+        try:
+            refresh_server_ips()
+            return _server_ips_snapshot
+        except OSError:
+            pass
+    return ["127.0.0.1"]
@@ -0,0 +1,148 @@
+"""
+입력 감시 모듈
+컨트롤러마다 입력 타임아웃을 확인하여 조이스틱 키를 유지/해제하고, 오래 눌린 버튼과 끊긴 세션을 정리
+"""
+
+import time
+
+from . import config
+from . import data_processor
+from . import keyboard_handler
+from . import logger
+from . import macros
+from . import realtime
+from . import session
+from . import timebase
+from . import tunables
+from .keys import Macro
+
+# 감시 주기 (초)
+WATCHDOG_INTERVAL = 0.05
+
+# 타임아웃을 나노초 정수로 미리 변환 (매 주기마다 변환하지 않음)
+_INTERVAL_NS = timebase.seconds_to_ns(WATCHDOG_INTERVAL)
+_HARD_RELEASE_NS = timebase.seconds_to_ns(config.ADAPTIVE_RELEASE_MAX)
+
+
+def watch_controller(controller, now, release_timeout_ns, button_timeout_ns, hard_release_ns):
+    """
+    컨트롤러 하나의 입력 타임아웃 확인 (조이스틱 유지/해제, 오래 눌린 버튼 해제)
+    
+    조이스틱이 눌린 상태에서 샘플이 끊기면 유지 기한이 지난 뒤 마지막 키 입력을 다시 적용하고,
+    해제 기한이 지나면 연결이 끊긴 것으로 보고 키를 해제한다.
+    두 기한은 컨트롤러의 샘플 간격 모델(cadence)에서 정하며, 학습 전에는 고정 값을 사용한다.
+    세션을 사용하는 컨트롤러는 keepalive로 연결 상태를 알 수 있으므로 추정하지 않는다 (session.expire_sessions).
+    """
+    if controller.session is not None:
+        return
+    should_release = False
+    joystick_state = controller.joystick
+
+    if controller.last_joystick_ns is not None:
+        elapsed_js = now - controller.last_joystick_ns
+        
+        if joystick_state.mask:
+            if config.ADAPTIVE_RELEASE_ENABLED:
+                hold_ns = controller.cadence.hold_deadline_ns()
+                hard_ns = controller.cadence.release_deadline_ns()
+            else:
+                hold_ns = release_timeout_ns
+                hard_ns = hard_release_ns
+            if elapsed_js > hard_ns:
+                # 추정 종료 - 다음 샘플이 올 때까지 중립 상태로 간주 (키를 다시 누르지 않음)
+                should_release = True
+                joystick_state.mask = 0
+                joystick_state.keys = frozenset()
+                if config.ENABLE_VERBOSE_LOGGING:
+                    logger.verbose("Watchdog", f"[{controller.controller_id}] 조이스틱 입력 끊김 - 키 해제 "
+                                               f"({elapsed_js / 1_000_000:.0f} ms)")
+            elif elapsed_js > hold_ns and (
+                controller.last_reapply_ns is None
+                or controller.last_reapply_ns < controller.last_joystick_ns
+                or now - controller.last_reapply_ns > hold_ns
+            ):
+                # 유지 기한마다 한 번씩만 다시 적용 (감시 주기마다 키를 뗐다 누르지 않음)
+                controller.last_reapply_ns = now
+                target_keys = joystick_state.keys
+                if target_keys:
+                    keyboard_handler.process_joystick_keys(target_keys, controller.joystick_key_set)
+                    if config.ENABLE_VERBOSE_LOGGING:
+                        logger.verbose("Watchdog", f"[{controller.controller_id}] 조이스틱 이전 입력 지속: {target_keys}")
+        else:
+            if elapsed_js > release_timeout_ns:
+                should_release = True
+
+    if controller.last_button_ns is not None:
+        elapsed_btn = now - controller.last_button_ns
+        if any(btn_state.pressed for btn_state in controller.buttons.values()):
+            if elapsed_btn > button_timeout_ns:
+                with keyboard_handler.keyboard_lock:
+                    for button_name, btn_state in controller.buttons.items():
+                        if not btn_state.pressed:
+                            continue
+                        if isinstance(btn_state.key, Macro):
+                            # 매크로 버튼은 반복 매크로만 취소 (누른 키는 재생 스레드가 해제)
+                            macros.player.cancel(owner=(controller.controller_id, button_name), repeating_only=True)
+                            controller.pressed_buttons.discard(button_name)
+                        else:
+                            try:
+                                keyboard_handler.keyboard.release(btn_state.key)
+                                keyboard_handler.pressed_keyboard_keys.discard(btn_state.key)
+                                controller.pressed_buttons.discard(button_name)
+                            except Exception as e:
+                                if config.ENABLE_VERBOSE_LOGGING:
+                                    logger.error("Key", f"Error releasing button key {button_name}: {e}")
+                        btn_state.pressed = False
+        else:
+            if elapsed_btn > release_timeout_ns:
+                should_release = True
+
+    if should_release and keyboard_handler.pressed_keyboard_keys:
+        with keyboard_handler.keyboard_lock:
+            button_keys = {btn_state.key for btn_state in controller.buttons.values() if btn_state.pressed}
+            keys_to_release = list((keyboard_handler.pressed_keyboard_keys & controller.joystick_key_set) - button_keys)
+            for key in keys_to_release:
+                try:
+                    keyboard_handler.keyboard.release(key)
+                    keyboard_handler.pressed_keyboard_keys.discard(key)
+                    # 조이스틱 추적에서도 제거 (다음 샘플이 이미 뗀 키를 다시 떼지 않도록)
+                    keyboard_handler.pressed_joystick_keys.discard(key)
+                except Exception as e:
+                    if config.ENABLE_VERBOSE_LOGGING:
+                        logger.error("Key", f"Error releasing key {key}: {e}")
+
+
+def watchdog_tick(now=None):
+    """
+    입력 감시 한 주기 (세션 만료 + 컨트롤러별 타임아웃 확인)
+
+    입력 감시 스레드가 주기마다 호출하며, 시뮬레이션(simulation.py)은 가상 시간으로 직접 호출한다.
+    """
+    if now is None:
+        now = timebase.now_ns()
+    # 입력 정지 타임아웃은 튜닝 값 파일로 바뀔 수 있으므로 주기마다 스냅샷에서 읽음
+    release_timeout_ns = tunables.current.inactivity_release_ns
+    button_timeout_ns = release_timeout_ns * 3
+    session.expire_sessions(now)
+    for controller in list(data_processor.controllers.values()):
+        watch_controller(controller, now, release_timeout_ns, button_timeout_ns, _HARD_RELEASE_NS)
+
+
+def input_watchdog_loop():
+    """입력 타임아웃 감시 루프 (컨트롤러마다 따로 확인)"""
+    jitter = realtime.jitter["watchdog"]
+
+    # 입력 처리용 코어 고정 및 우선순위 상향 (설정된 경우)
+    realtime.apply_critical("watchdog")
+
+    while True:
+        try:
+            watchdog_tick()
+        except Exception as e:
+            if config.ENABLE_VERBOSE_LOGGING:
+                logger.error("Watchdog", f"Error in input watchdog loop: {e}")
+
+        # 예정보다 늦게 깬 시간을 스케줄링 지연으로 기록
+        sleep_start = timebase.now_ns()
+        time.sleep(WATCHDOG_INTERVAL)
+        jitter.record(timebase.now_ns() - sleep_start - _INTERVAL_NS)
@@ -1,75 +1,20 @@
 
 import argparse
 import threading
-import time
-from datetime import datetime
 
 from game_server import app
 from game_server import config
 from game_server import data_processor
+from game_server import emitter_process
+from game_server import history
+from game_server import http_server
 from game_server import keyboard_handler
+from game_server import logger
+from game_server import mqtt_client
+from game_server import realtime
+from game_server import tunables
 from game_server import utils
-
-
-def input_watchdog_loop():
-    """입력 타임아웃 감시 루프"""
-    while True:
-        try:
-            now = datetime.now()
-            should_release = False
-
-            if data_processor.stats["last_joystick_time"] is not None:
-                elapsed_js = (now - data_processor.stats["last_joystick_time"]).total_seconds()
-                
-                if data_processor.last_joystick_state.get("is_active", False):
-                    if elapsed_js > config.INACTIVITY_RELEASE_TIMEOUT:
-                        target_keys = data_processor.last_joystick_state.get("active_keys", set())
-                        if target_keys:
-                            keyboard_handler.process_joystick_keys(target_keys)
-                            if config.ENABLE_VERBOSE_LOGGING:
-                                print(f"[Watchdog] 조이스틱 이전 입력 지속: {target_keys}")
-                    if elapsed_js > 10.0:
-                        should_release = True
-                else:
-                    if elapsed_js > config.INACTIVITY_RELEASE_TIMEOUT:
-                        should_release = True
-
-            if data_processor.stats["last_button_time"] is not None:
-                elapsed_btn = (now - data_processor.stats["last_button_time"]).total_seconds()
-                if data_processor.last_button_states:
-                    if elapsed_btn > config.INACTIVITY_RELEASE_TIMEOUT * 3:
-                        with keyboard_handler.keyboard_lock:
-                            for button_name, btn_state in list(data_processor.last_button_states.items()):
-                                if btn_state["pressed"]:
-                                    try:
-                                        keyboard_handler.keyboard.release(btn_state["key"])
-                                        keyboard_handler.pressed_keyboard_keys.discard(btn_state["key"])
-                                        keyboard_handler.pressed_keys.discard(button_name)
-                                    except Exception as e:
-                                        if config.ENABLE_VERBOSE_LOGGING:
-                                            print(f"Error releasing button key {button_name}: {e}")
-                                    del data_processor.last_button_states[button_name]
-                else:
-                    if elapsed_btn > config.INACTIVITY_RELEASE_TIMEOUT:
-                        should_release = True
-
-            if should_release and keyboard_handler.pressed_keyboard_keys:
-                with keyboard_handler.keyboard_lock:
-                    button_keys = {btn_state["key"] for btn_state in data_processor.last_button_states.values() if btn_state["pressed"]}
-                    keys_to_release = list((keyboard_handler.pressed_keyboard_keys & config.JOYSTICK_KEY_SET) - button_keys)
-                    for key in keys_to_release:
-                        try:
-                            keyboard_handler.keyboard.release(key)
-                            keyboard_handler.pressed_keyboard_keys.discard(key)
-                        except Exception as e:
-                            if config.ENABLE_VERBOSE_LOGGING:
-                                print(f"Error releasing key {key}: {e}")
-
-        except Exception as e:
-            if config.ENABLE_VERBOSE_LOGGING:
-                print(f"Error in input watchdog loop: {e}")
-
-        time.sleep(0.05)
+from game_server import watchdog
 
 
 if __name__ == '__main__':
@@ -79,13 +24,34 @@ if __name__ == '__main__':
         type=int,
         help=f"서버가 사용할 포트 번호 (기본 {config.DEFAULT_SERVER_PORT}, 환경 변수로도 설정 가능)"
     )
+    parser.add_argument(
+        "--server",
+        choices=http_server.SERVER_MODES,
+        default=config.HTTP_SERVER_MODE,
+        help="HTTP 서버 모드: pooled (스레드 풀 + keep-alive, 기본), async (asyncio 이벤트 루프) 또는 dev (Flask 개발 서버)"
+    )
+    parser.add_argument(
+        "--emitter",
+        choices=("thread", "process"),
+        default=config.KEY_EMITTER_MODE,
+        help="키 입력 출력 방식: thread (웹 서버 프로세스에서 출력, 기본) 또는 process (별도 프로세스, 공유 메모리 링 버퍼)"
+    )
+    parser.add_argument(
+        "--tunables",
+        default=config.TUNABLES_FILE or None,
+        help="실행 중 변경 가능한 설정 파일(JSON) 경로 - 파일을 고치면 서버를 다시 시작하지 않고 반영 (GAME_SERVER_TUNABLES 환경 변수로도 설정 가능)"
+    )
     args = parser.parse_args()
 
+    # 이후 생성되는 웹/MQTT 스레드를 입력 처리용 코어 밖으로 고정 (CRITICAL_CPUS 설정 시)
+    realtime.configure_process()
+
     server_port = utils.resolve_server_port(args.port, config.DEFAULT_SERVER_PORT)
     app.app.config["SERVER_PORT"] = server_port
 
-    cached_server_ips = [None]
-    local_ips = utils.get_all_local_ips(use_cache=True, cache_var=cached_server_ips)
+    # 네트워크 인터페이스 감시 시작 (DNS 조회 없이 로컬 인터페이스 정보 사용, 주기적으로 갱신)
+    utils.start_ip_monitor()
+    local_ips = utils.get_server_ips()
     main_ip = local_ips[0] if local_ips else "127.0.0.1"
 
     print("=" * 60)
@@ -141,13 +107,41 @@ if __name__ == '__main__':
     print("⚠️  주의: 게임 창이 포커스되어 있어야 키 입력이 전달됩니다")
     print("=" * 60)
 
-    watchdog_thread = threading.Thread(target=input_watchdog_loop, daemon=True)
+    # 키보드 백엔드 및 입력 처리 경로 미리 초기화 (첫 입력 지연 제거)
+    if args.emitter == "process":
+        # 키 출력은 별도 프로세스에서 수행 (키보드 백엔드는 출력 프로세스에서 초기화)
+        emitter_process.start_emitter()
+    if not keyboard_handler.warm_up():
+        print("⚠️  키보드 백엔드를 초기화하지 못했습니다 (디스플레이 없음?) - 대시보드/상태 API만 동작합니다")
+    data_processor.warm_up()
+
+    # 튜닝 값 파일 감시 시작 (지정한 경우 - 첫 값은 여기서 바로 불러옴)
+    tunables.start_watching(args.tunables)
+
+    watchdog_thread = threading.Thread(target=watchdog.input_watchdog_loop, daemon=True)
     watchdog_thread.start()
 
+    # 입력 통계 기록 시작 (대시보드 차트, /history)
+    history.start_history()
+
+    # 입력 스케줄러 시작 (버튼 입력을 조이스틱 샘플보다 먼저 처리)
+    if config.INPUT_SCHEDULER_ENABLED:
+        data_processor.input_scheduler.start()
+
+    # MQTT 비동기 시작 (브로커 연결을 기다리지 않음 - HTTP는 바로 서비스, MQTT는 연결되면 합류)
+    if config.MQTT_ENABLED:
+        mqtt_client.start_mqtt()
+
     try:
-        app.app.run(host='0.0.0.0', port=server_port, debug=False, threaded=True, use_reloader=False)
+        http_server.serve(app.app, '0.0.0.0', server_port, mode=args.server)
     except KeyboardInterrupt:
-        print("\n서버 종료 중...")
-        keyboard_handler.release_all_keys()
-        print("모든 키 입력 해제 완료")
+        pass
+
+    # werkzeug 서버는 Ctrl+C를 내부에서 처리하고 반환하므로 반환 후 항상 정리
+    print("\n서버 종료 중...")
+    mqtt_client.stop_mqtt()
+    keyboard_handler.release_all_keys()
+    emitter_process.stop_emitter()
+    logger.flush()
+    print("모든 키 입력 해제 완료")
 